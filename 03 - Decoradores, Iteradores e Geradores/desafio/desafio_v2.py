@@ -26,6 +26,34 @@ class ContasIterador:
             self._index += 1
 
 
+class ClienteRegistry:
+    def __init__(self, clientes=()):
+        self._clientes = {}
+        for cliente in clientes:
+            self.adicionar(cliente)
+
+    def adicionar(self, cliente):
+        if cliente.cpf in self._clientes:
+            raise ValueError(f"Já existe cliente com o CPF {cliente.cpf}!")
+
+        self._clientes[cliente.cpf] = cliente
+
+    def buscar(self, cpf):
+        return self._clientes.get(cpf)
+
+    def __contains__(self, cpf):
+        return cpf in self._clientes
+
+    def __len__(self):
+        return len(self._clientes)
+
+    def __iter__(self):
+        return iter(self._clientes.values())
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}: {len(self)} clientes>"
+
+
 class Cliente:
     def __init__(self, endereco):
         self.endereco = endereco
@@ -228,8 +256,7 @@ def menu():
 
 
 def filtrar_cliente(cpf, clientes):
-    clientes_filtrados = [cliente for cliente in clientes if cliente.cpf == cpf]
-    return clientes_filtrados[0] if clientes_filtrados else None
+    return clientes.buscar(cpf)
 
 
 def recuperar_conta_cliente(cliente):
@@ -322,7 +349,7 @@ def criar_cliente(clientes):
 
     cliente = PessoaFisica(nome=nome, data_nascimento=data_nascimento, cpf=cpf, endereco=endereco)
 
-    clientes.append(cliente)
+    clientes.adicionar(cliente)
 
     print("\n=== Cliente criado com sucesso! ===")
 
@@ -350,7 +377,7 @@ def listar_contas(contas):
 
 
 def main():
-    clientes = []
+    clientes = ClienteRegistry()
     contas = []
 
     while True:
@@ -382,4 +409,5 @@ def main():
             print("\n@@@ Operação inválida, por favor selecione novamente a operação desejada. @@@")
 
 
-main()
+if __name__ == "__main__":
+    main()
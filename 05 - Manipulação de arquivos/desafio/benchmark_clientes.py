@@ -0,0 +1,51 @@
+import random
+import sys
+from time import perf_counter
+
+from desafio_v2 import ClienteRegistry, PessoaFisica, filtrar_cliente
+
+TAMANHOS = [10**3, 10**4, 10**5, 10**6]
+BUSCAS = 100_000
+BUSCAS_LINEAR = 20
+
+
+def gerar_clientes(quantidade):
+    for indice in range(quantidade):
+        yield PessoaFisica(
+            nome=f"Cliente {indice}",
+            data_nascimento="01-01-1990",
+            cpf=f"{indice:011d}",
+            endereco="Rua A, 1 - Centro - Cidade/UF",
+        )
+
+
+def filtrar_cliente_linear(cpf, clientes):
+    clientes_filtrados = [cliente for cliente in clientes if cliente.cpf == cpf]
+    return clientes_filtrados[0] if clientes_filtrados else None
+
+
+def medir(funcao, cpfs, clientes):
+    inicio = perf_counter()
+    for cpf in cpfs:
+        funcao(cpf, clientes)
+    return (perf_counter() - inicio) / len(cpfs)
+
+
+def main(tamanhos):
+    aleatorio = random.Random(42)
+    print(f"{'clientes':>10} | {'registry (ns/busca)':>20} | {'lista (ns/busca)':>18}")
+    print("-" * 55)
+
+    for tamanho in tamanhos:
+        lista = list(gerar_clientes(tamanho))
+        registry = ClienteRegistry(lista)
+        cpfs = [f"{aleatorio.randrange(tamanho):011d}" for _ in range(BUSCAS)]
+
+        tempo_registry = medir(filtrar_cliente, cpfs, registry)
+        tempo_lista = medir(filtrar_cliente_linear, cpfs[:BUSCAS_LINEAR], lista)
+
+        print(f"{tamanho:>10} | {tempo_registry * 1e9:>20.1f} | {tempo_lista * 1e9:>18.1f}")
+
+
+if __name__ == "__main__":
+    main([int(tamanho) for tamanho in sys.argv[1:]] or TAMANHOS)
@@ -0,0 +1,108 @@
+import contextlib
+import os
+import random
+import sys
+import threading
+from itertools import accumulate
+from time import perf_counter
+
+import desafio_v2
+from benchmark_suite import gerar_clientes, gerar_contas
+from desafio_v2 import CODIGOS_TRANSACAO, Deposito, Saque
+
+THREADS = 16
+CONTAS = 8
+OPERACOES_POR_THREAD = 20_000
+
+
+def trabalhador(contas, operacoes, semente, depositos, erros, barreira):
+    aleatorio = random.Random(semente)
+    total = 0.0
+    barreira.wait()
+    for _ in range(operacoes):
+        conta = aleatorio.choice(contas)
+        valor = float(aleatorio.randint(1, 100))
+        try:
+            if aleatorio.random() < 0.5:
+                Deposito(valor).registrar(conta)
+                total += valor
+            else:
+                Saque(valor).registrar(conta)
+        except Exception as exc:
+            erros.append(f"{exc.__class__.__name__}: {exc}")
+    depositos.append(total)
+
+
+def verificar(contas, depositos_esperados):
+    """Devolve a lista de inconsistências: depósitos perdidos, saldo divergente do histórico ou saldo negativo."""
+    problemas = []
+    depositos = 0.0
+    for conta in contas:
+        historico = conta.historico
+        movimentos = [
+            valor if codigo == CODIGOS_TRANSACAO["Deposito"] else -valor
+            for codigo, valor in zip(historico._tipos, historico._valores)
+        ]
+        depositos += sum(valor for valor in movimentos if valor > 0)
+        saldos = list(accumulate(movimentos, initial=0.0))
+        if saldos[-1] != conta.saldo:
+            problemas.append(f"conta {conta.numero}: saldo {conta.saldo} != histórico {saldos[-1]}")
+        if min(saldos) < 0:
+            problemas.append(f"conta {conta.numero}: saldo negativo {min(saldos)} no histórico")
+    if depositos != depositos_esperados:
+        problemas.append(f"depósitos registrados {depositos} != realizados {depositos_esperados}")
+    return problemas
+
+
+def executar(quantidade_travas, quantidade_threads, quantidade_contas, operacoes):
+    if quantidade_travas:
+        desafio_v2.ativar_concorrencia(quantidade_travas)
+    else:
+        desafio_v2.desativar_concorrencia()
+
+    contas = gerar_contas(desafio_v2, gerar_clientes(desafio_v2, quantidade_contas, random.Random(42)), limite=10**9)
+    depositos, erros = [], []
+    barreira = threading.Barrier(quantidade_threads + 1)
+    threads = [
+        threading.Thread(target=trabalhador, args=(contas, operacoes, semente, depositos, erros, barreira))
+        for semente in range(quantidade_threads)
+    ]
+    for thread in threads:
+        thread.start()
+
+    barreira.wait()
+    inicio = perf_counter()
+    for thread in threads:
+        thread.join()
+    duracao = perf_counter() - inicio
+
+    desafio_v2.desativar_concorrencia()
+    return duracao, erros + verificar(contas, sum(depositos))
+
+
+def main(quantidade_threads, quantidade_contas, operacoes):
+    total = quantidade_threads * operacoes
+    print(f"{quantidade_threads} threads, {quantidade_contas} contas, {total} operações")
+
+    # Trocas de thread frequentes expõem as janelas entre a leitura e a escrita do saldo
+    sys.setswitchinterval(1e-6)
+    modos = [("sem travas", 0), ("trava global", 1), ("64 travas listradas", 64)]
+    falhou = False
+    with contextlib.redirect_stdout(open(os.devnull, "w")) as saida:
+        resultados = [(nome, *executar(travas, quantidade_threads, quantidade_contas, operacoes)) for nome, travas in modos]
+        saida.close()
+
+    for nome, duracao, problemas in resultados:
+        situacao = "consistente" if not problemas else f"{len(problemas)} inconsistências, ex.: {problemas[0]}"
+        print(f"{nome:<20} {duracao:6.2f}s ({total / duracao:8.0f} operações/s)  {situacao}")
+        falhou = falhou or (problemas and nome != "sem travas")
+
+    if falhou:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else THREADS
+    contas = int(sys.argv[2]) if len(sys.argv) > 2 else CONTAS
+    operacoes = int(sys.argv[3]) if len(sys.argv) > 3 else OPERACOES_POR_THREAD
+    main(threads, contas, operacoes)
@@ -0,0 +1,69 @@
+import gc
+import random
+import sys
+from time import perf_counter
+
+import desafio_v2
+from benchmark_suite import gerar_clientes, gerar_contas
+from desafio_v2 import AGENCIA, ContaRegistry
+
+CONTAS = 1_000_000
+BUSCAS = 1_000_000
+BUSCAS_VARREDURA = 200
+CONTAS_POR_CLIENTE = 3
+
+
+def buscar_varrendo(contas, numero, cliente):
+    """Sem diretório: procura a conta na lista de todas as contas."""
+    for conta in contas:
+        if conta.numero == numero:
+            return conta if conta.cliente is cliente else None
+    return None
+
+
+def medir(funcao, pedidos):
+    inicio = perf_counter()
+    for numero, cliente in pedidos:
+        funcao(numero, cliente)
+    return len(pedidos) / (perf_counter() - inicio)
+
+
+def main(quantidade_contas, quantidade_buscas):
+    aleatorio = random.Random(42)
+    gc.disable()
+    clientes = gerar_clientes(desafio_v2, -(-quantidade_contas // CONTAS_POR_CLIENTE), aleatorio)
+    contas = gerar_contas(desafio_v2, clientes, CONTAS_POR_CLIENTE)
+    gc.enable()
+    sorteadas = [contas[aleatorio.randrange(len(contas))] for _ in range(quantidade_buscas)]
+    pedidos = [(conta.numero, conta.cliente) for conta in sorteadas]
+    print(f"{len(contas)} contas, {CONTAS_POR_CLIENTE} por cliente")
+
+    varredura = medir(lambda numero, cliente: buscar_varrendo(contas, numero, cliente), pedidos[:BUSCAS_VARREDURA])
+    print(f"{'varrendo a lista de contas':<40} {varredura:12.0f} buscas/s")
+
+    inicio = perf_counter()
+    diretorio = ContaRegistry(contas)
+    print(f"{'montar o diretório':<40} {perf_counter() - inicio:12.2f}s")
+    buscas = medir(lambda numero, cliente: diretorio.buscar(AGENCIA, numero, cliente), pedidos)
+    print(f"{'diretório (agência, número, cliente)':<40} {buscas:12.0f} buscas/s")
+
+    inicio = perf_counter()
+    {conta.numero: conta for conta in contas}
+    montagem = perf_counter() - inicio
+    inicio = perf_counter()
+    diretorio.da_agencia(AGENCIA)
+    print(f"{'lote: dicionário montado a cada execução':<40} {montagem:12.4f}s; da_agencia(): {perf_counter() - inicio:.6f}s")
+
+    clientes = [conta.cliente for conta in sorteadas[:100_000]]
+    for ordem in ("criacao", "saldo"):
+        inicio = perf_counter()
+        for cliente in clientes:
+            diretorio.do_cliente(cliente, ordem)
+        print(f"{'do_cliente(ordem=' + repr(ordem) + ')':<40} {len(clientes) / (perf_counter() - inicio):12.0f} listagens/s")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else CONTAS,
+        int(sys.argv[2]) if len(sys.argv) > 2 else BUSCAS,
+    )
@@ -0,0 +1,88 @@
+import contextlib
+import io
+import random
+import sys
+import tempfile
+from time import perf_counter, time
+
+import desafio_v2
+from desafio_v2 import CODIGOS_TRANSACAO, CREDITOS, ContaCorrente, Deposito, PessoaFisica, Saque
+from eventos import LojaEventos, np
+
+EVENTOS = 10_000_000
+CONTAS = 100_000
+EVENTOS_POR_CHECKPOINT = 3_000_000
+
+
+def gerar_eventos(quantidade_eventos, quantidade_contas, semente=42):
+    aleatorio = random.Random(semente)
+    agora = int(time())
+    codigos = (CODIGOS_TRANSACAO["Saque"], CODIGOS_TRANSACAO["Deposito"])
+    for indice in range(quantidade_eventos):
+        yield aleatorio.randint(1, quantidade_contas), codigos[indice % 2], aleatorio.randint(1, 50_000) / 100, agora
+
+
+def auditar_banco(diretorio):
+    """Caminho real: Saque/Deposito.registrar notificam a loja, que depois confere o estado das contas."""
+    loja = LojaEventos(diretorio, CREDITOS, eventos_por_checkpoint=500)
+    loja.abrir()
+    desafio_v2.ouvintes.append(loja.registrar_evento)
+    aleatorio = random.Random(7)
+    try:
+        contas = []
+        for numero in range(1, 101):
+            cliente = PessoaFisica(nome=f"Cliente {numero}", data_nascimento="", cpf=f"{numero:011d}", endereco="")
+            contas.append(ContaCorrente(numero=numero, cliente=cliente, limite=500, limite_saques=10**6))
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(5_000):
+                transacao = Deposito if aleatorio.random() < 0.6 else Saque
+                transacao(aleatorio.randint(1, 40_000) / 100).registrar(aleatorio.choice(contas))
+    finally:
+        desafio_v2.ouvintes.remove(loja.registrar_evento)
+    loja.fechar()
+
+    reaberta = LojaEventos(diretorio, CREDITOS)
+    reaberta.abrir()
+    divergencias = reaberta.auditar(contas)
+    reaberta.fechar()
+    return reaberta.eventos, divergencias
+
+
+def main(quantidade_eventos, quantidade_contas):
+    with tempfile.TemporaryDirectory() as diretorio:
+        eventos, divergencias = auditar_banco(diretorio)
+        print(f"Auditoria com Saque/Deposito.registrar: {eventos} eventos, {len(divergencias)} contas divergentes")
+        if divergencias:
+            sys.exit(1)
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        loja = LojaEventos(diretorio, CREDITOS, eventos_por_checkpoint=EVENTOS_POR_CHECKPOINT)
+        loja.abrir()
+        inicio = perf_counter()
+        loja.anexar_varios(gerar_eventos(quantidade_eventos, quantidade_contas))
+        duracao = perf_counter() - inicio
+        print(f"{quantidade_eventos} eventos gravados em {duracao:.2f}s ({quantidade_eventos / duracao:.0f} eventos/s)")
+        esperado = dict(loja._saldos)
+        checkpoint = loja._eventos_checkpoint
+        loja._arquivo.close()
+
+        modos = [("sequencial", False)] + ([("NumPy", True)] if np is not None else [])
+        for usar_checkpoint in (False, True):
+            reproduzidos = quantidade_eventos - (checkpoint if usar_checkpoint else 0)
+            for nome, vetorizado in modos:
+                inicio = perf_counter()
+                saldos, _, eventos = loja.reconstruir(usar_checkpoint=usar_checkpoint, vetorizado=vetorizado)
+                duracao = perf_counter() - inicio
+                identico = saldos == esperado and eventos == quantidade_eventos
+                print(
+                    f"Reconstrução {nome:<10} {'checkpoint + ' if usar_checkpoint else 'completa, '}"
+                    f"{reproduzidos} eventos: {duracao:6.2f}s, {'idêntica' if identico else 'DIVERGENTE'}"
+                )
+                if not identico:
+                    sys.exit(1)
+
+
+if __name__ == "__main__":
+    eventos = int(sys.argv[1]) if len(sys.argv) > 1 else EVENTOS
+    contas = int(sys.argv[2]) if len(sys.argv) > 2 else CONTAS
+    main(eventos, contas)
@@ -0,0 +1,87 @@
+import io
+import os
+import sys
+import tracemalloc
+from time import perf_counter, time
+
+from desafio_v2 import CODIGOS_TRANSACAO, ContaCorrente, PessoaFisica, escrever_extrato
+
+TAMANHOS = (10_000, 100_000, 1_000_000)
+TAMANHO_PAGINA = 1_000
+
+
+def criar_conta(quantidade):
+    cliente = PessoaFisica(nome="Cliente", data_nascimento="01-01-1990", cpf="00000000001", endereco="Rua A")
+    conta = ContaCorrente(numero=1, cliente=cliente, limite=500, limite_saques=50)
+    agora = int(time()) - quantidade
+    for indice in range(quantidade):
+        codigo = CODIGOS_TRANSACAO["Deposito"] if indice % 3 else CODIGOS_TRANSACAO["Saque"]
+        conta.aplicar_transacao(codigo, 10.0 + indice % 100, agora + indice)
+    return conta
+
+
+def extrato_concatenado(conta):
+    """Implementação anterior de exibir_extrato, que monta a string inteira antes de imprimir."""
+    saida = io.StringIO()
+    print("\n================ EXTRATO ================", file=saida)
+    extrato = ""
+    tem_transacao = False
+    for transacao in conta.historico.gerar_relatorio():
+        tem_transacao = True
+        extrato += f"\n{transacao['data']}\n{transacao['tipo']}:\n\tR$ {transacao['valor']:.2f}"
+
+    if not tem_transacao:
+        extrato = "Não foram realizadas movimentações"
+
+    print(extrato, file=saida)
+    print(f"\nSaldo:\n\tR$ {conta.saldo:.2f}", file=saida)
+    print("==========================================", file=saida)
+    return saida.getvalue()
+
+
+def medir(funcao):
+    inicio = perf_counter()
+    resultado = funcao()
+    duracao = perf_counter() - inicio
+
+    # O rastreamento do tracemalloc distorce o tempo, então o pico de memória é medido em uma segunda execução
+    tracemalloc.start()
+    funcao()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return resultado, duracao, pico
+
+
+def main(tamanhos):
+    for quantidade in tamanhos:
+        conta = criar_conta(quantidade)
+
+        esperado, duracao, pico = medir(lambda: extrato_concatenado(conta))
+        print(f"{quantidade} movimentações - concatenação: {duracao:.2f}s, pico {pico / 2**20:.1f} MiB")
+
+        saida = io.StringIO()
+        escrever_extrato(conta, saida)
+        if saida.getvalue() != esperado:
+            print("Extrato em streaming DIVERGENTE da implementação anterior")
+            sys.exit(1)
+
+        with open(os.devnull, "w") as devnull:
+            _, duracao, pico = medir(lambda: escrever_extrato(conta, devnull))
+            print(f"{quantidade} movimentações - streaming: {duracao:.2f}s, pico {pico / 2**20:.2f} MiB")
+
+            def paginar():
+                paginas, cursor = 0, 0
+                while cursor is not None:
+                    cursor = escrever_extrato(conta, devnull, cursor, TAMANHO_PAGINA)
+                    paginas += 1
+                return paginas
+
+            paginas, duracao, pico = medir(paginar)
+            print(
+                f"{quantidade} movimentações - {paginas} páginas de {TAMANHO_PAGINA}: "
+                f"{duracao:.2f}s, pico {pico / 2**20:.2f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main([int(tamanho) for tamanho in sys.argv[1:]] or TAMANHOS)
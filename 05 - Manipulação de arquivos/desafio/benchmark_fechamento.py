@@ -0,0 +1,97 @@
+import contextlib
+import gc
+import hashlib
+import io
+import random
+import sys
+from time import perf_counter, time
+
+import desafio_v2
+import fechamento as motor
+from benchmark_suite import gerar_clientes, gerar_contas
+from desafio_v2 import Juros, Tarifa
+
+CONTAS = 1_000_000
+
+
+def preparar_contas(quantidade, agora, semente=42):
+    aleatorio = random.Random(semente)
+    gc.disable()
+    contas = gerar_contas(desafio_v2, gerar_clientes(desafio_v2, quantidade, aleatorio), limite_saques=50)
+    for conta in contas:
+        sorteio = aleatorio.random()
+        # Limite e número de saques esgotados não impedem a tarifa; só o saldo insuficiente impede
+        if sorteio < 0.01:
+            conta._limite = 0.1
+        elif sorteio < 0.02:
+            conta._limite_saques = 0
+        elif sorteio < 0.03:
+            conta.historico.carregar([motor.DEPOSITO], [0.3], [agora])  # menos que a menor tarifa
+            conta._saldo = 0.3
+        else:
+            saldo = round(10 ** aleatorio.uniform(0, 5), 2)
+            conta.historico.carregar([motor.DEPOSITO], [saldo], [agora - aleatorio.randrange(86400)])
+            conta._saldo = saldo
+    gc.enable()
+    return contas
+
+
+def resumo(contas):
+    digest = hashlib.blake2b(digest_size=16)
+    for conta in contas:
+        historico = conta.historico
+        digest.update(f"{conta.numero}|{conta.saldo!r}|".encode())
+        digest.update(historico._tipos.tobytes())
+        digest.update(historico._valores.tobytes())
+        digest.update(historico._datas.tobytes())
+    return digest.hexdigest()
+
+
+def fechar_conta_a_conta(contas, data, taxa):
+    """Caminho de referência: creditar os juros e cobrar a tarifa em cada conta, com o print de cada operação."""
+    with contextlib.redirect_stdout(io.StringIO()) as saida:
+        for conta in contas:
+            data_conta = max(data, conta.historico._ultima_data())
+            tarifa = motor.calcular_tarifa(conta.saldo)
+            Juros(motor.calcular_juros(conta.saldo, taxa)).registrar(conta, data_conta)
+            if tarifa > 0:
+                Tarifa(tarifa).registrar(conta, data_conta)
+            saida.seek(0)
+            saida.truncate()
+
+
+def main(quantidade_contas):
+    agora = int(time())
+    data = agora + 3600
+    taxa = motor.taxa_diaria()
+    print(f"{quantidade_contas} contas, taxa diária {taxa:.6%}")
+
+    modos = [("conta a conta (Juros/Tarifa.registrar)", None), ("lote em Python puro", False)]
+    if motor.np is not None:
+        modos.append(("lote vetorizado (NumPy)", True))
+
+    referencia = None
+    for nome, vetorizado in modos:
+        contas = preparar_contas(quantidade_contas, agora)
+        inicio = perf_counter()
+        if vetorizado is None:
+            fechar_conta_a_conta(contas, data, taxa)
+        else:
+            resultado = motor.processar_fechamento(contas, data, taxa, vetorizado=vetorizado)
+        duracao = perf_counter() - inicio
+
+        digest = resumo(contas)
+        referencia = referencia or digest
+        situacao = "referência" if vetorizado is None else ("idêntico" if digest == referencia else "DIVERGENTE")
+        print(f"{nome:<42} {duracao:6.2f}s ({quantidade_contas / duracao:9.0f} contas/s)  {situacao}")
+        if digest != referencia:
+            sys.exit(1)
+
+        del contas
+        gc.collect()
+
+    print(resultado)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else CONTAS)
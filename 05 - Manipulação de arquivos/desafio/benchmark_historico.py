@@ -0,0 +1,51 @@
+import sys
+import tracemalloc
+from datetime import datetime
+
+from desafio_v2 import Deposito, Historico, Saque
+
+QUANTIDADE = 1_000_000
+
+
+def historico_lista(quantidade):
+    transacoes = []
+    for indice in range(quantidade):
+        transacao = Saque(50.0) if indice % 2 else Deposito(100.0 + indice)
+        transacoes.append(
+            {
+                "tipo": transacao.__class__.__name__,
+                "valor": transacao.valor,
+                "data": datetime.utcnow().strftime("%d-%m-%Y %H:%M:%S"),
+            }
+        )
+    return transacoes
+
+
+def historico_colunar(quantidade):
+    historico = Historico()
+    for indice in range(quantidade):
+        historico.adicionar_transacao(Saque(50.0) if indice % 2 else Deposito(100.0 + indice))
+    return historico
+
+
+def medir_memoria(construtor, quantidade):
+    tracemalloc.start()
+    estrutura = construtor(quantidade)
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del estrutura
+    return memoria
+
+
+def main(quantidade):
+    lista = medir_memoria(historico_lista, quantidade)
+    colunar = medir_memoria(historico_colunar, quantidade)
+
+    print(f"Transações: {quantidade}")
+    print(f"Lista de dicts:  {lista / quantidade:8.1f} bytes/transação ({lista / 2**20:8.1f} MiB)")
+    print(f"Colunar (array): {colunar / quantidade:8.1f} bytes/transação ({colunar / 2**20:8.1f} MiB)")
+    print(f"Redução: {lista / colunar:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else QUANTIDADE)
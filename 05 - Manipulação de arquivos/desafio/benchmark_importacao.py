@@ -0,0 +1,137 @@
+import contextlib
+import csv
+import gc
+import io
+import random
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+from time import perf_counter
+
+import desafio_v2
+import importacao
+from desafio_v2 import ClienteRegistry, ContaRegistry
+from escritor_log import EscritorLog
+from roteiro import Sessao
+
+LINHAS = 1_000_000
+LINHAS_MENU = 100_000
+
+
+def gerar_csv(caminho, quantidade_linhas, semente=42):
+    aleatorio = random.Random(semente)
+    cpfs = []
+    with open(caminho, "w", newline="", encoding="utf-8") as arquivo:
+        escritor = csv.writer(arquivo)
+        escritor.writerow(importacao.COLUNAS)
+        for indice in range(quantidade_linhas):
+            sorteio = aleatorio.random()
+            if sorteio < 0.01 and cpfs:
+                cpf = aleatorio.choice(cpfs)  # cliente repetido
+            else:
+                cpf = f"{indice:011d}"
+                cpfs.append(cpf)
+            data = f"{aleatorio.randint(1, 28):02d}-{aleatorio.randint(1, 12):02d}-{aleatorio.randint(1940, 2005)}"
+            if 0.01 <= sorteio < 0.015:
+                data = "31-02-1990"
+            nome = "" if 0.015 <= sorteio < 0.02 else f"Cliente {indice}"
+            escritor.writerow([cpf, nome, data, f"Rua {indice % 1000}, {indice % 97} - Centro - Cidade/UF"])
+        escritor.writerow(["linha", "quebrada"])
+
+
+def importar_pelo_menu(caminho, limite_linhas):
+    """Caminho de referência: cada linha passa pelas perguntas de criar_cliente e criar_conta, como no menu.
+
+    O menu não valida nome nem data; essas linhas são puladas aqui para comparar com a importação.
+    """
+    sessao = Sessao()
+    with open(caminho, newline="", encoding="utf-8") as arquivo, sessao.ativar():
+        leitor = csv.reader(arquivo)
+        next(leitor)
+        with contextlib.redirect_stdout(io.StringIO()) as saida:
+            for linha in primeiras_linhas(leitor, limite_linhas):
+                cpf, nome, data_nascimento, endereco = linha
+                if not importacao._data_valida(data_nascimento) or not nome:
+                    continue
+                sessao.executar("nu", [cpf, nome, data_nascimento, endereco])
+                if cpf in sessao.clientes and not sessao.clientes.buscar(cpf).contas:
+                    sessao.executar("nc", [cpf])
+                saida.seek(0)
+                saida.truncate()
+    return sessao.clientes, sessao.contas
+
+
+def primeiras_linhas(leitor, limite_linhas):
+    for indice, linha in enumerate(leitor):
+        if indice >= limite_linhas or len(linha) != len(importacao.COLUNAS):
+            return
+        yield linha
+
+
+def mesmo_resultado(clientes_a, contas_a, clientes_b, contas_b):
+    return [(conta.numero, conta.cliente.cpf) for conta in contas_a] == [
+        (conta.numero, conta.cliente.cpf) for conta in contas_b
+    ] and sorted(cliente.cpf for cliente in clientes_a) == sorted(cliente.cpf for cliente in clientes_b)
+
+
+def main(quantidade_linhas):
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = Path(diretorio) / "clientes.csv"
+        gerar_csv(caminho, quantidade_linhas)
+        print(f"CSV com {quantidade_linhas} linhas ({caminho.stat().st_size / 2**20:.1f} MiB)")
+
+        # Referência: o mesmo começo do arquivo importado pelo menu interativo
+        linhas_menu = min(quantidade_linhas, LINHAS_MENU)
+        amostra = Path(diretorio) / "amostra.csv"
+        with open(caminho, encoding="utf-8") as origem, open(amostra, "w", encoding="utf-8") as destino:
+            for _, linha in zip(range(linhas_menu + 1), origem):
+                destino.write(linha)
+
+        # O log de transações do menu vai para o diretório temporário, não para o log.txt do desafio
+        escritor_original, desafio_v2.escritor_log = desafio_v2.escritor_log, EscritorLog(Path(diretorio) / "log.txt")
+        try:
+            inicio = perf_counter()
+            clientes_menu, contas_menu = importar_pelo_menu(amostra, linhas_menu)
+            duracao = perf_counter() - inicio
+        finally:
+            desafio_v2.escritor_log.fechar()
+            desafio_v2.escritor_log = escritor_original
+        print(f"menu (criar_cliente + criar_conta), {linhas_menu} linhas: {linhas_menu / duracao:10.0f} linhas/s")
+
+        clientes, contas = ClienteRegistry(), ContaRegistry()
+        importacao.importar_clientes(amostra, clientes, contas, Path(diretorio) / "rejeitadas_amostra.csv")
+        identico = mesmo_resultado(clientes, contas, clientes_menu, contas_menu)
+        print(f"importação em blocos, mesmas {linhas_menu} linhas: {'idêntica' if identico else 'DIVERGENTE'} ao menu")
+        if not identico:
+            sys.exit(1)
+        del clientes, contas, clientes_menu, contas_menu
+        gc.collect()  # clientes e contas apontam uns para os outros: só o coletor libera a rodada anterior
+
+        for tamanho_bloco in (1_000, 10_000, 100_000):
+            clientes, contas = ClienteRegistry(), ContaRegistry()
+            resultado = importacao.importar_clientes(
+                caminho, clientes, contas, Path(diretorio) / "rejeitadas.csv", tamanho_bloco=tamanho_bloco
+            )
+            print(
+                f"blocos de {tamanho_bloco:>7}: {resultado.duracao:6.2f}s "
+                f"({resultado.linhas_por_segundo:8.0f} linhas/s), "
+                f"{resultado.importados} importados, {resultado.rejeitados} rejeitados"
+            )
+            del clientes, contas
+            gc.collect()
+
+        # Memória além dos próprios clientes: o pico durante a importação menos o que fica nos objetos criados
+        tracemalloc.start()
+        clientes, contas = ClienteRegistry(), ContaRegistry()
+        importacao.importar_clientes(caminho, clientes, contas, Path(diretorio) / "rejeitadas.csv")
+        retido, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(
+            f"memória: {retido / 2**20:.1f} MiB retidos nos clientes e contas, "
+            f"{(pico - retido) / 2**20:.1f} MiB a mais no pico (blocos e índice de CPFs do arquivo)"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else LINHAS)
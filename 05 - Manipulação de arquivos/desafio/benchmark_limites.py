@@ -0,0 +1,95 @@
+import gc
+import random
+import sys
+import tracemalloc
+from time import perf_counter, time
+
+from desafio_v2 import SEGUNDOS_POR_DIA, ContaCorrente, PessoaFisica
+from limitador import BaldeTokens, LimitadorTaxa, LimiteContado, LimiteJanela
+
+CLIENTES = 1_000_000
+VERIFICACOES = 3_000_000
+
+POLITICAS = {
+    "janela fixa diária (2/dia)": LimiteJanela(2, SEGUNDOS_POR_DIA, deslizante=False),
+    "janela deslizante (600/min)": LimiteJanela(600, 60),
+    "balde de tokens (rajada 10, 10/min)": BaldeTokens(capacidade=10, por_segundo=10 / 60),
+}
+
+
+def sortear_verificacoes(quantidade_clientes, quantidade, agora, semente=42):
+    """Clientes sorteados com repetição e relógio que avança 1 segundo a cada 10 mil verificações."""
+    aleatorio = random.Random(semente)
+    chaves = [aleatorio.randrange(quantidade_clientes) for _ in range(quantidade)]
+    instantes = [agora + indice // 10_000 for indice in range(quantidade)]
+    return chaves, instantes
+
+
+def medir(limitador, chaves, instantes):
+    permitir = limitador.permitir
+    inicio = perf_counter()
+    permitidas = sum(permitir(chave, None, 1, instante) for chave, instante in zip(chaves, instantes))
+    return perf_counter() - inicio, permitidas
+
+
+def medir_plano_padrao(repeticoes=1_000_000):
+    """Plano padrão: 2 por dia contadas no histórico da conta (iniciadas_hoje), sem estado no limitador."""
+    cliente = PessoaFisica(nome="Cliente", data_nascimento="01-01-1990", cpf="00000000000", endereco="Rua A")
+    conta = ContaCorrente(numero=1, cliente=cliente)
+    agora = int(time())
+    conta.historico.carregar([2] * 1_000, [1.0] * 1_000, [agora - SEGUNDOS_POR_DIA + indice for indice in range(1_000)])
+    limitador = LimitadorTaxa({"padrao": LimiteContado(2)})
+    permitir, usados = limitador.permitir, conta.historico.iniciadas_hoje
+    inicio = perf_counter()
+    for _ in range(repeticoes):
+        permitir(conta, None, 1, None, usados)
+    return repeticoes / (perf_counter() - inicio)
+
+
+def main(quantidade_clientes, quantidade):
+    agora = float(int(time()))
+    chaves, instantes = sortear_verificacoes(quantidade_clientes, quantidade, agora)
+    print(f"{quantidade_clientes} clientes, {quantidade} verificações")
+    print(f"{'plano padrão (histórico, 2/dia)':<40} {medir_plano_padrao():12.0f} verificações/s")
+
+    for nome, politica in POLITICAS.items():
+        limitador = LimitadorTaxa({"padrao": politica}, intervalo_varredura=float("inf"))
+        # Primeira passada cria o estado de cada cliente; a segunda mede só clientes já conhecidos
+        duracao_fria, _ = medir(limitador, chaves, instantes)
+        decorrido = instantes[-1] - instantes[0] + 1
+        duracao, permitidas = medir(limitador, chaves, [instante + decorrido for instante in instantes])
+        print(
+            f"{nome:<40} {quantidade / duracao:12.0f} verificações/s "
+            f"({quantidade / duracao_fria:.0f}/s criando estados), {permitidas} permitidas, {len(limitador)} clientes"
+        )
+        del limitador
+        gc.collect()
+
+    # Memória por cliente e varredura: todos os clientes com estado, depois ociosos por uma janela inteira
+    for nome, politica in POLITICAS.items():
+        tracemalloc.start()
+        limitador = LimitadorTaxa({"padrao": politica}, intervalo_varredura=float("inf"))
+        for chave in range(quantidade_clientes):
+            limitador.permitir(chave, None, 1, agora)
+        memoria, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        inicio = perf_counter()
+        nenhum = limitador.varrer(agora + 1)
+        duracao_ativos = perf_counter() - inicio
+        inicio = perf_counter()
+        removidos = limitador.varrer(agora + 2 * SEGUNDOS_POR_DIA)
+        duracao_ociosos = perf_counter() - inicio
+        print(
+            f"{nome:<40} {memoria / quantidade_clientes:5.0f} bytes/cliente; varredura: {duracao_ativos:.2f}s com "
+            f"todos ativos ({nenhum} removidos), {duracao_ociosos:.2f}s com todos ociosos ({removidos} removidos)"
+        )
+        del limitador
+        gc.collect()
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else CLIENTES,
+        int(sys.argv[2]) if len(sys.argv) > 2 else VERIFICACOES,
+    )
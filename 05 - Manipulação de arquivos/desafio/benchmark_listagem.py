@@ -0,0 +1,87 @@
+import random
+import sys
+import textwrap
+from operator import attrgetter
+from time import perf_counter
+
+import desafio_v2
+from benchmark_suite import gerar_clientes, gerar_contas
+from desafio_v2 import ContasIterador
+
+CONTAS = 1_000_000
+TAMANHO_PAGINA = 50
+
+
+def listagem_anterior(contas):
+    """ContasIterador original: f-string indentada por conta e textwrap.dedent na listagem."""
+    for conta in contas:
+        yield textwrap.dedent(
+            f"""\
+            Agência:\t{conta.agencia}
+            Número:\t\t{conta.numero}
+            Titular:\t{conta.cliente.nome}
+            Saldo:\t\tR$ {conta.saldo:.2f}
+        """
+        )
+
+
+def medir(nome, funcao, repeticoes=1):
+    inicio = perf_counter()
+    for _ in range(repeticoes):
+        linhas = list(funcao())
+    duracao = (perf_counter() - inicio) / repeticoes
+    print(f"{nome:<44} {len(linhas):>8} linhas  {duracao * 1e3:10.3f} ms")
+    return linhas
+
+
+def main(quantidade):
+    contas = gerar_contas(desafio_v2, gerar_clientes(desafio_v2, quantidade, random.Random(42), nomes=1000))
+    # Dez agências e saldos espalhados, para os filtros e as ordenações terem o que separar
+    for conta in contas:
+        conta._agencia = f"{conta.numero % 10:04d}"
+        conta._saldo = float((conta.numero * 7919) % 100_000)
+    print(f"{quantidade} contas, páginas de {TAMANHO_PAGINA}")
+
+    anterior = medir("listagem completa (anterior)", lambda: listagem_anterior(contas))
+    atual = medir("listagem completa", lambda: ContasIterador(contas))
+    if anterior != atual:
+        print("Listagem DIVERGENTE da implementação anterior")
+        sys.exit(1)
+
+    meio = quantidade // 2
+    medir("página no meio", lambda: ContasIterador(contas, offset=meio, limite=TAMANHO_PAGINA), 100)
+    medir("página no meio, ordem inversa", lambda: ContasIterador(contas, offset=meio, limite=TAMANHO_PAGINA, reverso=True), 100)
+    medir(
+        "1ª página da agência 0003",
+        lambda: ContasIterador(contas, limite=TAMANHO_PAGINA, filtro=lambda conta: conta.agencia == "0003"),
+        100,
+    )
+    medir(
+        "10 maiores saldos",
+        lambda: ContasIterador(contas, limite=10, chave=attrgetter("saldo"), reverso=True),
+    )
+    pagina = medir(
+        "2ª página por saldo do titular 'Cliente 42'",
+        lambda: ContasIterador(
+            contas,
+            offset=TAMANHO_PAGINA,
+            limite=TAMANHO_PAGINA,
+            filtro=lambda conta: conta.cliente.nome == "Cliente 42",
+            chave=attrgetter("saldo"),
+        ),
+    )
+
+    esperado = sorted((conta for conta in contas if conta.cliente.nome == "Cliente 42"), key=attrgetter("saldo"))
+    esperado = [
+        ContasIterador.MODELO_LINHA.format(
+            agencia=conta.agencia, numero=conta.numero, titular=conta.cliente.nome, saldo=conta.saldo
+        )
+        for conta in esperado
+    ]
+    if pagina != esperado[TAMANHO_PAGINA : 2 * TAMANHO_PAGINA]:
+        print("Página ordenada DIVERGENTE de sorted()")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else CONTAS)
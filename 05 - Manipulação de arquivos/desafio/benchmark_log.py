@@ -0,0 +1,65 @@
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from statistics import quantiles
+from time import perf_counter
+
+from desafio_v2 import PessoaFisica
+from escritor_log import EscritorLog
+
+CHAMADAS = 20_000
+CLIENTES = 10_000
+
+
+def registrar_sincrono(caminho):
+    def registrar(funcao, args, kwargs, resultado):
+        data_hora = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        with open(caminho, "a") as arquivo:
+            arquivo.write(
+                f"[{data_hora}] Função '{funcao}' executada com argumentos {args} e {kwargs}. "
+                f"Retornou {resultado}\n"
+            )
+
+    return registrar
+
+
+def medir(nome, registrar, finalizar, chamadas, args):
+    latencias = []
+    inicio = perf_counter()
+    for _ in range(chamadas):
+        antes = perf_counter()
+        registrar("depositar", args, {}, None)
+        latencias.append(perf_counter() - antes)
+    finalizar()
+    total = perf_counter() - inicio
+
+    percentis = quantiles(latencias, n=100, method="inclusive") if chamadas > 1 else latencias * 99
+    print(
+        f"{nome:<12} | {chamadas / total:>12.0f} | {percentis[49] * 1e6:>9.2f} | {percentis[98] * 1e6:>9.2f}"
+    )
+
+
+def main(chamadas, quantidade_clientes):
+    clientes = [
+        PessoaFisica(nome=f"Cliente {indice}", data_nascimento="01-01-1990", cpf=f"{indice:011d}", endereco="Rua A")
+        for indice in range(quantidade_clientes)
+    ]
+    args = (clientes,)
+
+    print(f"{chamadas} chamadas com {quantidade_clientes} clientes nos argumentos")
+    print(f"{'escritor':<12} | {'chamadas/s':>12} | {'p50 (us)':>9} | {'p99 (us)':>9}")
+    print("-" * 52)
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        registrar = registrar_sincrono(Path(diretorio) / "sincrono.txt")
+        medir("síncrono", registrar, lambda: None, chamadas, args)
+
+        escritor = EscritorLog(Path(diretorio) / "assincrono.txt")
+        medir("assíncrono", escritor.registrar, escritor.fechar, chamadas, args)
+
+
+if __name__ == "__main__":
+    chamadas = int(sys.argv[1]) if len(sys.argv) > 1 else CHAMADAS
+    clientes = int(sys.argv[2]) if len(sys.argv) > 2 else CLIENTES
+    main(chamadas, clientes)
@@ -0,0 +1,114 @@
+import contextlib
+import csv
+import hashlib
+import io
+import random
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter, time
+
+import desafio_v2
+import lote as motor
+from benchmark_suite import gerar_clientes, gerar_contas
+from desafio_v2 import CODIGOS_TRANSACAO, Deposito, Saque
+
+CONTAS = 10_000
+LINHAS = 1_000_000
+
+
+def contas_por_numero(quantidade):
+    # Mesma semente a cada chamada: todos os modos processam o lote sobre contas idênticas
+    contas = gerar_contas(desafio_v2, gerar_clientes(desafio_v2, quantidade, random.Random(42)), limite_saques=50)
+    return {conta.numero: conta for conta in contas}
+
+
+def gerar_csv(caminho, quantidade_contas, quantidade_linhas, semente=42):
+    aleatorio = random.Random(semente)
+    agora = int(time())
+    with open(caminho, "w", newline="", encoding="utf-8") as arquivo:
+        escritor = csv.writer(arquivo)
+        escritor.writerow(["conta", "tipo", "valor", "data"])
+        for indice in range(quantidade_linhas):
+            tipo = "deposito" if aleatorio.random() < 0.55 else "saque"
+            valor = round(aleatorio.uniform(-20, 700), 2)
+            conta = aleatorio.randint(1, quantidade_contas + quantidade_contas // 100)
+            escritor.writerow([conta, tipo, valor, agora + indice // 100])
+        escritor.writerow(["1", "transferencia", "10", str(agora)])
+        escritor.writerow(["linha", "quebrada"])
+
+
+def resumo(contas):
+    digest = hashlib.blake2b(digest_size=16)
+    for numero, conta in contas.items():
+        historico = conta.historico
+        digest.update(f"{numero}|{conta.saldo!r}|".encode())
+        digest.update(historico._tipos.tobytes())
+        digest.update(historico._valores.tobytes())
+        digest.update(historico._datas.tobytes())
+    return digest.hexdigest()
+
+
+def processar_sequencial(contas, lote):
+    """Caminho de referência: cada linha passa por Transacao.registrar, como no menu interativo."""
+    transacoes = {CODIGOS_TRANSACAO["Saque"]: Saque, CODIGOS_TRANSACAO["Deposito"]: Deposito}
+    validas = [
+        posicao for posicao in range(len(lote)) if lote.codigos[posicao] and lote.contas[posicao] in contas
+    ]
+    validas.sort(key=lambda posicao: (lote.contas[posicao], lote.datas[posicao], lote.linhas[posicao]))
+
+    aceitas = set()
+    with contextlib.redirect_stdout(io.StringIO()) as saida:
+        for posicao in validas:
+            conta, data = contas[lote.contas[posicao]], lote.datas[posicao]
+            if conta.historico._datas and data < conta.historico._datas[-1]:
+                continue
+
+            antes = len(conta.historico._tipos)
+            transacoes[lote.codigos[posicao]](lote.valores[posicao]).registrar(conta, data=data)
+            if len(conta.historico._tipos) > antes:
+                aceitas.add(posicao)
+            saida.seek(0)
+            saida.truncate()
+    return aceitas
+
+
+def main(quantidade_contas, quantidade_linhas):
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = Path(diretorio) / "movimentos.csv"
+        gerar_csv(caminho, quantidade_contas, quantidade_linhas)
+
+        inicio = perf_counter()
+        lote = motor.carregar_csv(caminho)
+        print(f"CSV com {quantidade_linhas} linhas lido em {perf_counter() - inicio:.2f}s")
+
+        contas_sequencial = contas_por_numero(quantidade_contas)
+        inicio = perf_counter()
+        aceitas_sequencial = processar_sequencial(contas_sequencial, lote)
+        tempo_sequencial = perf_counter() - inicio
+        print(f"Transacao.registrar: {tempo_sequencial:.2f}s ({len(lote) / tempo_sequencial:.0f} linhas/s)")
+
+        modos = [("linha a linha", False)] + ([("vetorizado (NumPy)", True)] if motor.np is not None else [])
+        for nome, vetorizado in modos:
+            contas = contas_por_numero(quantidade_contas)
+            inicio = perf_counter()
+            resultado = motor.processar_lote(contas, lote, vetorizado=vetorizado)
+            duracao = perf_counter() - inicio
+
+            aceitas = {posicao for posicao, motivo in enumerate(resultado.motivos) if not motivo}
+            identico = aceitas == aceitas_sequencial and resumo(contas) == resumo(contas_sequencial)
+            print(
+                f"Lote {nome}: {duracao:.2f}s ({len(lote) / duracao:.0f} linhas/s), "
+                f"{resultado.aceitas} aceitas, {resultado.rejeitadas} rejeitadas, "
+                f"{'idêntico' if identico else 'DIVERGENTE'} ao caminho sequencial"
+            )
+            if not identico:
+                sys.exit(1)
+
+        motor.escrever_rejeicoes(Path(diretorio) / "rejeitadas.csv", resultado)
+
+
+if __name__ == "__main__":
+    contas = int(sys.argv[1]) if len(sys.argv) > 1 else CONTAS
+    linhas = int(sys.argv[2]) if len(sys.argv) > 2 else LINHAS
+    main(contas, linhas)
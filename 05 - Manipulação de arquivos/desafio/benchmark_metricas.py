@@ -0,0 +1,67 @@
+import contextlib
+import os
+import sys
+import threading
+from time import perf_counter
+
+from desafio_v2 import ContaCorrente, PessoaFisica
+from metricas import Metricas
+
+CHAMADAS = 1_000_000
+THREADS = 4
+
+
+def chamar(funcao, chamadas):
+    for _ in range(chamadas):
+        funcao(1.0)
+
+
+def medir(funcao, chamadas):
+    # depositar() avisa o resultado com print()
+    with open(os.devnull, "w") as descarte, contextlib.redirect_stdout(descarte):
+        inicio = perf_counter()
+        chamar(funcao, chamadas)
+        return (perf_counter() - inicio) / chamadas
+
+
+def main(chamadas):
+    cliente = PessoaFisica(nome="Cliente", data_nascimento="01-01-1990", cpf="00000000001", endereco="Rua A")
+    conta = ContaCorrente(numero=1, cliente=cliente)
+
+    def vazia(valor):
+        return valor
+
+    print(f"{chamadas} chamadas por cenário")
+    print(f"{'função':<10} | {'amostragem':<12} | {'ns/chamada':>10} | {'custo extra (ns)':>16}")
+    print("-" * 58)
+
+    for nome, funcao in (("vazia", vazia), ("depositar", conta.depositar)):
+        base = min(medir(funcao, chamadas) for _ in range(3))
+        print(f"{nome:<10} | {'sem métricas':<12} | {base * 1e9:>10.0f} | {'-':>16}")
+
+        for amostragem in (0, 100, 1):
+            metricas = Metricas(amostragem=amostragem)
+            instrumentada = metricas.instrumentar(nome)(funcao)
+            tempo = min(medir(instrumentada, chamadas) for _ in range(3))
+            rotulo = "desligada" if amostragem == 0 else f"1/{amostragem}"
+            print(f"{nome:<10} | {rotulo:<12} | {tempo * 1e9:>10.0f} | {(tempo - base) * 1e9:>16.0f}")
+
+    # Contadores por thread: nenhuma chamada se perde sem trava no caminho quente
+    metricas = Metricas(amostragem=10)
+    instrumentada = metricas.instrumentar("vazia")(vazia)
+    threads = [threading.Thread(target=chamar, args=(instrumentada, chamadas // THREADS)) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    contador = metricas.snapshot()["vazia"]
+    esperado = THREADS * (chamadas // THREADS)
+    print(f"\n{THREADS} threads: {contador['chamadas']} chamadas contadas de {esperado}")
+    print(f"{contador['amostras']} amostras de latência (1/10)")
+    if contador["chamadas"] != esperado:
+        sys.exit("Contagem divergente!")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else CHAMADAS)
@@ -0,0 +1,64 @@
+import os
+import random
+import sys
+from time import perf_counter
+
+from particionado import LivroParticionado, _executar_operacao
+
+CONTAS = 10_000
+OPERACOES = 500_000
+
+
+def gerar_operacoes(quantidade_contas, quantidade_operacoes, semente=42):
+    aleatorio = random.Random(semente)
+    operacoes = [("abrir", numero, f"{numero:011d}", f"Cliente {numero}") for numero in range(1, quantidade_contas + 1)]
+    for _ in range(quantidade_operacoes):
+        numero = aleatorio.randint(1, quantidade_contas)
+        if aleatorio.random() < 0.55:
+            operacoes.append(("depositar", numero, round(aleatorio.uniform(1, 700), 2)))
+        else:
+            operacoes.append(("sacar", numero, round(aleatorio.uniform(1, 700), 2)))
+    operacoes.extend(("saldo", numero) for numero in range(1, quantidade_contas + 1))
+    return operacoes
+
+
+def executar_local(operacoes):
+    """Referência em um único processo, sem pipes."""
+    stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+    try:
+        contas = {}
+        return [_executar_operacao(contas, operacao) for operacao in operacoes]
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+
+def main(quantidade_contas, quantidade_operacoes):
+    operacoes = gerar_operacoes(quantidade_contas, quantidade_operacoes)
+    print(f"{len(operacoes)} operações sobre {quantidade_contas} contas ({os.cpu_count()} CPUs disponíveis)")
+
+    inicio = perf_counter()
+    esperado = executar_local(operacoes)
+    duracao = perf_counter() - inicio
+    print(f"Processo único: {duracao:.2f}s ({len(operacoes) / duracao:.0f} operações/s)")
+
+    particoes = sorted({1, 2, 4, os.cpu_count() or 1})
+    for quantidade in particoes:
+        with LivroParticionado(particoes=quantidade) as livro:
+            inicio = perf_counter()
+            resultados = livro.executar(operacoes)
+            duracao = perf_counter() - inicio
+
+        identico = resultados == esperado
+        print(
+            f"{quantidade} partição(ões): {duracao:.2f}s ({len(operacoes) / duracao:.0f} operações/s), "
+            f"{'idêntico' if identico else 'DIVERGENTE'} ao processo único"
+        )
+        if not identico:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    contas = int(sys.argv[1]) if len(sys.argv) > 1 else CONTAS
+    operacoes = int(sys.argv[2]) if len(sys.argv) > 2 else OPERACOES
+    main(contas, operacoes)
@@ -0,0 +1,104 @@
+import gc
+import hashlib
+import random
+import sys
+import tempfile
+from time import perf_counter, time
+
+from desafio_v2 import CODIGOS_TRANSACAO, ClienteRegistry, ContaCorrente, PessoaFisica
+from persistencia import Persistencia
+
+CONTAS = 1_000_000
+TRANSACOES_POR_CONTA = 2
+PROPORCAO_WAL = 0.1
+
+
+def resumo(contas):
+    digest = hashlib.blake2b(digest_size=16)
+    for conta in contas:
+        historico = conta.historico
+        digest.update(f"{conta.numero}|{conta.cliente.cpf}|{conta.saldo!r}|".encode())
+        digest.update(historico._tipos.tobytes())
+        digest.update(historico._valores.tobytes())
+        digest.update(historico._datas.tobytes())
+    return digest.hexdigest()
+
+
+def criar_banco(quantidade):
+    clientes = ClienteRegistry()
+    contas = []
+    agora = int(time())
+    for numero in range(1, quantidade + 1):
+        cliente = PessoaFisica(nome=f"Cliente {numero}", data_nascimento="01-01-1990", cpf=f"{numero:011d}", endereco="Rua A")
+        conta = ContaCorrente(numero=numero, cliente=cliente, limite=500, limite_saques=50)
+        clientes.adicionar(cliente)
+        cliente.adicionar_conta(conta)
+        contas.append(conta)
+        for indice in range(TRANSACOES_POR_CONTA):
+            conta.aplicar_transacao(CODIGOS_TRANSACAO["Deposito"], 100.0 + indice, agora + indice)
+    return clientes, contas
+
+
+def main(quantidade):
+    aleatorio = random.Random(42)
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        inicio = perf_counter()
+        clientes, contas = criar_banco(quantidade)
+        print(f"Banco com {quantidade} contas criado em {perf_counter() - inicio:.2f}s")
+
+        cauda = int(quantidade * PROPORCAO_WAL)
+        # O limite de registros dispara, no meio da cauda do WAL, um snapshot em segundo plano
+        persistencia = Persistencia(diretorio, registros_por_snapshot=max(1, cauda // 2))
+        persistencia.iniciar(clientes, contas)
+
+        inicio = perf_counter()
+        persistencia.salvar_snapshot()
+        print(f"Snapshot gravado em {perf_counter() - inicio:.2f}s ({persistencia.caminho_snapshot.stat().st_size / 2**20:.1f} MiB)")
+
+        inicio = perf_counter()
+        pausa = 0.0
+        agora = int(time()) + TRANSACOES_POR_CONTA
+        for _ in range(cauda):
+            conta = contas[aleatorio.randrange(quantidade)]
+            conta.aplicar_transacao(CODIGOS_TRANSACAO["Saque"], 10.0, agora)
+            antes = perf_counter()
+            persistencia.registrar_evento("transacao", conta, CODIGOS_TRANSACAO["Saque"], 10.0, agora)
+            pausa = max(pausa, perf_counter() - antes)
+        with persistencia._trava:
+            persistencia._sincronizar()
+        duracao = perf_counter() - inicio
+        print(f"WAL: {cauda} registros em {duracao:.2f}s ({cauda / duracao:.0f} registros/s)")
+        inicio = perf_counter()
+        persistencia._aguardar_snapshot()
+        print(
+            f"Maior pausa de um registro: {pausa * 1000:.1f}ms; snapshot em segundo plano terminou "
+            f"{perf_counter() - inicio:.2f}s depois da cauda"
+        )
+
+        # Queda simulada: sem o snapshot de fechar(), a recuperação passa pelo WAL
+        esperado = resumo(contas)
+        persistencia._parar.set()
+        persistencia._sincronizador.join()
+        persistencia._wal.close()
+        persistencia._liberar_diretorio()
+        del clientes, contas, conta, persistencia
+        gc.collect()
+
+        with open(f"{diretorio}/wal.bin", "ab") as wal:
+            wal.write(b"\x10\x00\x00\x00registro-incompleto")
+
+        inicio = perf_counter()
+        persistencia = Persistencia(diretorio)
+        clientes_carregados, contas = persistencia.carregar(PessoaFisica, ContaCorrente)
+        clientes = ClienteRegistry(clientes_carregados)
+        print(f"Inicialização (snapshot + {cauda} registros do WAL) em {perf_counter() - inicio:.2f}s")
+
+        recuperado = resumo(contas)
+        print(f"Recuperação {'correta' if recuperado == esperado else 'DIVERGENTE'} ({len(clientes)} clientes)")
+        if recuperado != esperado:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else CONTAS)
@@ -0,0 +1,69 @@
+import sys
+from datetime import datetime, timedelta, timezone
+from time import perf_counter, time
+
+from desafio_v2 import CODIGOS_TRANSACAO, SEGUNDOS_POR_DIA, TIPOS_TRANSACAO, ContaCorrente, PessoaFisica
+
+TAMANHOS = (10_000, 100_000, 1_000_000)
+TRANSACOES_POR_DIA = 50
+REPETICOES = 20
+
+
+def criar_conta(quantidade):
+    cliente = PessoaFisica(nome="Cliente", data_nascimento="01-01-1990", cpf="00000000000", endereco="Rua A")
+    conta = ContaCorrente(numero=1, cliente=cliente)
+
+    dias = quantidade // TRANSACOES_POR_DIA
+    inicio = (int(time()) // SEGUNDOS_POR_DIA - dias) * SEGUNDOS_POR_DIA
+    for indice in range(quantidade):
+        codigo = CODIGOS_TRANSACAO["Saque"] if indice % 4 == 0 else CODIGOS_TRANSACAO["Deposito"]
+        data = inicio + (indice // TRANSACOES_POR_DIA) * SEGUNDOS_POR_DIA + indice % TRANSACOES_POR_DIA
+        conta.aplicar_transacao(codigo, 10.0, data)
+
+    return conta
+
+
+def relatorio_varredura(historico, tipo_transacao=None, inicio=None, fim=None):
+    """Filtro linear equivalente, sobre todo o histórico."""
+    tipos = None if tipo_transacao is None else {tipo.lower() for tipo in tipo_transacao}
+    inicio = float("-inf") if inicio is None else inicio.timestamp()
+    fim = float("inf") if fim is None else fim.timestamp()
+    for posicao in range(len(historico._tipos)):
+        if tipos is not None and TIPOS_TRANSACAO[historico._tipos[posicao]].lower() not in tipos:
+            continue
+        if inicio <= historico._datas[posicao] < fim:
+            yield historico._transacao(posicao)
+
+
+def medir(funcao, repeticoes):
+    inicio = perf_counter()
+    for _ in range(repeticoes):
+        resultado = list(funcao())
+    return (perf_counter() - inicio) / repeticoes, resultado
+
+
+def main(tamanhos):
+    hoje = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    consultas = {
+        "últimos 30 dias": {"inicio": hoje - timedelta(days=30)},
+        "saques em um mês": {"tipo_transacao": ["saque"], "inicio": hoje - timedelta(days=60), "fim": hoje - timedelta(days=30)},
+        "saques e depósitos de um dia": {"tipo_transacao": ["Saque", "Deposito"], "inicio": hoje - timedelta(days=1), "fim": hoje},
+    }
+
+    for quantidade in tamanhos:
+        historico = criar_conta(quantidade).historico
+        print(f"Histórico com {quantidade} transações")
+        for nome, filtros in consultas.items():
+            indexado, resultado = medir(lambda: historico.gerar_relatorio(**filtros), REPETICOES)
+            varredura, esperado = medir(lambda: relatorio_varredura(historico, **filtros), 1)
+            if resultado != esperado:
+                print(f"Consulta '{nome}' DIVERGENTE da varredura")
+                sys.exit(1)
+            print(
+                f"  {nome:30} {len(resultado):6} linhas  "
+                f"bisect {indexado * 1e3:9.3f} ms  varredura {varredura * 1e3:9.3f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main([int(tamanho) for tamanho in sys.argv[1:]] or TAMANHOS)
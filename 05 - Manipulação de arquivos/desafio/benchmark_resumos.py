@@ -0,0 +1,75 @@
+import sys
+from time import perf_counter, time
+
+from desafio_v2 import (
+    CODIGOS_TRANSACAO,
+    SEGUNDOS_POR_DIA,
+    ContaCorrente,
+    PessoaFisica,
+    recalcular_resumos,
+)
+
+TRANSACOES = 1_000_000
+CONTAS = 10_000
+TRANSACOES_POR_CONTA = 100
+TRANSACOES_POR_DIA = 50
+REPETICOES = 1_000
+
+
+def criar_conta(numero, quantidade):
+    cliente = PessoaFisica(nome="Cliente", data_nascimento="01-01-1990", cpf=f"{numero:011d}", endereco="Rua A")
+    conta = ContaCorrente(numero=numero, cliente=cliente)
+    hoje = int(time()) // SEGUNDOS_POR_DIA
+    inicio = (hoje - quantidade // TRANSACOES_POR_DIA) * SEGUNDOS_POR_DIA
+    for indice in range(quantidade):
+        codigo = CODIGOS_TRANSACAO["Saque"] if indice % 3 == 0 else CODIGOS_TRANSACAO["Deposito"]
+        data = inicio + (indice // TRANSACOES_POR_DIA) * SEGUNDOS_POR_DIA + indice % TRANSACOES_POR_DIA
+        conta.aplicar_transacao(codigo, float(indice % 100), data)
+    return conta
+
+
+def saques_varredura(historico, inicio, fim):
+    """Caminho anterior: percorre Historico.transacoes somando os saques do período."""
+    total = quantidade = 0
+    for posicao, transacao in enumerate(historico.transacoes):
+        if transacao["tipo"] == "Saque" and inicio <= historico._datas[posicao] < fim:
+            total += transacao["valor"]
+            quantidade += 1
+    return quantidade, total
+
+
+def medir(funcao, repeticoes):
+    inicio = perf_counter()
+    for _ in range(repeticoes):
+        resultado = funcao()
+    return (perf_counter() - inicio) / repeticoes, resultado
+
+
+def main(quantidade):
+    conta = criar_conta(1, quantidade)
+    historico = conta.historico
+    hoje = int(time()) // SEGUNDOS_POR_DIA * SEGUNDOS_POR_DIA
+    print(f"Histórico com {quantidade} transações ({len(historico._dias)} dias)")
+
+    for nome, inicio in (("hoje", hoje), ("últimos 30 dias", hoje - 30 * SEGUNDOS_POR_DIA)):
+        fim = hoje + SEGUNDOS_POR_DIA
+        resumido, resumo = medir(lambda: historico.resumo_periodo(inicio, fim), REPETICOES)
+        varredura, (quantidade_saques, total_saques) = medir(lambda: saques_varredura(historico, inicio, fim), 1)
+        if (resumo.quantidade("Saque"), resumo.total("Saque")) != (quantidade_saques, total_saques):
+            print(f"Resumo de '{nome}' DIVERGENTE da varredura")
+            sys.exit(1)
+        print(f"  saques {nome:<16} resumos {resumido * 1e6:10.2f} us   varredura {varredura * 1e3:10.2f} ms")
+
+    if resumo.saldo != conta.saldo:
+        print("Saldo de fechamento DIVERGENTE do saldo da conta")
+        sys.exit(1)
+
+    contas = [criar_conta(numero, TRANSACOES_POR_CONTA) for numero in range(1, CONTAS + 1)]
+    inicio = perf_counter()
+    transacoes = recalcular_resumos(contas)
+    duracao = perf_counter() - inicio
+    print(f"Backfill: {CONTAS} contas, {transacoes} transações em {duracao:.2f}s ({transacoes / duracao:.0f} transações/s)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else TRANSACOES)
@@ -0,0 +1,82 @@
+import gc
+import sys
+import tracemalloc
+from types import CellType, FunctionType
+
+from benchmark_suite import carregar_versao
+from desafio_v2 import Cliente, Conta, ContaCorrente, Deposito, Historico, PessoaFisica, Saque, Transacao
+
+CONTAS = 100_000
+TRANSACOES = 1_000_000
+
+
+def sem_slots(classe, *bases):
+    """Cópia da classe com __dict__ por instância, equivalente ao modelo antes dos __slots__."""
+    slots = vars(classe).get("__slots__", ())
+    atributos = {nome: valor for nome, valor in vars(classe).items() if nome not in slots and nome != "__slots__"}
+    copia = type(classe)(classe.__name__, bases or (object,), atributos)
+
+    # Métodos com super() sem argumentos guardam a classe original na célula __class__
+    for nome, valor in atributos.items():
+        if isinstance(valor, FunctionType) and "__class__" in valor.__code__.co_freevars:
+            celulas = tuple(
+                CellType(copia) if livre == "__class__" else celula
+                for livre, celula in zip(valor.__code__.co_freevars, valor.__closure__)
+            )
+            funcao = FunctionType(valor.__code__, valor.__globals__, valor.__name__, valor.__defaults__, celulas)
+            funcao.__kwdefaults__ = valor.__kwdefaults__
+            setattr(copia, nome, funcao)
+    return copia
+
+
+ClienteDict = sem_slots(Cliente)
+PessoaFisicaDict = sem_slots(PessoaFisica, ClienteDict)
+ContaDict = sem_slots(Conta)
+ContaCorrenteDict = sem_slots(ContaCorrente, ContaDict)
+HistoricoDict = sem_slots(Historico)
+SaqueDict = sem_slots(Saque, Transacao)
+DepositoDict = sem_slots(Deposito, Transacao)
+
+# Referência: o modelo antes dos índices e colunas do histórico, preservado na cópia do módulo 06
+base = carregar_versao("06/v2")
+
+MODELOS = {
+    "antes (06/v2)": (base.PessoaFisica, base.ContaCorrente, base.Historico, base.Saque, base.Deposito),
+    "com __dict__": (PessoaFisicaDict, ContaCorrenteDict, HistoricoDict, SaqueDict, DepositoDict),
+    "com __slots__": (PessoaFisica, ContaCorrente, Historico, Saque, Deposito),
+}
+
+
+def medir(fabrica, quantidade):
+    gc.collect()
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    objetos = [fabrica(indice) for indice in range(quantidade)]
+    depois = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # A lista que guarda os objetos não faz parte do custo medido
+    return (depois - antes - sys.getsizeof(objetos)) / quantidade
+
+
+def main(quantidade_contas, quantidade_transacoes):
+    for nome, (classe_cliente, classe_conta, classe_historico, classe_saque, classe_deposito) in MODELOS.items():
+
+        def criar_conta(numero):
+            cliente = classe_cliente(nome=f"Cliente {numero}", data_nascimento="01-01-1990", cpf=f"{numero:011d}", endereco="Rua A")
+            conta = classe_conta(numero=numero, cliente=cliente, limite=500, limite_saques=50)
+            conta._historico = classe_historico()
+            cliente.adicionar_conta(conta)
+            return conta
+
+        def criar_transacao(indice):
+            return classe_deposito(float(indice)) if indice % 2 else classe_saque(float(indice))
+
+        por_conta = medir(criar_conta, quantidade_contas)
+        por_transacao = medir(criar_transacao, quantidade_transacoes)
+        print(f"Modelo {nome}: {por_conta:.0f} bytes por conta (cliente + conta + histórico), {por_transacao:.0f} bytes por transação")
+
+
+if __name__ == "__main__":
+    contas = int(sys.argv[1]) if len(sys.argv) > 1 else CONTAS
+    transacoes = int(sys.argv[2]) if len(sys.argv) > 2 else TRANSACOES
+    main(contas, transacoes)
@@ -0,0 +1,208 @@
+import argparse
+import contextlib
+import importlib.util
+import inspect
+import json
+import os
+import platform
+import random
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter
+
+RAIZ = Path(__file__).resolve().parents[2]
+
+# Versões orientadas a objetos do desafio; as de 00 e 01 são procedurais e não têm essas classes
+VERSOES = {
+    "02/v1": "02 - Programação Orientada a Objetos/10 - desafio/desafio_v1.py",
+    "02/v2": "02 - Programação Orientada a Objetos/10 - desafio/desafio_v2.py",
+    "03/v1": "03 - Decoradores, Iteradores e Geradores/desafio/desafio_v1.py",
+    "03/v2": "03 - Decoradores, Iteradores e Geradores/desafio/desafio_v2.py",
+    "04/v1": "04 - Data e hora/desafio/desafio_v1.py",
+    "04/v2": "04 - Data e hora/desafio/desafio_v2.py",
+    "05/v1": "05 - Manipulação de arquivos/desafio/desafio_v1.py",
+    "05/v2": "05 - Manipulação de arquivos/desafio/desafio_v2.py",
+    "06/v1": "06 - Gerenciamento de pacotes e boas práticas/desafio/desafio_v1.py",
+    "06/v2": "06 - Gerenciamento de pacotes e boas práticas/desafio/desafio_v2.py",
+    "14": "14 - Resolução de desafios/desafio-classes-python.py",
+}
+TAMANHOS = (1_000, 10_000, 100_000, 1_000_000)
+ORCAMENTO = 0.2  # segundos por medição
+REPETICOES_MAXIMAS = 100_000
+
+
+def carregar_versao(nome):
+    caminho = RAIZ / VERSOES[nome]
+    spec = importlib.util.spec_from_file_location(f"desafio_{nome.replace('/', '_')}", caminho)
+    modulo = importlib.util.module_from_spec(spec)
+    sys.path.insert(0, str(caminho.parent))
+    try:
+        spec.loader.exec_module(modulo)
+    finally:
+        sys.path.remove(str(caminho.parent))
+    return modulo
+
+
+def gerar_clientes(modulo, quantidade, aleatorio, nomes=None):
+    # Com `nomes`, os titulares se repetem: "Cliente 42" é o nome de um a cada `nomes` clientes
+    cpfs = aleatorio.sample(range(10**10, 10**11), quantidade)
+    nomes = nomes or quantidade
+    return [
+        modulo.PessoaFisica(
+            nome=f"Cliente {indice % nomes}", data_nascimento="01-01-1990", cpf=str(cpf), endereco="Rua A, 1"
+        )
+        for indice, cpf in enumerate(cpfs)
+    ]
+
+
+def colecao_clientes(modulo, clientes):
+    return modulo.ClienteRegistry(clientes) if hasattr(modulo, "ClienteRegistry") else list(clientes)
+
+
+def gerar_contas(modulo, clientes, contas_por_cliente=1, limite=500, limite_saques=10**9):
+    contas = []
+    for cliente in clientes:
+        for _ in range(contas_por_cliente):
+            conta = modulo.ContaCorrente(
+                numero=len(contas) + 1, cliente=cliente, limite=limite, limite_saques=limite_saques
+            )
+            cliente.adicionar_conta(conta)
+            contas.append(conta)
+    return contas
+
+
+def gerar_historico(modulo, conta, quantidade, aleatorio):
+    for _ in range(quantidade):
+        valor = aleatorio.randint(1, 50_000) / 100
+        transacao = modulo.Deposito(valor) if aleatorio.random() < 0.6 else modulo.Saque(valor)
+        conta.historico.adicionar_transacao(transacao)
+    conta._saldo = 10.0**12
+
+
+def medir(funcao):
+    inicio = perf_counter()
+    funcao()
+    primeira = perf_counter() - inicio
+
+    repeticoes = max(1, min(REPETICOES_MAXIMAS, int(ORCAMENTO / max(primeira, 1e-9))))
+    if primeira >= ORCAMENTO:
+        return primeira, 1
+
+    inicio = perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (perf_counter() - inicio) / repeticoes, repeticoes
+
+
+def operacoes(modulo, tamanho, aleatorio):
+    """Gera (operação, função medida) para uma versão e um tamanho, montando só os dados de cada grupo."""
+    clientes = gerar_clientes(modulo, tamanho, aleatorio)
+
+    if hasattr(modulo, "filtrar_cliente"):
+        colecao = colecao_clientes(modulo, clientes)
+        cpfs = [cliente.cpf for cliente in aleatorio.sample(clientes, min(tamanho, 1_000))]
+        proximo = iter(cpfs * (REPETICOES_MAXIMAS // len(cpfs) + 2)).__next__
+        yield "filtrar_cliente", lambda: modulo.filtrar_cliente(proximo(), colecao)
+        del colecao
+
+    contas = gerar_contas(modulo, clientes)
+    listar = getattr(modulo, "listar_contas", None) or getattr(modulo, "listarContas", None)
+    if listar is not None:
+        yield "listar_contas", lambda: listar(contas)
+    del contas
+
+    # Operações por conta sobre um histórico de `tamanho` transações
+    cliente = clientes[0]
+    conta = cliente.contas[0]
+    del clientes
+    gerar_historico(modulo, conta, tamanho, aleatorio)
+
+    yield "Conta.depositar", lambda: conta.depositar(10.0)
+    yield "Conta.sacar", lambda: conta.sacar(10.0)
+    # Nas versões com limite diário, o histórico gerado hoje já esgota a cota e a chamada para na checagem: uma chamada
+    # de teste decide o nome, para a comparação entre versões não misturar o caminho recusado com o aceito
+    antes = len(conta.historico.transacoes)
+    cliente.realizar_transacao(conta, modulo.Deposito(1.0))
+    recusada = len(conta.historico.transacoes) == antes
+    realizar = "Cliente.realizar_transacao(recusada)" if recusada else "Cliente.realizar_transacao"
+    yield realizar, lambda: cliente.realizar_transacao(conta, modulo.Deposito(1.0))
+    # Em algumas versões gerar_relatorio ainda é só um esboço (pass)
+    if inspect.isgeneratorfunction(getattr(type(conta.historico), "gerar_relatorio", None)):
+        yield "Historico.gerar_relatorio", lambda: sum(1 for _ in conta.historico.gerar_relatorio())
+        yield "Historico.gerar_relatorio(saque)", lambda: sum(1 for _ in conta.historico.gerar_relatorio("saque"))
+
+
+def executar(versoes, tamanhos, semente):
+    resultados = []
+    with open(os.devnull, "w") as descarte:
+        for nome in versoes:
+            with contextlib.redirect_stdout(descarte):
+                modulo = carregar_versao(nome)
+            for tamanho in tamanhos:
+                aleatorio = random.Random(f"{semente}-{tamanho}")
+                with contextlib.redirect_stdout(descarte):
+                    medicoes = [(operacao, *medir(funcao)) for operacao, funcao in operacoes(modulo, tamanho, aleatorio)]
+                for operacao, segundos, repeticoes in medicoes:
+                    resultados.append(
+                        {
+                            "versao": nome,
+                            "operacao": operacao,
+                            "tamanho": tamanho,
+                            "repeticoes": repeticoes,
+                            "us_por_chamada": round(segundos * 1e6, 3),
+                        }
+                    )
+                    print(f"{nome:<6} {operacao:<36} n={tamanho:<8} {segundos * 1e6:14.2f} us", file=sys.stderr)
+    return resultados
+
+
+def comparar(base, atual, tolerancia):
+    anteriores = {(r["versao"], r["operacao"], r["tamanho"]): r["us_por_chamada"] for r in base["resultados"]}
+    regressoes = []
+    for resultado in atual["resultados"]:
+        anterior = anteriores.get((resultado["versao"], resultado["operacao"], resultado["tamanho"]))
+        if anterior and resultado["us_por_chamada"] > anterior * (1 + tolerancia):
+            regressoes.append((resultado, resultado["us_por_chamada"] / anterior))
+
+    for resultado, razao in regressoes:
+        print(
+            f"REGRESSÃO {resultado['versao']} {resultado['operacao']} n={resultado['tamanho']}: {razao:.2f}x mais lento",
+            file=sys.stderr,
+        )
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede as operações do banco em todas as versões do desafio.")
+    parser.add_argument("--versoes", nargs="+", choices=list(VERSOES), default=list(VERSOES))
+    parser.add_argument("--tamanhos", nargs="+", type=int, default=list(TAMANHOS))
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", type=Path, default=None, help="arquivo JSON (padrão: stdout)")
+    parser.add_argument("--comparar", type=Path, default=None, help="JSON de uma execução anterior")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="piora relativa aceita na comparação")
+    args = parser.parse_args()
+
+    relatorio = {
+        "meta": {
+            "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "semente": args.semente,
+            "orcamento_s": ORCAMENTO,
+        },
+        "resultados": executar(args.versoes, args.tamanhos, args.semente),
+    }
+
+    texto = json.dumps(relatorio, ensure_ascii=False, indent=2)
+    if args.saida:
+        args.saida.write_text(texto + "\n", encoding="utf-8")
+    else:
+        print(texto)
+
+    if args.comparar and comparar(json.loads(args.comparar.read_text(encoding="utf-8")), relatorio, args.tolerancia):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
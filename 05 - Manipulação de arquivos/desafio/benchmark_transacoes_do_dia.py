@@ -0,0 +1,56 @@
+import sys
+from datetime import datetime
+from time import perf_counter, time
+
+from desafio_v2 import SEGUNDOS_POR_DIA, ContaCorrente, Deposito, PessoaFisica, Saque
+
+QUANTIDADE = 100_000
+TRANSACOES_POR_DIA = 50
+REPETICOES = 1_000
+
+
+def criar_conta(quantidade):
+    cliente = PessoaFisica(nome="Cliente", data_nascimento="01-01-1990", cpf="00000000000", endereco="Rua A")
+    conta = ContaCorrente(numero=1, cliente=cliente)
+
+    dias = quantidade // TRANSACOES_POR_DIA
+    inicio = int(time()) - dias * SEGUNDOS_POR_DIA
+    for indice in range(quantidade):
+        transacao = Saque(10.0) if indice % 2 else Deposito(20.0)
+        data = inicio + (indice // TRANSACOES_POR_DIA) * SEGUNDOS_POR_DIA + indice % TRANSACOES_POR_DIA
+        conta.historico.adicionar_transacao(transacao, data=data)
+
+    return conta
+
+
+def transacoes_do_dia_strptime(historico):
+    data_atual = datetime.utcnow().date()
+    transacoes = []
+    for transacao in historico.transacoes:
+        data_transacao = datetime.strptime(transacao["data"], "%d-%m-%Y %H:%M:%S").date()
+        if data_atual == data_transacao:
+            transacoes.append(transacao)
+    return transacoes
+
+
+def medir(funcao, repeticoes):
+    inicio = perf_counter()
+    for _ in range(repeticoes):
+        len(funcao())
+    return (perf_counter() - inicio) / repeticoes
+
+
+def main(quantidade):
+    conta = criar_conta(quantidade)
+    historico = conta.historico
+
+    indexado = medir(historico.transacoes_do_dia, REPETICOES)
+    varredura = medir(lambda: transacoes_do_dia_strptime(historico), 1)
+
+    print(f"Histórico com {quantidade} transações")
+    print(f"Índice por dia:       {indexado * 1e6:12.2f} us/verificação")
+    print(f"Varredura (strptime): {varredura * 1e6:12.2f} us/verificação")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else QUANTIDADE)
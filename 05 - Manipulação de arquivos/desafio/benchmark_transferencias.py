@@ -0,0 +1,112 @@
+import contextlib
+import os
+import random
+import sys
+import threading
+from time import perf_counter
+
+import desafio_v2
+from benchmark_suite import gerar_clientes, gerar_contas
+from desafio_v2 import CREDITOS, Deposito, Transferencia
+
+THREADS = 16
+CONTAS = 8
+TRANSFERENCIAS_POR_THREAD = 20_000
+SALDO_INICIAL = 10_000.0
+PRAZO = 120  # segundos; uma thread ainda viva depois disso indica impasse entre travas
+
+
+def trabalhador(contas, transferencias, semente, erros, barreira):
+    aleatorio = random.Random(semente)
+    barreira.wait()
+    for _ in range(transferencias):
+        origem, destino = aleatorio.sample(contas, 2)
+        # Valores inteiros: as somas em float são exatas e a conservação pode ser comparada com ==
+        valor = float(aleatorio.randint(1, 500))
+        try:
+            Transferencia(valor, destino).registrar(origem)
+        except Exception as exc:
+            erros.append(f"{exc.__class__.__name__}: {exc}")
+
+
+def verificar(contas):
+    """Devolve as inconsistências: dinheiro criado ou destruído, saldo divergente do histórico, débito sem crédito."""
+    problemas = []
+    total = sum(conta.saldo for conta in contas)
+    if total != SALDO_INICIAL * len(contas):
+        problemas.append(f"total {total} != {SALDO_INICIAL * len(contas)} inicial")
+
+    enviadas, recebidas = 0.0, 0.0
+    for conta in contas:
+        historico = conta.historico
+        saldo = 0.0
+        for codigo, valor in zip(historico._tipos, historico._valores):
+            saldo += valor if codigo in CREDITOS else -valor
+            if saldo < 0:
+                problemas.append(f"conta {conta.numero}: saldo negativo {saldo} no histórico")
+                break
+        if saldo != conta.saldo:
+            problemas.append(f"conta {conta.numero}: saldo {conta.saldo} != histórico {saldo}")
+        enviadas += historico.total("TransferenciaEnviada")
+        recebidas += historico.total("TransferenciaRecebida")
+
+    if enviadas != recebidas:
+        problemas.append(f"transferências enviadas {enviadas} != recebidas {recebidas}")
+    return problemas
+
+
+def executar(quantidade_travas, quantidade_threads, quantidade_contas, transferencias):
+    desafio_v2.ativar_concorrencia(quantidade_travas)
+    contas = gerar_contas(desafio_v2, gerar_clientes(desafio_v2, quantidade_contas, random.Random(42)), limite=10**9)
+    for conta in contas:
+        Deposito(SALDO_INICIAL).registrar(conta)
+    erros = []
+    barreira = threading.Barrier(quantidade_threads + 1)
+    threads = [
+        threading.Thread(target=trabalhador, args=(contas, transferencias, semente, erros, barreira), daemon=True)
+        for semente in range(quantidade_threads)
+    ]
+    for thread in threads:
+        thread.start()
+
+    barreira.wait()
+    inicio = perf_counter()
+    for thread in threads:
+        thread.join(PRAZO)
+        if thread.is_alive():
+            return perf_counter() - inicio, 0, [f"impasse: thread ainda travada após {PRAZO}s"]
+    duracao = perf_counter() - inicio
+
+    desafio_v2.desativar_concorrencia()
+    realizadas = sum(conta.historico.quantidade("TransferenciaEnviada") for conta in contas)
+    return duracao, realizadas, erros + verificar(contas)
+
+
+def main(quantidade_threads, quantidade_contas, transferencias):
+    total = quantidade_threads * transferencias
+    print(f"{quantidade_threads} threads, {quantidade_contas} contas, {total} transferências aleatórias")
+
+    # Trocas de thread frequentes expõem as janelas entre o débito e o crédito
+    sys.setswitchinterval(1e-6)
+    modos = [("trava global", 1), ("64 travas listradas", 64)]
+    falhou = False
+    with contextlib.redirect_stdout(open(os.devnull, "w")) as saida:
+        resultados = [(nome, *executar(travas, quantidade_threads, quantidade_contas, transferencias)) for nome, travas in modos]
+        saida.close()
+
+    for nome, duracao, realizadas, problemas in resultados:
+        situacao = "dinheiro conservado" if not problemas else f"{len(problemas)} inconsistências, ex.: {problemas[0]}"
+        print(
+            f"{nome:<20} {duracao:6.2f}s ({total / duracao:8.0f} transferências/s, {realizadas} com saldo)  {situacao}"
+        )
+        falhou = falhou or bool(problemas)
+
+    if falhou:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else THREADS
+    contas = int(sys.argv[2]) if len(sys.argv) > 2 else CONTAS
+    transferencias = int(sys.argv[3]) if len(sys.argv) > 3 else TRANSFERENCIAS_POR_THREAD
+    main(threads, contas, transferencias)
@@ -0,0 +1,118 @@
+import argparse
+import asyncio
+import json
+import random
+import socket
+import subprocess
+import sys
+from pathlib import Path
+from statistics import quantiles
+from time import perf_counter
+
+from servidor import LIMITE_LINHA
+
+ROOT_PATH = Path(__file__).parent
+
+
+def gerar_requisicoes(indice, quantidade, aleatorio):
+    cpf = f"{indice:011d}"
+    yield {"op": "cliente", "cpf": cpf, "nome": f"Cliente {indice}", "data_nascimento": "01-01-1990", "endereco": "Rua A"}
+    yield {"op": "conta", "cpf": cpf}
+    for _ in range(quantidade - 2):
+        sorteio = aleatorio.random()
+        if sorteio < 0.4:
+            yield {"op": "depositar", "cpf": cpf, "valor": round(aleatorio.uniform(1, 1000), 2)}
+        elif sorteio < 0.7:
+            yield {"op": "sacar", "cpf": cpf, "valor": round(aleatorio.uniform(1, 500), 2)}
+        elif sorteio < 0.95:
+            yield {"op": "extrato", "cpf": cpf, "limite": 20}
+        else:
+            yield {"op": "contas", "offset": aleatorio.randrange(indice + 1), "limite": 20}
+
+
+async def conexao(host, porta, indice, quantidade, janela, latencias, resultados):
+    reader, writer = await asyncio.open_connection(host, porta, limit=LIMITE_LINHA)
+    aleatorio = random.Random(indice)
+    livres = asyncio.Semaphore(janela)
+    enviadas = {}
+
+    async def enviar():
+        for identificador, requisicao in enumerate(gerar_requisicoes(indice, quantidade, aleatorio)):
+            await livres.acquire()
+            requisicao["id"] = identificador
+            enviadas[identificador] = perf_counter()
+            writer.write(json.dumps(requisicao).encode("utf-8") + b"\n")
+            await writer.drain()
+
+    envio = asyncio.create_task(enviar())
+    for _ in range(quantidade):
+        resposta = json.loads(await reader.readline())
+        latencias.append(perf_counter() - enviadas.pop(resposta["id"]))
+        resultados["ok" if resposta["ok"] else "erro"] += 1
+        livres.release()
+
+    await envio
+    writer.close()
+    await writer.wait_closed()
+
+
+async def gerar_carga(host, porta, conexoes, requisicoes, janela):
+    latencias = []
+    resultados = {"ok": 0, "erro": 0}
+    inicio = perf_counter()
+    await asyncio.gather(
+        *(conexao(host, porta, indice, requisicoes, janela, latencias, resultados) for indice in range(1, conexoes + 1))
+    )
+    return perf_counter() - inicio, latencias, resultados
+
+
+def porta_livre(host):
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gerador de carga local para servidor.py.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=None, help="servidor já em execução (padrão: inicia um)")
+    parser.add_argument("--conexoes", type=int, default=1000)
+    parser.add_argument("--requisicoes", type=int, default=100, help="requisições por conexão")
+    parser.add_argument("--janela", type=int, default=16, help="requisições em voo por conexão (pipeline)")
+    args = parser.parse_args()
+
+    processo = None
+    porta = args.porta
+    if porta is None:
+        porta = porta_livre(args.host)
+        processo = subprocess.Popen(
+            [sys.executable, str(ROOT_PATH / "servidor.py"), "--host", args.host, "--porta", str(porta)],
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        print(processo.stderr.readline().strip(), file=sys.stderr)
+
+    try:
+        duracao, latencias, resultados = asyncio.run(
+            gerar_carga(args.host, porta, args.conexoes, args.requisicoes, args.janela)
+        )
+    finally:
+        if processo is not None:
+            processo.terminate()
+            processo.wait()
+
+    total = len(latencias)
+    # Inclusivo: nenhum percentil passa da maior latência medida; com menos de duas respostas, todos são ela
+    maior = max(latencias, default=0.0)
+    percentis = quantiles(latencias, n=100, method="inclusive") if total > 1 else [maior] * 99
+    print(f"{args.conexoes} conexões x {args.requisicoes} requisições, janela {args.janela}")
+    print(f"{total} respostas em {duracao:.2f}s ({total / duracao:.0f} requisições/s)")
+    print(f"ok: {resultados['ok']} | recusadas pelo domínio: {resultados['erro']}")
+    print(
+        f"latência p50 {percentis[49] * 1e3:.2f} ms | p90 {percentis[89] * 1e3:.2f} ms | "
+        f"p99 {percentis[98] * 1e3:.2f} ms | máx {maior * 1e3:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import argparse
+import json
+import zlib
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT_PATH = Path(__file__).parent
+
+FORMATO_DATA = "%Y-%m-%d %H:%M:%S"
+
+
+def para_timestamp(data):
+    if data is None or isinstance(data, (int, float)):
+        return data
+    if isinstance(data, str):
+        data = datetime.strptime(data, FORMATO_DATA)
+    if data.tzinfo is None:
+        data = data.replace(tzinfo=timezone.utc)
+    return data.timestamp()
+
+
+class IndiceLog:
+    def __init__(self, caminho_log, caminho_indice=None):
+        self.caminho_log = Path(caminho_log)
+        self.caminho_indice = (
+            Path(caminho_indice) if caminho_indice else self.caminho_log.with_name(f"{self.caminho_log.name}.idx")
+        )
+        self._limpar()
+        self._carregar()
+
+    def _limpar(self):
+        self._assinatura = None
+        self._fim = 0
+        self._minutos = []
+        self._por_funcao = {}
+
+    def _assinatura_log(self):
+        try:
+            with open(self.caminho_log, "rb") as arquivo:
+                primeira_linha = arquivo.readline(4096)
+        except FileNotFoundError:
+            return None
+        return str(zlib.crc32(primeira_linha)) if primeira_linha.endswith(b"\n") else None
+
+    def _adicionar(self, offset, tamanho, minuto, funcao):
+        insort(self._minutos, (minuto, offset))
+        insort(self._por_funcao.setdefault(funcao, []), (minuto, offset))
+        self._fim = max(self._fim, offset + tamanho)
+
+    def _carregar(self):
+        if not self.caminho_indice.exists():
+            return
+
+        with open(self.caminho_indice, "rb") as arquivo:
+            cabecalho = arquivo.readline()
+            if not cabecalho.startswith(b"#") or not cabecalho.endswith(b"\n"):
+                return
+
+            self._assinatura = cabecalho[1:-1].decode("utf-8", "replace")
+            validos = len(cabecalho)
+            for linha in arquivo:
+                try:
+                    if not linha.endswith(b"\n"):
+                        raise ValueError
+                    offset, tamanho, minuto, funcao = linha[:-1].decode("utf-8").split("\t", 3)
+                    entrada = int(offset), int(tamanho), int(minuto), funcao
+                except ValueError:
+                    break
+                self._adicionar(*entrada)
+                validos += len(linha)
+
+        # Uma linha gravada pela metade (queda no meio da escrita) é cortada com o que vier depois: atualizar() volta a
+        # indexar o log a partir da última entrada válida
+        if validos < self.caminho_indice.stat().st_size:
+            with open(self.caminho_indice, "r+b") as arquivo:
+                arquivo.truncate(validos)
+
+    def atualizar(self):
+        assinatura = self._assinatura_log()
+        if assinatura is None:
+            return 0
+
+        if assinatura != self._assinatura or self.caminho_log.stat().st_size < self._fim:
+            self._limpar()
+            self._assinatura = assinatura
+            with open(self.caminho_indice, "w", encoding="utf-8") as saida:
+                saida.write(f"#{assinatura}\n")
+
+        novos = 0
+        with open(self.caminho_log, "rb") as arquivo, open(self.caminho_indice, "a", encoding="utf-8") as saida:
+            arquivo.seek(self._fim)
+            offset = self._fim
+            for linha in arquivo:
+                if not linha.endswith(b"\n"):
+                    break
+
+                try:
+                    registro = json.loads(linha)
+                    minuto = int(registro["timestamp"] // 60)
+                    funcao = registro["funcao"]
+                except (ValueError, KeyError, TypeError):
+                    offset += len(linha)
+                    continue
+
+                self._adicionar(offset, len(linha), minuto, funcao)
+                saida.write(f"{offset}\t{len(linha)}\t{minuto}\t{funcao}\n")
+                offset += len(linha)
+                novos += 1
+
+        return novos
+
+    def consultar(self, funcao=None, inicio=None, fim=None):
+        # Intervalo [inicio, fim), como em Historico.gerar_relatorio
+        self.atualizar()
+        inicio, fim = para_timestamp(inicio), para_timestamp(fim)
+
+        entradas = self._minutos if funcao is None else self._por_funcao.get(funcao, [])
+        baixo = 0 if inicio is None else bisect_left(entradas, (int(inicio // 60), -1))
+        alto = len(entradas) if fim is None else bisect_right(entradas, (int(fim // 60), float("inf")))
+
+        with open(self.caminho_log, "rb") as arquivo:
+            for _, offset in entradas[baixo:alto]:
+                arquivo.seek(offset)
+                registro = json.loads(arquivo.readline())
+                if inicio is not None and registro["timestamp"] < inicio:
+                    continue
+                if fim is not None and registro["timestamp"] >= fim:
+                    continue
+                yield registro
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Consulta o log de transações em formato JSON Lines.")
+    parser.add_argument("log", nargs="?", default=ROOT_PATH / "log.jsonl", type=Path)
+    parser.add_argument("--funcao", help="nome da função registrada, ex.: sacar")
+    parser.add_argument("--inicio", help=f"data inicial em UTC ({FORMATO_DATA.replace('%', '%%')})")
+    parser.add_argument("--fim", help=f"data final em UTC, exclusiva ({FORMATO_DATA.replace('%', '%%')})")
+    args = parser.parse_args()
+
+    indice = IndiceLog(args.log)
+    for registro in indice.consultar(funcao=args.funcao, inicio=args.inicio, fim=args.fim):
+        print(json.dumps(registro, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,54 +1,298 @@
+import argparse
+import heapq
+import sys
 import textwrap
 from abc import ABC, abstractclassmethod, abstractproperty
-from datetime import datetime
+from array import array
+from bisect import bisect_left
+from collections import deque
+from collections.abc import Sequence
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import islice
+from operator import attrgetter, le
 from pathlib import Path
+from threading import RLock
+from time import time
+from types import MappingProxyType
+
+from escritor_log import FORMATOS, EscritorLog
+from eventos import LojaEventos
+from limitador import BaldeTokens, LimitadorTaxa, LimiteContado, LimiteJanela
+from metricas import Metricas
+from persistencia import DiretorioEmUso, Persistencia
 
 ROOT_PATH = Path(__file__).parent
 
+AGENCIA = "0001"
+SEGUNDOS_POR_DIA = 86400
+TAMANHO_BLOCO_EXTRATO = 256
+
+CODIGOS_TRANSACAO = {
+    "Saque": 1,
+    "Deposito": 2,
+    "TransferenciaEnviada": 3,
+    "TransferenciaRecebida": 4,
+    "Tarifa": 5,
+    "Juros": 6,
+}
+TIPOS_TRANSACAO = {codigo: tipo for tipo, codigo in CODIGOS_TRANSACAO.items()}
+CODIGOS_POR_NOME = {tipo.lower(): codigo for tipo, codigo in CODIGOS_TRANSACAO.items()}
+CREDITOS = {CODIGOS_TRANSACAO["Deposito"], CODIGOS_TRANSACAO["TransferenciaRecebida"], CODIGOS_TRANSACAO["Juros"]}
+# Só o que o cliente faz conta para o limite diário: transferências recebidas, tarifas e juros não gastam a cota dele
+INICIADAS_PELO_CLIENTE = tuple(CODIGOS_TRANSACAO[tipo] for tipo in ("Saque", "Deposito", "TransferenciaEnviada"))
+
+# Colunas e índices de um histórico vazio, compartilhados: cada histórico só aloca os seus no primeiro lançamento, e
+# só Historico._registrar/estender escrevem nas colunas, sempre depois de trocá-las por arrays próprios
+SEM_TIPOS, SEM_VALORES, SEM_DATAS = array("B"), array("d"), array("q")
+SEM_DIAS = MappingProxyType({})
+SEM_POSICOES = MappingProxyType(dict.fromkeys(TIPOS_TRANSACAO, ()))
+SEM_QUANTIDADES = MappingProxyType(dict.fromkeys(TIPOS_TRANSACAO, 0))
+SEM_TOTAIS = MappingProxyType(dict.fromkeys(TIPOS_TRANSACAO, 0.0))
+
+ouvintes = []
+travas_contas = None  # None: modo de uma thread só, sem custo de travas
+
+
+class TravasListradas:
+    def __init__(self, quantidade=64):
+        self._travas = [RLock() for _ in range(quantidade)]
+
+    def __call__(self, numero):
+        return self._travas[hash(numero) % len(self._travas)]
+
+    def __len__(self):
+        return len(self._travas)
+
+    def ordenadas(self, *numeros):
+        # Sempre na ordem das listras: duas transferências em sentidos opostos nunca esperam uma pela outra
+        indices = sorted({hash(numero) % len(self._travas) for numero in numeros})
+        return TravasOrdenadas([self._travas[indice] for indice in indices])
+
+
+class TravasOrdenadas:
+    __slots__ = ("_travas",)
+
+    def __init__(self, travas):
+        self._travas = travas
+
+    def __enter__(self):
+        for trava in self._travas:
+            trava.acquire()
+        return self
+
+    def __exit__(self, *excecao):
+        for trava in reversed(self._travas):
+            trava.release()
+
+
+def ativar_concorrencia(quantidade_travas=64):
+    global travas_contas
+    travas_contas = TravasListradas(quantidade_travas)
+    return travas_contas
+
+
+def desativar_concorrencia():
+    global travas_contas
+    travas_contas = None
+
+
+SEM_TRAVA = nullcontext()
+
+
+def travar_contas(*contas):
+    return SEM_TRAVA if travas_contas is None else travas_contas.ordenadas(*(conta.numero for conta in contas))
+
+
+def notificar(evento, *dados):
+    # "transacao"/"transacoes" são notificadas logo depois do lançamento, sob a trava da conta: quem ouve (o WAL de
+    # Persistencia) conta com o lançamento no fim do histórico
+    for ouvinte in ouvintes:
+        ouvinte(evento, *dados)
+
 
 class ContasIterador:
-    def __init__(self, contas):
+    MODELO_LINHA = "Agência:\t{agencia}\nNúmero:\t\t{numero}\nTitular:\t{titular}\nSaldo:\t\tR$ {saldo:.2f}\n"
+
+    def __init__(self, contas, offset=0, limite=None, filtro=None, chave=None, reverso=False):
         self.contas = contas
-        self._index = 0
+        self.offset = offset
+        self.limite = limite
+        self.filtro = filtro
+        self.chave = chave
+        self.reverso = reverso
+        self._selecionadas = None
 
     def __iter__(self):
         return self
 
     def __next__(self):
-        try:
-            conta = self.contas[self._index]
-            return f"""\
-            Agência:\t{conta.agencia}
-            Número:\t\t{conta.numero}
-            Titular:\t{conta.cliente.nome}
-            Saldo:\t\tR$ {conta.saldo:.2f}
-        """
-        except IndexError:
-            raise StopIteration
-        finally:
-            self._index += 1
+        if self._selecionadas is None:
+            self._selecionadas = self._selecionar()
+
+        conta = next(self._selecionadas)
+        return self.MODELO_LINHA.format(
+            agencia=conta.agencia, numero=conta.numero, titular=conta.cliente.nome, saldo=conta.saldo
+        )
+
+    def _selecionar(self):
+        fim = None if self.limite is None else self.offset + self.limite
+
+        if self.chave is None:
+            if self.filtro is None:
+                # Sem filtro nem ordenação, a página sai direto por índice: custo proporcional ao tamanho dela
+                posicoes = range(len(self.contas))
+                posicoes = (posicoes[::-1] if self.reverso else posicoes)[self.offset : fim]
+                return map(self.contas.__getitem__, posicoes)
+
+            contas = reversed(self.contas) if self.reverso else iter(self.contas)
+            return islice(filter(self.filtro, contas), self.offset, fim)
+
+        contas = self.contas if self.filtro is None else filter(self.filtro, self.contas)
+        if fim is None:
+            return iter(sorted(contas, key=self.chave, reverse=self.reverso)[self.offset :])
+
+        # Só as `fim` primeiras na ordem pedida são mantidas, em vez de ordenar a lista inteira
+        selecionar = heapq.nlargest if self.reverso else heapq.nsmallest
+        return iter(selecionar(fim, contas, key=self.chave)[self.offset :])
+
+
+class ClienteRegistry:
+    def __init__(self, clientes=()):
+        self._clientes = {}
+        for cliente in clientes:
+            self.adicionar(cliente)
+
+    def adicionar(self, cliente):
+        if cliente.cpf in self._clientes:
+            raise ValueError(f"Já existe cliente com o CPF {cliente.cpf}!")
+
+        self._clientes[cliente.cpf] = cliente
+
+    def estender(self, clientes):
+        novos = {cliente.cpf: cliente for cliente in clientes}
+        if len(novos) < len(clientes) or not self._clientes.keys().isdisjoint(novos):
+            raise ValueError("Já existem clientes com alguns dos CPFs informados!")
+
+        self._clientes.update(novos)
+
+    def buscar(self, cpf):
+        return self._clientes.get(cpf)
+
+    def __contains__(self, cpf):
+        return cpf in self._clientes
+
+    def __len__(self):
+        return len(self._clientes)
+
+    def __iter__(self):
+        return iter(self._clientes.values())
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}: {len(self)} clientes>"
+
+
+class ContaRegistry(Sequence):
+    # Diretório de todas as contas: (agência, número) leva à conta em O(1); como sequência, segue a ordem de criação
+    def __init__(self, contas=()):
+        self._contas = []
+        self._agencias = {}
+        for conta in contas:
+            self.adicionar(conta)
+
+    def adicionar(self, conta):
+        numeros = self._agencias.setdefault(conta.agencia, {})
+        if conta.numero in numeros:
+            raise ValueError(f"Já existe a conta {conta.numero} na agência {conta.agencia}!")
+
+        numeros[conta.numero] = conta
+        self._contas.append(conta)
+
+    def estender(self, contas):
+        novas = {}
+        for conta in contas:
+            novas.setdefault(conta.agencia, {})[conta.numero] = conta
+        repetidas = sum(map(len, novas.values())) < len(contas) or any(
+            not self._agencias.get(agencia, {}).keys().isdisjoint(numeros) for agencia, numeros in novas.items()
+        )
+        if repetidas:
+            raise ValueError("Já existem contas com alguns dos números informados!")
+
+        for agencia, numeros in novas.items():
+            self._agencias.setdefault(agencia, {}).update(numeros)
+        self._contas.extend(contas)
+
+    def buscar(self, agencia, numero, cliente=None):
+        # Com `cliente`, só devolve a conta se for dele: o próprio diretório serve de índice das contas do cliente
+        conta = self._agencias.get(agencia, {}).get(numero)
+        if conta is None or (cliente is not None and conta.cliente is not cliente):
+            return None
+        return conta
+
+    def da_agencia(self, agencia=AGENCIA):
+        # Número -> conta de uma agência, sem cópia; quem recebe não deve alterá-lo
+        return self._agencias.get(agencia, {})
+
+    def do_cliente(self, cliente, ordem="criacao"):
+        # cliente.contas já está na ordem de criação; por saldo, ordena na hora, porque o saldo muda a cada transação
+        if ordem == "criacao":
+            return list(cliente.contas)
+        if ordem == "saldo":
+            return sorted(cliente.contas, key=attrgetter("saldo"), reverse=True)
+        raise ValueError(f"Ordem desconhecida: {ordem}!")
+
+    def __contains__(self, conta):
+        return self.buscar(conta.agencia, conta.numero) is conta
+
+    def __getitem__(self, indice):
+        return self._contas[indice]
+
+    def __len__(self):
+        return len(self._contas)
+
+    def __iter__(self):
+        return iter(self._contas)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}: {len(self)} contas>"
 
 
 class Cliente:
-    def __init__(self, endereco):
+    __slots__ = ("endereco", "contas", "indice_conta", "plano")
+
+    def __init__(self, endereco, plano=None):
         self.endereco = endereco
         self.contas = []
         self.indice_conta = 0
+        self.plano = plano  # None: plano padrão do limitador
 
     def realizar_transacao(self, conta, transacao):
-        if len(conta.historico.transacoes_do_dia()) >= 2:
-            print("\n@@@ Você excedeu o número de transações permitidas para hoje! @@@")
-            return
-
-        transacao.registrar(conta)
+        # O limite é por conta, com o plano do cliente. A cota é reservada antes e devolvida se a transação não for
+        # registrada: saque recusado, saldo insuficiente ou erro não gastam o limite
+        limitador = limitador_transacoes
+        with transacao.travar(conta):
+            usados = conta.historico.iniciadas_hoje
+            if limitador is not None and not limitador.permitir(conta, self.plano, usados=usados):
+                print("\n@@@ Você excedeu o número de transações permitidas para hoje! @@@")
+                return
+
+            registrada = False
+            try:
+                registrada = transacao.registrar(conta)
+            finally:
+                if limitador is not None and not registrada:
+                    limitador.devolver(conta)
 
     def adicionar_conta(self, conta):
         self.contas.append(conta)
 
 
 class PessoaFisica(Cliente):
-    def __init__(self, nome, data_nascimento, cpf, endereco):
-        super().__init__(endereco)
+    __slots__ = ("nome", "data_nascimento", "cpf")
+
+    def __init__(self, nome, data_nascimento, cpf, endereco, plano=None):
+        super().__init__(endereco, plano)
         self.nome = nome
         self.data_nascimento = data_nascimento
         self.cpf = cpf
@@ -58,10 +302,12 @@ class PessoaFisica(Cliente):
 
 
 class Conta:
+    __slots__ = ("_saldo", "_numero", "_agencia", "_cliente", "_historico")
+
     def __init__(self, numero, cliente):
         self._saldo = 0
         self._numero = numero
-        self._agencia = "0001"
+        self._agencia = AGENCIA
         self._cliente = cliente
         self._historico = Historico()
 
@@ -89,62 +335,110 @@ class Conta:
     def historico(self):
         return self._historico
 
+    @property
+    def trava(self):
+        # Leituras de saldo não travam; escritas no saldo e no histórico acontecem sob a trava da conta
+        return SEM_TRAVA if travas_contas is None else travas_contas(self._numero)
+
     def sacar(self, valor):
-        saldo = self.saldo
-        excedeu_saldo = valor > saldo
+        with self.trava:
+            saldo = self.saldo
+            excedeu_saldo = valor > saldo
 
-        if excedeu_saldo:
-            print("\n@@@ Operação falhou! Você não tem saldo suficiente. @@@")
+            if excedeu_saldo:
+                print("\n@@@ Operação falhou! Você não tem saldo suficiente. @@@")
 
-        elif valor > 0:
-            self._saldo -= valor
-            print("\n=== Saque realizado com sucesso! ===")
-            return True
+            elif valor > 0:
+                self._saldo -= valor
+                print("\n=== Saque realizado com sucesso! ===")
+                return True
 
-        else:
-            print("\n@@@ Operação falhou! O valor informado é inválido. @@@")
+            else:
+                print("\n@@@ Operação falhou! O valor informado é inválido. @@@")
 
-        return False
+            return False
 
     def depositar(self, valor):
-        if valor > 0:
-            self._saldo += valor
-            print("\n=== Depósito realizado com sucesso! ===")
-        else:
-            print("\n@@@ Operação falhou! O valor informado é inválido. @@@")
-            return False
+        with self.trava:
+            if valor > 0:
+                self._saldo += valor
+                print("\n=== Depósito realizado com sucesso! ===")
+            else:
+                print("\n@@@ Operação falhou! O valor informado é inválido. @@@")
+                return False
+
+            return True
+
+    def aplicar_transacao(self, codigo, valor, data):
+        with self.trava:
+            if codigo in CREDITOS:
+                self._saldo += valor
+            else:
+                self._saldo -= valor
+
+            self._historico._registrar(codigo, valor, data)
 
-        return True
+    def transferir(self, valor, destino):
+        with travar_contas(self, destino):
+            if destino is self:
+                print("\n@@@ Operação falhou! A conta de destino deve ser diferente da conta de origem. @@@")
+
+            elif valor > self.saldo:
+                print("\n@@@ Operação falhou! Você não tem saldo suficiente. @@@")
+
+            elif valor > 0:
+                self._saldo -= valor
+                destino._saldo += valor
+                print("\n=== Transferência realizada com sucesso! ===")
+                return True
+
+            else:
+                print("\n@@@ Operação falhou! O valor informado é inválido. @@@")
+
+            return False
 
 
 class ContaCorrente(Conta):
-    def __init__(self, numero, cliente, limite=500, limite_saques=3):
+    __slots__ = ("_limite", "_limite_saques", "_janela_saques")
+
+    def __init__(self, numero, cliente, limite=500, limite_saques=3, janela_saques=None):
         super().__init__(numero, cliente)
         self._limite = limite
         self._limite_saques = limite_saques
+        self._janela_saques = janela_saques
+        if janela_saques is not None:
+            self._historico = Historico(janela=janela_saques)
 
     @classmethod
     def nova_conta(cls, cliente, numero, limite, limite_saques):
         return cls(numero, cliente, limite, limite_saques)
 
     def sacar(self, valor):
-        numero_saques = len(
-            [transacao for transacao in self.historico.transacoes if transacao["tipo"] == Saque.__name__]
-        )
+        with self.trava:
+            return self._debito_permitido(valor, "do saque") and super().sacar(valor)
+
+    def transferir(self, valor, destino):
+        # A transferência sai da conta como um saque: respeita o limite por operação e para quando os saques acabam,
+        # mas fica registrada como TransferenciaEnviada e não conta como mais um saque
+        with travar_contas(self, destino):
+            return self._debito_permitido(valor, "da transferência") and super().transferir(valor, destino)
+
+    def _debito_permitido(self, valor, operacao):
+        if self._janela_saques is None:
+            numero_saques = self.historico.quantidade(Saque.__name__)
+        else:
+            numero_saques = self.historico.quantidade_na_janela(Saque.__name__)
 
         excedeu_limite = valor > self._limite
         excedeu_saques = numero_saques >= self._limite_saques
 
         if excedeu_limite:
-            print("\n@@@ Operação falhou! O valor do saque excede o limite. @@@")
+            print(f"\n@@@ Operação falhou! O valor {operacao} excede o limite. @@@")
 
         elif excedeu_saques:
             print("\n@@@ Operação falhou! Número máximo de saques excedido. @@@")
 
-        else:
-            return super().sacar(valor)
-
-        return False
+        return not (excedeu_limite or excedeu_saques)
 
     def __repr__(self):
         return f"<{self.__class__.__name__}: ('{self.agencia}', '{self.numero}', '{self.cliente.nome}')>"
@@ -157,50 +451,335 @@ class ContaCorrente(Conta):
         """
 
 
+class TransacoesView(Sequence):
+    __slots__ = ("_historico", "_inicio", "_fim")
+
+    def __init__(self, historico, inicio=0, fim=None):
+        self._historico = historico
+        self._inicio = inicio
+        self._fim = fim
+
+    def _intervalo(self):
+        fim = len(self._historico._tipos) if self._fim is None else self._fim
+        return range(self._inicio, fim)
+
+    def __len__(self):
+        return len(self._intervalo())
+
+    def __getitem__(self, indice):
+        posicoes = self._intervalo()[indice]
+
+        if isinstance(indice, slice):
+            if posicoes.step == 1:
+                return TransacoesView(self._historico, posicoes.start, posicoes.stop)
+            return [self._historico._transacao(posicao) for posicao in posicoes]
+
+        return self._historico._transacao(posicoes)
+
+    def __iter__(self):
+        for posicao in self._intervalo():
+            yield self._historico._transacao(posicao)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}: {len(self)} transações>"
+
+
+class Resumo:
+    __slots__ = ("inicio", "fim", "quantidades", "totais", "saldo")
+
+    def __init__(self, inicio=0, saldo=0.0):
+        self.inicio = inicio
+        self.fim = inicio
+        self.quantidades = [0] * (max(TIPOS_TRANSACAO) + 1)
+        self.totais = [0.0] * (max(TIPOS_TRANSACAO) + 1)
+        self.saldo = saldo
+
+    @property
+    def transacoes(self):
+        return self.fim - self.inicio
+
+    def quantidade(self, tipo_transacao):
+        return self.quantidades[CODIGOS_TRANSACAO[tipo_transacao]]
+
+    def total(self, tipo_transacao):
+        return self.totais[CODIGOS_TRANSACAO[tipo_transacao]]
+
+    def __repr__(self):
+        tipos = ", ".join(f"{tipo}: {self.quantidade(tipo)}/{self.total(tipo):.2f}" for tipo in CODIGOS_TRANSACAO)
+        return f"<{self.__class__.__name__}: {tipos}, saldo {self.saldo:.2f}>"
+
+
 class Historico:
-    def __init__(self):
-        self._transacoes = []
+    __slots__ = (
+        "_tipos",
+        "_valores",
+        "_datas",
+        "_janela",
+        "_dias",
+        "_posicoes",
+        "_quantidades",
+        "_totais",
+        "_recentes",
+        "_saldo",
+    )
+
+    FORMATO_DATA = "%d-%m-%Y %H:%M:%S"
+
+    def __init__(self, janela=None):
+        self._tipos, self._valores, self._datas = SEM_TIPOS, SEM_VALORES, SEM_DATAS
+        self._janela = janela
+        self._reindexar()
 
     @property
     def transacoes(self):
-        return self._transacoes
-
-    def adicionar_transacao(self, transacao):
-        self._transacoes.append(
-            {
-                "tipo": transacao.__class__.__name__,
-                "valor": transacao.valor,
-                "data": datetime.utcnow().strftime("%d-%m-%Y %H:%M:%S"),
-            }
-        )
+        return TransacoesView(self)
+
+    def adicionar_transacao(self, transacao, data=None):
+        data = self._data_para_registro(data)
+        self._registrar(CODIGOS_TRANSACAO[transacao.__class__.__name__], transacao.valor, data)
+        return data
+
+    def _data_para_registro(self, data=None):
+        # Validada antes de mexer no saldo: uma data fora de ordem não pode deixar o dinheiro movido sem lançamento
+        if data is None:
+            return max(int(time()), self._ultima_data())
+        if data < self._ultima_data():
+            raise ValueError("As transações devem ser registradas em ordem cronológica!")
+        return data
+
+    def carregar(self, tipos, valores, datas):
+        tipos, valores, datas = array("B", tipos), array("d", valores), array("q", datas)
+        if not len(tipos) == len(valores) == len(datas):
+            raise ValueError("As colunas do histórico devem ter o mesmo tamanho!")
+        if len(datas) > 1 and not all(map(le, datas, datas[1:])):
+            raise ValueError("As transações devem ser registradas em ordem cronológica!")
+
+        if not tipos:
+            tipos, valores, datas = SEM_TIPOS, SEM_VALORES, SEM_DATAS
+        self._tipos, self._valores, self._datas = tipos, valores, datas
+        self._reindexar()
+
+    def estender(self, tipos, valores, datas):
+        if not len(tipos) == len(valores) == len(datas):
+            raise ValueError("As colunas do histórico devem ter o mesmo tamanho!")
+        if len(datas) and self._datas and datas[0] < self._datas[-1]:
+            raise ValueError("As transações devem ser registradas em ordem cronológica!")
+        if len(datas) > 1 and not all(map(le, datas, datas[1:])):
+            raise ValueError("As transações devem ser registradas em ordem cronológica!")
+
+        inicio = len(self._tipos)
+        if self._tipos is SEM_TIPOS:
+            self._alocar_colunas()
+        self._tipos.extend(tipos)
+        self._valores.extend(valores)
+        self._datas.extend(datas)
+        for posicao in range(inicio, len(self._tipos)):
+            self._indexar(posicao)
+
+    def _registrar(self, codigo, valor, data):
+        if self._datas and data < self._datas[-1]:
+            raise ValueError("As transações devem ser registradas em ordem cronológica!")
+
+        if self._tipos is SEM_TIPOS:
+            self._alocar_colunas()
+        self._tipos.append(codigo)
+        self._valores.append(valor)
+        self._datas.append(data)
+        self._indexar(len(self._tipos) - 1)
+
+    def _ultima_data(self):
+        return self._datas[-1] if self._datas else 0
+
+    def _reindexar(self):
+        self._dias = SEM_DIAS
+        self._saldo = 0.0
+        self._posicoes = SEM_POSICOES
+        self._quantidades = SEM_QUANTIDADES
+        self._totais = SEM_TOTAIS
+        self._recentes = SEM_POSICOES if self._janela is not None else None
+
+        for posicao in range(len(self._tipos)):
+            self._indexar(posicao)
+
+    def _alocar_colunas(self):
+        self._tipos, self._valores, self._datas = array("B"), array("d"), array("q")
+
+    def _alocar_indices(self):
+        self._dias = {}
+        self._posicoes = {codigo: array("q") for codigo in TIPOS_TRANSACAO}
+        self._quantidades = dict.fromkeys(TIPOS_TRANSACAO, 0)
+        self._totais = dict.fromkeys(TIPOS_TRANSACAO, 0.0)
+        if self._janela is not None:
+            self._recentes = {codigo: deque() for codigo in TIPOS_TRANSACAO}
+
+    def _indexar(self, posicao):
+        if self._dias is SEM_DIAS:
+            self._alocar_indices()
+        codigo, data = self._tipos[posicao], self._datas[posicao]
+
+        valor = self._valores[posicao]
+
+        # Resumo do dia: intervalo de posições, quantidade e total por tipo e saldo de fechamento
+        resumo = self._dias.get(data // SEGUNDOS_POR_DIA)
+        if resumo is None:
+            resumo = self._dias[data // SEGUNDOS_POR_DIA] = Resumo(posicao)
+        resumo.fim = posicao + 1
+        resumo.quantidades[codigo] += 1
+        resumo.totais[codigo] += valor
+        self._saldo += valor if codigo in CREDITOS else -valor
+        resumo.saldo = self._saldo
+
+        self._posicoes[codigo].append(posicao)
+        self._quantidades[codigo] += 1
+        self._totais[codigo] += valor
+        if self._recentes is not None:
+            self._recentes[codigo].append(data)
+
+    def quantidade(self, tipo_transacao):
+        return self._quantidades[CODIGOS_TRANSACAO[tipo_transacao]]
+
+    def total(self, tipo_transacao):
+        return self._totais[CODIGOS_TRANSACAO[tipo_transacao]]
+
+    def quantidade_na_janela(self, tipo_transacao, agora=None):
+        if self._recentes is None:
+            raise ValueError("Histórico criado sem janela de tempo!")
+
+        limite = (int(time()) if agora is None else agora) - self._janela
+        recentes = self._recentes[CODIGOS_TRANSACAO[tipo_transacao]]
+        while recentes and recentes[0] <= limite:
+            recentes.popleft()
+        return len(recentes)
+
+    def _transacao(self, posicao):
+        # O texto de FORMATO_DATA sem um datetime por transação: o dia sai de um cache, a hora é montada na mão
+        dia, segundos = divmod(self._datas[posicao], SEGUNDOS_POR_DIA)
+        minutos, segundo = divmod(segundos, 60)
+        hora, minuto = divmod(minutos, 60)
+        return {
+            "tipo": TIPOS_TRANSACAO[self._tipos[posicao]],
+            "valor": self._valores[posicao],
+            "data": f"{_formatar_dia(dia)}{DOIS_DIGITOS[hora]}:{DOIS_DIGITOS[minuto]}:{DOIS_DIGITOS[segundo]}",
+        }
+
+    @classmethod
+    def _para_timestamp(cls, data):
+        if isinstance(data, (int, float)):
+            return data
+        if isinstance(data, str):
+            data = datetime.strptime(data, cls.FORMATO_DATA)
+        elif not isinstance(data, datetime):
+            data = datetime(data.year, data.month, data.day)
+        if data.tzinfo is None:
+            data = data.replace(tzinfo=timezone.utc)
+        return data.timestamp()
+
+    def gerar_relatorio(self, tipo_transacao=None, inicio=None, fim=None):
+        # Datas em ordem cronológica: o período [inicio, fim) vira um intervalo de posições por busca binária
+        primeira = 0 if inicio is None else bisect_left(self._datas, self._para_timestamp(inicio))
+        ultima = len(self._datas) if fim is None else bisect_left(self._datas, self._para_timestamp(fim))
+
+        if tipo_transacao is None:
+            yield from self.transacoes[primeira:ultima]
+            return
+
+        tipos = [tipo_transacao] if isinstance(tipo_transacao, str) else tipo_transacao
+        codigos = sorted({CODIGOS_POR_NOME.get(tipo.lower()) for tipo in tipos} - {None})
+
+        intervalos = []
+        for codigo in codigos:
+            posicoes = self._posicoes[codigo]
+            intervalo = range(bisect_left(posicoes, primeira), bisect_left(posicoes, ultima))
+            intervalos.append(map(posicoes.__getitem__, intervalo))
 
-    def gerar_relatorio(self, tipo_transacao=None):
-        for transacao in self._transacoes:
-            if tipo_transacao is None or transacao["tipo"].lower() == tipo_transacao.lower():
-                yield transacao
+        for posicao in heapq.merge(*intervalos):
+            yield self._transacao(posicao)
 
-    def transacoes_do_dia(self):
-        data_atual = datetime.utcnow().date()
-        transacoes = []
-        for transacao in self._transacoes:
-            data_transacao = datetime.strptime(transacao["data"], "%d-%m-%Y %H:%M:%S").date()
-            if data_atual == data_transacao:
-                transacoes.append(transacao)
-        return transacoes
+    def transacoes_do_dia(self, dia=None):
+        if dia is None:
+            dia = int(time()) // SEGUNDOS_POR_DIA
+
+        resumo = self._dias.get(dia)
+        if resumo is None:
+            return TransacoesView(self, 0, 0)
+        return TransacoesView(self, resumo.inicio, resumo.fim)
+
+    def iniciadas_hoje(self):
+        resumo = self._dias.get(int(time()) // SEGUNDOS_POR_DIA)
+        if resumo is None:
+            return 0
+        quantidades = resumo.quantidades
+        return sum(quantidades[codigo] for codigo in INICIADAS_PELO_CLIENTE)
+
+    def resumo_do_dia(self, dia=None):
+        if dia is None:
+            dia = int(time()) // SEGUNDOS_POR_DIA
+
+        resumo = self._dias.get(dia)
+        return Resumo(len(self._tipos), self._saldo) if resumo is None else resumo
+
+    def resumo_periodo(self, inicio=None, fim=None):
+        if not self._dias:
+            return Resumo()
+
+        # O período é contado em dias UTC inteiros: [dia de inicio, dia de fim), com fim arredondado para cima
+        primeiro_dia, ultimo_dia = next(iter(self._dias)), next(reversed(self._dias)) + 1
+        if inicio is not None:
+            primeiro_dia = max(primeiro_dia, int(self._para_timestamp(inicio)) // SEGUNDOS_POR_DIA)
+        if fim is not None:
+            ultimo_dia = min(ultimo_dia, -(-int(self._para_timestamp(fim)) // SEGUNDOS_POR_DIA))
+
+        posicao_inicial = bisect_left(self._datas, primeiro_dia * SEGUNDOS_POR_DIA)
+        posicao_final = max(posicao_inicial, bisect_left(self._datas, ultimo_dia * SEGUNDOS_POR_DIA))
+        anterior = self._dias[self._datas[posicao_final - 1] // SEGUNDOS_POR_DIA] if posicao_final else None
+
+        periodo = Resumo(posicao_inicial, anterior.saldo if anterior else 0.0)
+        periodo.fim = posicao_final
+        for dia in range(primeiro_dia, ultimo_dia):
+            resumo = self._dias.get(dia)
+            if resumo is not None:
+                for codigo in TIPOS_TRANSACAO:
+                    periodo.quantidades[codigo] += resumo.quantidades[codigo]
+                    periodo.totais[codigo] += resumo.totais[codigo]
+        return periodo
+
+
+DOIS_DIGITOS = tuple(f"{numero:02d}" for numero in range(60))
+
+
+@lru_cache(maxsize=4096)
+def _formatar_dia(dia):
+    return datetime.fromtimestamp(dia * SEGUNDOS_POR_DIA, timezone.utc).strftime("%d-%m-%Y ")
+
+
+def recalcular_resumos(contas):
+    # Reconstrói de uma vez os resumos diários (e demais índices) de históricos já existentes
+    transacoes = 0
+    for conta in contas:
+        conta.historico._reindexar()
+        transacoes += len(conta.historico._tipos)
+    return transacoes
 
 
 class Transacao(ABC):
+    __slots__ = ()
+
     @property
     @abstractproperty
     def valor(self):
         pass
 
     @abstractclassmethod
-    def registrar(self, conta):
+    def registrar(self, conta, data=None):
         pass
 
+    def travar(self, conta):
+        return conta.trava
+
 
 class Saque(Transacao):
+    __slots__ = ("_valor",)
+
     def __init__(self, valor):
         self._valor = valor
 
@@ -208,14 +787,20 @@ class Saque(Transacao):
     def valor(self):
         return self._valor
 
-    def registrar(self, conta):
-        sucesso_transacao = conta.sacar(self.valor)
+    def registrar(self, conta, data=None):
+        with conta.trava:
+            data = conta.historico._data_para_registro(data)
+            sucesso_transacao = conta.sacar(self.valor)
 
-        if sucesso_transacao:
-            conta.historico.adicionar_transacao(self)
+            if sucesso_transacao:
+                conta.historico.adicionar_transacao(self, data)
+                notificar("transacao", conta, CODIGOS_TRANSACAO["Saque"], self.valor, data)
+            return sucesso_transacao
 
 
 class Deposito(Transacao):
+    __slots__ = ("_valor",)
+
     def __init__(self, valor):
         self._valor = valor
 
@@ -223,22 +808,147 @@ class Deposito(Transacao):
     def valor(self):
         return self._valor
 
-    def registrar(self, conta):
-        sucesso_transacao = conta.depositar(self.valor)
+    def registrar(self, conta, data=None):
+        with conta.trava:
+            data = conta.historico._data_para_registro(data)
+            sucesso_transacao = conta.depositar(self.valor)
+
+            if sucesso_transacao:
+                conta.historico.adicionar_transacao(self, data)
+                notificar("transacao", conta, CODIGOS_TRANSACAO["Deposito"], self.valor, data)
+            return sucesso_transacao
+
 
-        if sucesso_transacao:
-            conta.historico.adicionar_transacao(self)
+class Tarifa(Transacao):
+    __slots__ = ("_valor",)
+
+    def __init__(self, valor):
+        self._valor = valor
+
+    @property
+    def valor(self):
+        return self._valor
+
+    def registrar(self, conta, data=None):
+        # Cobrança do banco, não saque do cliente: não passa pelo limite nem conta no número de saques,
+        # mas também nunca deixa o saldo negativo
+        with conta.trava:
+            data = conta.historico._data_para_registro(data)
+
+            if not 0 < self.valor <= conta.saldo:
+                return False
+
+            conta.aplicar_transacao(CODIGOS_TRANSACAO["Tarifa"], self.valor, data)
+            notificar("transacao", conta, CODIGOS_TRANSACAO["Tarifa"], self.valor, data)
+            return True
+
+
+class Juros(Transacao):
+    __slots__ = ("_valor",)
+
+    def __init__(self, valor):
+        self._valor = valor
+
+    @property
+    def valor(self):
+        return self._valor
+
+    def registrar(self, conta, data=None):
+        # Crédito do banco no fechamento do dia: um código próprio, para não contar como depósito do cliente
+        with conta.trava:
+            data = conta.historico._data_para_registro(data)
+
+            if not self.valor > 0:
+                return False
+
+            conta.aplicar_transacao(CODIGOS_TRANSACAO["Juros"], self.valor, data)
+            notificar("transacao", conta, CODIGOS_TRANSACAO["Juros"], self.valor, data)
+            return True
+
+
+class Transferencia(Transacao):
+    __slots__ = ("_valor", "_destino")
+
+    def __init__(self, valor, destino):
+        self._valor = valor
+        self._destino = destino
+
+    @property
+    def valor(self):
+        return self._valor
+
+    @property
+    def destino(self):
+        return self._destino
+
+    def travar(self, conta):
+        return travar_contas(conta, self._destino)
+
+    def registrar(self, conta, data=None):
+        destino = self._destino
+        with travar_contas(conta, destino):
+            data = max(conta.historico._data_para_registro(data), destino.historico._data_para_registro(data))
+
+            sucesso_transacao = conta.transferir(self.valor, destino)
+
+            if sucesso_transacao:
+                # Débito e crédito entram sob as duas travas e com a mesma data: ninguém vê um sem o outro
+                enviada, recebida = CODIGOS_TRANSACAO["TransferenciaEnviada"], CODIGOS_TRANSACAO["TransferenciaRecebida"]
+                conta.historico._registrar(enviada, self.valor, data)
+                destino.historico._registrar(recebida, self.valor, data)
+                notificar("transacoes", ((conta, enviada, self.valor, data), (destino, recebida, self.valor, data)))
+            return sucesso_transacao
+
+
+REGISTRAR_EVENTOS = False  # padrão de --eventos: grava cada transação como evento imutável em dados/eventos.bin
+
+FORMATO_LOG = "texto"  # padrão de --log-formato; "jsonl" grava um registro JSON por linha (ver consulta_log.py)
+
+
+def caminho_log(formato):
+    return ROOT_PATH / ("log.jsonl" if formato == "jsonl" else "log.txt")
+
+
+escritor_log = EscritorLog(caminho_log(FORMATO_LOG), formato=FORMATO_LOG)
+
+AMOSTRAGEM_METRICAS = 0  # N > 0 mede a latência de 1 a cada N chamadas; 0 só conta chamadas e erros
+
+metricas = Metricas(amostragem=AMOSTRAGEM_METRICAS)
+
+# Plano "padrao" mantém o limite de sempre: 2 transações por conta por dia UTC, contadas no histórico da conta (só as
+# iniciadas pelo cliente). None em limitador_transacoes desliga o limite
+PLANOS_LIMITE = {
+    "padrao": LimiteContado(2),
+    "ilimitado": BaldeTokens(capacidade=float("inf"), por_segundo=0),
+    "premium": BaldeTokens(capacidade=10, por_segundo=10 / 60),  # rajadas de 10, 10 por minuto
+    "empresarial": LimiteJanela(600, 60),
+}
+
+limitador_transacoes = LimitadorTaxa(PLANOS_LIMITE)
+
+
+def adicionar_opcao_eventos(parser):
+    parser.add_argument(
+        "--eventos",
+        action=argparse.BooleanOptionalAction,
+        default=REGISTRAR_EVENTOS,
+        help="grava cada transação como evento imutável em eventos.bin (o histórico existente entra como eventos iniciais)",
+    )
+
+
+def adicionar_opcao_log(parser):
+    parser.add_argument(
+        "--log-formato",
+        choices=FORMATOS,
+        default=FORMATO_LOG,
+        help="texto (log.txt) ou jsonl (log.jsonl, consultável com consulta_log.py)",
+    )
 
 
 def log_transacao(func):
     def envelope(*args, **kwargs):
         resultado = func(*args, **kwargs)
-        data_hora = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-        with open(ROOT_PATH / "log.txt", "a") as arquivo:
-            arquivo.write(
-                f"[{data_hora}] Função '{func.__name__}' executada com argumentos {args} e {kwargs}. "
-                f"Retornou {resultado}\n"
-            )
+        escritor_log.registrar(func.__name__, args, kwargs, resultado)
         return resultado
 
     return envelope
@@ -249,6 +959,7 @@ def menu():
     ================ MENU ================
     [d]\tDepositar
     [s]\tSacar
+    [t]\tTransferir
     [e]\tExtrato
     [nc]\tNova conta
     [lc]\tListar contas
@@ -259,21 +970,34 @@ def menu():
 
 
 def filtrar_cliente(cpf, clientes):
-    clientes_filtrados = [cliente for cliente in clientes if cliente.cpf == cpf]
-    return clientes_filtrados[0] if clientes_filtrados else None
+    return clientes.buscar(cpf)
 
 
-def recuperar_conta_cliente(cliente):
+def recuperar_conta_cliente(cliente, contas, destino=False):
     if not cliente.contas:
         print("\n@@@ Cliente não possui conta! @@@")
         return
 
-    # FIXME: não permite cliente escolher a conta
-    return cliente.contas[0]
+    if len(cliente.contas) == 1:
+        return cliente.contas[0]
+
+    # A conta de destino é de outro cliente: o número é pedido sem listar titular e saldo das contas dele
+    if destino:
+        numero = input("Informe o número da conta de destino: ")
+    else:
+        listar_contas(contas.do_cliente(cliente))
+        numero = input("Informe o número da conta: ")
+    conta = contas.buscar(AGENCIA, int(numero), cliente) if numero.isdecimal() else None
+    if not conta:
+        print("\n@@@ Conta não encontrada para este cliente! @@@")
+        return
+
+    return conta
 
 
 @log_transacao
-def depositar(clientes):
+@metricas.instrumentar()
+def depositar(clientes, contas):
     cpf = input("Informe o CPF do cliente: ")
     cliente = filtrar_cliente(cpf, clientes)
 
@@ -284,7 +1008,7 @@ def depositar(clientes):
     valor = float(input("Informe o valor do depósito: "))
     transacao = Deposito(valor)
 
-    conta = recuperar_conta_cliente(cliente)
+    conta = recuperar_conta_cliente(cliente, contas)
     if not conta:
         return
 
@@ -292,7 +1016,8 @@ def depositar(clientes):
 
 
 @log_transacao
-def sacar(clientes):
+@metricas.instrumentar()
+def sacar(clientes, contas):
     cpf = input("Informe o CPF do cliente: ")
     cliente = filtrar_cliente(cpf, clientes)
 
@@ -303,7 +1028,7 @@ def sacar(clientes):
     valor = float(input("Informe o valor do saque: "))
     transacao = Saque(valor)
 
-    conta = recuperar_conta_cliente(cliente)
+    conta = recuperar_conta_cliente(cliente, contas)
     if not conta:
         return
 
@@ -311,7 +1036,8 @@ def sacar(clientes):
 
 
 @log_transacao
-def exibir_extrato(clientes):
+@metricas.instrumentar()
+def transferir(clientes, contas):
     cpf = input("Informe o CPF do cliente: ")
     cliente = filtrar_cliente(cpf, clientes)
 
@@ -319,26 +1045,74 @@ def exibir_extrato(clientes):
         print("\n@@@ Cliente não encontrado! @@@")
         return
 
-    conta = recuperar_conta_cliente(cliente)
+    cpf_destino = input("Informe o CPF do cliente de destino: ")
+    cliente_destino = filtrar_cliente(cpf_destino, clientes)
+
+    if not cliente_destino:
+        print("\n@@@ Cliente de destino não encontrado! @@@")
+        return
+
+    valor = float(input("Informe o valor da transferência: "))
+
+    conta = recuperar_conta_cliente(cliente, contas)
     if not conta:
         return
 
-    print("\n================ EXTRATO ================")
-    extrato = ""
-    tem_transacao = False
-    for transacao in conta.historico.gerar_relatorio():
-        tem_transacao = True
-        extrato += f"\n{transacao['data']}\n{transacao['tipo']}:\n\tR$ {transacao['valor']:.2f}"
+    conta_destino = recuperar_conta_cliente(cliente_destino, contas, destino=True)
+    if not conta_destino:
+        return
+
+    cliente.realizar_transacao(conta, Transferencia(valor, conta_destino))
 
-    if not tem_transacao:
-        extrato = "Não foram realizadas movimentações"
 
-    print(extrato)
-    print(f"\nSaldo:\n\tR$ {conta.saldo:.2f}")
-    print("==========================================")
+def escrever_extrato(conta, saida=None, cursor=0, tamanho_pagina=None):
+    saida = sys.stdout if saida is None else saida
+    transacoes = conta.historico.transacoes
+    total = len(transacoes)
+    fim = total if tamanho_pagina is None else min(total, cursor + tamanho_pagina)
+
+    saida.write("\n================ EXTRATO ================\n")
+    if not total:
+        saida.write("Não foram realizadas movimentações")
+
+    # O histórico é só de acréscimos, então a posição serve de cursor estável entre páginas
+    bloco = []
+    for transacao in transacoes[cursor:fim]:
+        bloco.append(f"\n{transacao['data']}\n{transacao['tipo']}:\n\tR$ {transacao['valor']:.2f}")
+        if len(bloco) >= TAMANHO_BLOCO_EXTRATO:
+            saida.write("".join(bloco))
+            bloco.clear()
+    saida.write("".join(bloco))
+    saida.write("\n")
+
+    if fim < total:
+        saida.write(f"\n--- Continua: {total - fim} movimentações restantes (cursor {fim}) ---\n")
+        return fim
+
+    saida.write(f"\nSaldo:\n\tR$ {conta.saldo:.2f}\n")
+    saida.write("==========================================\n")
+    return None
 
 
 @log_transacao
+@metricas.instrumentar()
+def exibir_extrato(clientes, contas):
+    cpf = input("Informe o CPF do cliente: ")
+    cliente = filtrar_cliente(cpf, clientes)
+
+    if not cliente:
+        print("\n@@@ Cliente não encontrado! @@@")
+        return
+
+    conta = recuperar_conta_cliente(cliente, contas)
+    if not conta:
+        return
+
+    escrever_extrato(conta)
+
+
+@log_transacao
+@metricas.instrumentar()
 def criar_cliente(clientes):
     cpf = input("Informe o CPF (somente número): ")
     cliente = filtrar_cliente(cpf, clientes)
@@ -353,12 +1127,14 @@ def criar_cliente(clientes):
 
     cliente = PessoaFisica(nome=nome, data_nascimento=data_nascimento, cpf=cpf, endereco=endereco)
 
-    clientes.append(cliente)
+    clientes.adicionar(cliente)
+    notificar("cliente", cliente)
 
     print("\n=== Cliente criado com sucesso! ===")
 
 
 @log_transacao
+@metricas.instrumentar()
 def criar_conta(numero_conta, clientes, contas):
     cpf = input("Informe o CPF do cliente: ")
     cliente = filtrar_cliente(cpf, clientes)
@@ -368,33 +1144,60 @@ def criar_conta(numero_conta, clientes, contas):
         return
 
     conta = ContaCorrente.nova_conta(cliente=cliente, numero=numero_conta, limite=500, limite_saques=50)
-    contas.append(conta)
+    contas.adicionar(conta)
     cliente.contas.append(conta)
+    notificar("conta", conta)
 
     print("\n=== Conta criada com sucesso! ===")
 
 
-def listar_contas(contas):
-    for conta in ContasIterador(contas):
+def listar_contas(contas, **opcoes):
+    for linha in ContasIterador(contas, **opcoes):
         print("=" * 100)
-        print(textwrap.dedent(str(conta)))
+        print(linha)
 
 
 def main():
-    clientes = []
-    contas = []
+    parser = argparse.ArgumentParser(description="Sistema bancário interativo.")
+    adicionar_opcao_eventos(parser)
+    adicionar_opcao_log(parser)
+    args = parser.parse_args()
+
+    # O escritor só abre o arquivo no primeiro registro: trocá-lo aqui não deixa log.txt aberto à toa
+    global escritor_log
+    if args.log_formato != escritor_log.formato:
+        escritor_log = EscritorLog(caminho_log(args.log_formato), formato=args.log_formato)
+
+    persistencia = Persistencia(ROOT_PATH / "dados")
+    try:
+        clientes_salvos, contas_salvas = persistencia.carregar(PessoaFisica, ContaCorrente)
+    except DiretorioEmUso as exc:
+        sys.exit(str(exc))
+    clientes = ClienteRegistry(clientes_salvos)
+    contas = ContaRegistry(contas_salvas)
+    persistencia.iniciar(clientes, contas)
+    ouvintes.append(persistencia.registrar_evento)
+
+    eventos = None
+    if args.eventos:
+        eventos = LojaEventos(ROOT_PATH / "dados", CREDITOS)
+        eventos.abrir(contas)
+        ouvintes.append(eventos.registrar_evento)
 
     while True:
         opcao = menu()
 
         if opcao == "d":
-            depositar(clientes)
+            depositar(clientes, contas)
 
         elif opcao == "s":
-            sacar(clientes)
+            sacar(clientes, contas)
+
+        elif opcao == "t":
+            transferir(clientes, contas)
 
         elif opcao == "e":
-            exibir_extrato(clientes)
+            exibir_extrato(clientes, contas)
 
         elif opcao == "nu":
             criar_cliente(clientes)
@@ -407,10 +1210,14 @@ def main():
             listar_contas(contas)
 
         elif opcao == "q":
+            persistencia.fechar()
+            if eventos is not None:
+                eventos.fechar()
             break
 
         else:
             print("\n@@@ Operação inválida, por favor selecione novamente a operação desejada. @@@")
 
 
-main()
+if __name__ == "__main__":
+    main()
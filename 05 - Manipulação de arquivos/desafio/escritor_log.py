@@ -0,0 +1,151 @@
+import atexit
+import json
+import os
+import queue
+import reprlib
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from time import monotonic, time
+
+FORMATOS = ("texto", "jsonl")
+
+_FIM = object()
+
+
+class EscritorLog:
+    def __init__(
+        self, caminho, formato="texto", intervalo_flush=1.0, tamanho_lote=1000, tamanho_maximo=10 * 2**20, backups=3
+    ):
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato de log inválido: {formato}!")
+
+        self.caminho = Path(caminho)
+        self.formato = formato
+        self.intervalo_flush = intervalo_flush
+        self.tamanho_lote = tamanho_lote
+        self.tamanho_maximo = tamanho_maximo
+        self.backups = backups
+
+        self._fila = queue.SimpleQueue()
+        self._thread = None
+        self._trava = threading.Lock()
+
+        self._repr = reprlib.Repr()
+        self._repr.maxlist = 4
+        self._repr.maxtuple = 6
+        self._repr.maxdict = 6
+        self._repr.maxstring = 60
+        self._repr.maxother = 80
+
+    def registrar(self, funcao, args, kwargs, resultado):
+        if self._thread is None:
+            self._iniciar()
+
+        # O repr sai aqui, na thread de quem chamou: na thread de escrita os objetos já podem ter mudado
+        resumo = self._repr.repr
+        self._fila.put((time(), funcao, resumo(args), resumo(kwargs), resumo(resultado)))
+
+    def flush(self, timeout=5.0):
+        thread = self._thread
+        if thread is None:
+            return True
+
+        concluido = threading.Event()
+        self._fila.put(concluido)
+        # Se a thread de escrita morreu, ninguém vai sinalizar o evento: desiste em vez de travar quem chamou
+        prazo = monotonic() + timeout
+        while not concluido.wait(min(0.1, max(prazo - monotonic(), 0))):
+            if not thread.is_alive() or monotonic() >= prazo:
+                return False
+        return True
+
+    def fechar(self):
+        with self._trava:
+            if self._thread is None:
+                return
+            thread, self._thread = self._thread, None
+
+        self._fila.put(_FIM)
+        thread.join()
+        atexit.unregister(self.fechar)
+
+    def _iniciar(self):
+        with self._trava:
+            if self._thread is not None:
+                return
+
+            self._thread = threading.Thread(target=self._executar, name="escritor-log", daemon=True)
+            self._thread.start()
+            atexit.register(self.fechar)
+
+    def formatar(self, data, funcao, args, kwargs, resultado):
+        data_hora = datetime.fromtimestamp(data, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        if self.formato == "jsonl":
+            registro = {
+                "data": data_hora,
+                "timestamp": data,
+                "funcao": funcao,
+                "args": args,
+                "kwargs": kwargs,
+                "resultado": resultado,
+            }
+            return json.dumps(registro, ensure_ascii=False) + "\n"
+
+        return f"[{data_hora}] Função '{funcao}' executada com argumentos {args} e {kwargs}. Retornou {resultado}\n"
+
+    def _executar(self):
+        arquivo = open(self.caminho, "a", encoding="utf-8")
+        lote = []
+        prazo = None
+
+        try:
+            while True:
+                try:
+                    timeout = None if prazo is None else max(prazo - monotonic(), 0)
+                    item = self._fila.get(timeout=timeout)
+                except queue.Empty:
+                    item = None
+
+                if isinstance(item, tuple):
+                    if not lote:
+                        prazo = monotonic() + self.intervalo_flush
+                    lote.append(self.formatar(*item))
+                    if len(lote) < self.tamanho_lote:
+                        continue
+
+                arquivo = self._gravar(arquivo, lote)
+                lote, prazo = [], None
+
+                if isinstance(item, threading.Event):
+                    item.set()
+                elif item is _FIM:
+                    return
+        finally:
+            arquivo.close()
+
+    def _gravar(self, arquivo, lote):
+        if not lote:
+            return arquivo
+
+        arquivo.writelines(lote)
+        arquivo.flush()
+
+        if arquivo.tell() < self.tamanho_maximo:
+            return arquivo
+
+        arquivo.close()
+        self._rotacionar()
+        return open(self.caminho, "a", encoding="utf-8")
+
+    def _rotacionar(self):
+        if self.backups <= 0:
+            self.caminho.unlink(missing_ok=True)
+            return
+
+        for indice in range(self.backups - 1, 0, -1):
+            origem = self.caminho.with_name(f"{self.caminho.name}.{indice}")
+            if origem.exists():
+                os.replace(origem, self.caminho.with_name(f"{self.caminho.name}.{indice + 1}"))
+
+        os.replace(self.caminho, self.caminho.with_name(f"{self.caminho.name}.1"))
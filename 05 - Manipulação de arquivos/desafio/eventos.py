@@ -0,0 +1,232 @@
+import argparse
+import os
+import struct
+import sys
+from pathlib import Path
+from time import perf_counter
+
+from persistencia import QUANTIDADE, REGISTRO_TRANSACAO, _fsync_diretorio
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+ROOT_PATH = Path(__file__).parent
+
+ASSINATURA_EVENTOS = b"BANCOEV1"
+ASSINATURA_CHECKPOINT = b"BANCOCK1"
+CHECKPOINT_CONTA = struct.Struct("<qdQ")  # número, saldo, nº de eventos da conta
+EVENTOS_POR_BLOCO = 1_000_000
+
+if np is not None:
+    # Mesmo layout de REGISTRO_TRANSACAO ("<qBdq", 25 bytes sem alinhamento)
+    TIPO_EVENTO = np.dtype([("numero", "<i8"), ("codigo", "u1"), ("valor", "<f8"), ("data", "<i8")])
+
+
+class LojaEventos:
+    def __init__(self, diretorio, creditos, eventos_por_checkpoint=1_000_000):
+        self.diretorio = Path(diretorio)
+        self.caminho_eventos = self.diretorio / "eventos.bin"
+        self.caminho_checkpoint = self.diretorio / "checkpoint_eventos.bin"
+        self.creditos = frozenset(creditos)
+        self.eventos_por_checkpoint = eventos_por_checkpoint
+
+        self._arquivo = None
+        self._saldos = {}
+        self._transacoes = {}
+        self._eventos = 0
+        self._eventos_checkpoint = 0
+
+    @property
+    def eventos(self):
+        return self._eventos
+
+    def abrir(self, contas=()):
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        if not self.caminho_eventos.exists():
+            with open(self.caminho_eventos, "wb") as arquivo:
+                arquivo.write(ASSINATURA_EVENTOS)
+
+        # Um evento gravado pela metade (queda no meio da escrita) é descartado
+        tamanho = self.caminho_eventos.stat().st_size - len(ASSINATURA_EVENTOS)
+        if tamanho % REGISTRO_TRANSACAO.size:
+            with open(self.caminho_eventos, "r+b") as arquivo:
+                arquivo.truncate(len(ASSINATURA_EVENTOS) + tamanho - tamanho % REGISTRO_TRANSACAO.size)
+
+        self._saldos, self._transacoes, self._eventos = self.reconstruir()
+        self._eventos_checkpoint = self._ler_checkpoint()[0]
+        self._arquivo = open(self.caminho_eventos, "ab")
+        self._semear(contas)
+
+    def _semear(self, contas):
+        # Lançamentos anteriores à loja (ou de quando ela estava desligada) entram como eventos iniciais: cada conta
+        # recebe a parte do histórico que ainda não tem eventos, e auditar() não acusa o que a loja nunca viu
+        eventos = self._eventos
+        for conta in contas:
+            historico = conta.historico
+            inicio = self._transacoes.get(conta.numero, 0)
+            if inicio < len(historico._tipos):
+                self.anexar_varios(
+                    (conta.numero, historico._tipos[posicao], historico._valores[posicao], historico._datas[posicao])
+                    for posicao in range(inicio, len(historico._tipos))
+                )
+        if self._eventos > eventos:
+            self.salvar_checkpoint()
+
+    def registrar_evento(self, evento, *dados):
+        if evento == "transacao":
+            conta, codigo, valor, data = dados
+            self.anexar(conta.numero, codigo, valor, data)
+        elif evento == "transacoes":
+            (transacoes,) = dados
+            self.anexar_varios((conta.numero, codigo, valor, data) for conta, codigo, valor, data in transacoes)
+
+    def anexar(self, numero, codigo, valor, data):
+        self._arquivo.write(REGISTRO_TRANSACAO.pack(numero, codigo, valor, data))
+        self._arquivo.flush()
+        self._aplicar(numero, codigo, valor)
+
+        if self._eventos - self._eventos_checkpoint >= self.eventos_por_checkpoint:
+            self.salvar_checkpoint()
+
+    def anexar_varios(self, eventos):
+        for numero, codigo, valor, data in eventos:
+            self._arquivo.write(REGISTRO_TRANSACAO.pack(numero, codigo, valor, data))
+            self._aplicar(numero, codigo, valor)
+            if self._eventos - self._eventos_checkpoint >= self.eventos_por_checkpoint:
+                self.salvar_checkpoint()
+        self._arquivo.flush()
+
+    def _aplicar(self, numero, codigo, valor):
+        self._saldos[numero] = self._saldos.get(numero, 0.0) + (valor if codigo in self.creditos else -valor)
+        self._transacoes[numero] = self._transacoes.get(numero, 0) + 1
+        self._eventos += 1
+
+    def saldo(self, numero):
+        return self._saldos.get(numero, 0.0)
+
+    def salvar_checkpoint(self):
+        self._arquivo.flush()
+        os.fsync(self._arquivo.fileno())
+
+        temporario = self.caminho_checkpoint.with_suffix(".tmp")
+        with open(temporario, "wb", buffering=2**20) as arquivo:
+            arquivo.write(ASSINATURA_CHECKPOINT)
+            arquivo.write(QUANTIDADE.pack(self._eventos))
+            arquivo.write(QUANTIDADE.pack(len(self._saldos)))
+            for numero, saldo in self._saldos.items():
+                arquivo.write(CHECKPOINT_CONTA.pack(numero, saldo, self._transacoes[numero]))
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+
+        os.replace(temporario, self.caminho_checkpoint)
+        _fsync_diretorio(self.diretorio)
+        self._eventos_checkpoint = self._eventos
+
+    def fechar(self):
+        if self._arquivo is None:
+            return
+
+        if self._eventos > self._eventos_checkpoint:
+            self.salvar_checkpoint()
+        self._arquivo.close()
+        self._arquivo = None
+
+    def _ler_checkpoint(self):
+        if not self.caminho_checkpoint.exists():
+            return 0, {}, {}
+
+        dados = memoryview(self.caminho_checkpoint.read_bytes())
+        if bytes(dados[: len(ASSINATURA_CHECKPOINT)]) != ASSINATURA_CHECKPOINT:
+            raise ValueError(f"Checkpoint inválido: {self.caminho_checkpoint}")
+
+        offset = len(ASSINATURA_CHECKPOINT)
+        (eventos,) = QUANTIDADE.unpack_from(dados, offset)
+        (quantidade,) = QUANTIDADE.unpack_from(dados, offset + QUANTIDADE.size)
+        offset += 2 * QUANTIDADE.size
+
+        saldos, transacoes = {}, {}
+        fim = offset + quantidade * CHECKPOINT_CONTA.size
+        for numero, saldo, quantidade_conta in CHECKPOINT_CONTA.iter_unpack(dados[offset:fim]):
+            saldos[numero] = saldo
+            transacoes[numero] = quantidade_conta
+        return eventos, saldos, transacoes
+
+    def reconstruir(self, usar_checkpoint=True, vetorizado=True):
+        eventos, saldos, transacoes = self._ler_checkpoint() if usar_checkpoint else (0, {}, {})
+        aplicar_bloco = self._aplicar_bloco_vetorizado if vetorizado and np is not None else self._aplicar_bloco
+
+        # Só os eventos depois do checkpoint são lidos, em blocos de tamanho fixo
+        with open(self.caminho_eventos, "rb") as arquivo:
+            arquivo.seek(len(ASSINATURA_EVENTOS) + eventos * REGISTRO_TRANSACAO.size)
+            while True:
+                bloco = arquivo.read(EVENTOS_POR_BLOCO * REGISTRO_TRANSACAO.size)
+                bloco = bloco[: len(bloco) - len(bloco) % REGISTRO_TRANSACAO.size]
+                if not bloco:
+                    break
+                aplicar_bloco(bloco, saldos, transacoes)
+                eventos += len(bloco) // REGISTRO_TRANSACAO.size
+
+        return saldos, transacoes, eventos
+
+    def _aplicar_bloco(self, bloco, saldos, transacoes):
+        creditos = self.creditos
+        for numero, codigo, valor, _ in REGISTRO_TRANSACAO.iter_unpack(bloco):
+            saldos[numero] = saldos.get(numero, 0.0) + (valor if codigo in creditos else -valor)
+            transacoes[numero] = transacoes.get(numero, 0) + 1
+
+    def _aplicar_bloco_vetorizado(self, bloco, saldos, transacoes):
+        eventos = np.frombuffer(bloco, dtype=TIPO_EVENTO)
+        valores = np.where(np.isin(eventos["codigo"], list(self.creditos)), eventos["valor"], -eventos["valor"])
+        numeros, inverso, contagens = np.unique(eventos["numero"], return_inverse=True, return_counts=True)
+        numeros = numeros.tolist()
+
+        # add.at soma na ordem dos eventos, como a conta fez ao vivo: o resultado é idêntico bit a bit
+        parciais = np.array([saldos.get(numero, 0.0) for numero in numeros], dtype=np.float64)
+        np.add.at(parciais, inverso, valores)
+        saldos.update(zip(numeros, parciais.tolist()))
+        for numero, quantidade in zip(numeros, contagens.tolist()):
+            transacoes[numero] = transacoes.get(numero, 0) + quantidade
+
+    def auditar(self, contas):
+        divergencias = []
+        for conta in contas:
+            saldo = self._saldos.get(conta.numero, 0.0)
+            if saldo != conta.saldo or self._transacoes.get(conta.numero, 0) != len(conta.historico._tipos):
+                divergencias.append((conta.numero, conta.saldo, saldo))
+        return divergencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconstrói os saldos do banco a partir dos eventos de Saque/Deposito.")
+    parser.add_argument("--dados", type=Path, default=ROOT_PATH / "dados")
+    parser.add_argument("--sem-checkpoint", action="store_true", help="reproduz todos os eventos desde o início")
+    parser.add_argument("--sequencial", action="store_true", help="não usa NumPy")
+    parser.add_argument("--auditar", action="store_true", help="compara com o estado salvo por persistencia.py")
+    args = parser.parse_args()
+
+    from desafio_v2 import CREDITOS, ContaCorrente, PessoaFisica
+    from persistencia import Persistencia
+
+    loja = LojaEventos(args.dados, CREDITOS)
+    if not loja.caminho_eventos.exists():
+        sys.exit(f"Nenhum evento em {loja.caminho_eventos}")
+
+    inicio = perf_counter()
+    saldos, transacoes, eventos = loja.reconstruir(usar_checkpoint=not args.sem_checkpoint, vetorizado=not args.sequencial)
+    duracao = perf_counter() - inicio
+    print(f"{eventos} eventos, {len(saldos)} contas reconstruídas em {duracao:.2f}s", file=sys.stderr)
+
+    if args.auditar:
+        # Só leitura: a auditoria pode rodar com o banco aberto, sem travar o diretório nem truncar o WAL
+        _, contas = Persistencia(args.dados).carregar(PessoaFisica, ContaCorrente, somente_leitura=True)
+        loja._saldos, loja._transacoes = saldos, transacoes
+        divergencias = loja.auditar(contas)
+        for numero, saldo_conta, saldo_eventos in divergencias:
+            print(f"Conta {numero}: saldo {saldo_conta:.2f}, eventos {saldo_eventos:.2f}")
+        print(f"{len(divergencias)} contas divergentes de {len(contas)}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
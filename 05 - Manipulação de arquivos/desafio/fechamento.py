@@ -0,0 +1,217 @@
+import argparse
+import gc
+import math
+import os
+import sys
+from bisect import bisect_right
+from pathlib import Path
+from time import perf_counter, time
+
+from desafio_v2 import (
+    CODIGOS_TRANSACAO,
+    CREDITOS,
+    SEGUNDOS_POR_DIA,
+    ContaCorrente,
+    PessoaFisica,
+    adicionar_opcao_eventos,
+    notificar,
+    ouvintes,
+)
+from eventos import LojaEventos
+from persistencia import DiretorioEmUso, Persistencia
+
+try:
+    import numpy as np
+except ImportError:  # o cálculo vetorizado é opcional; sem NumPy o fechamento segue conta a conta
+    np = None
+
+ROOT_PATH = Path(__file__).parent
+
+DEPOSITO = CODIGOS_TRANSACAO["Deposito"]
+TARIFA = CODIGOS_TRANSACAO["Tarifa"]
+JUROS = CODIGOS_TRANSACAO["Juros"]
+
+ULTIMO_FECHAMENTO = "ultimo_fechamento.txt"  # dia UTC do último fechamento gravado, no diretório de dados
+
+TAXA_JUROS_ANUAL = 0.06
+
+# Tarifa diária por faixa do saldo de abertura: abaixo de LIMITES_FAIXAS[i] paga TARIFAS[i]; acima do último, isento
+LIMITES_FAIXAS = (1_000.0, 10_000.0)
+TARIFAS = (0.50, 0.20, 0.0)
+
+
+def taxa_diaria(taxa_anual=TAXA_JUROS_ANUAL):
+    return (1 + taxa_anual) ** (1 / 365) - 1
+
+
+def calcular_juros(saldo, taxa):
+    # Juros truncados no centavo; a mesma sequência de operações em float do caminho vetorizado
+    return math.floor(saldo * taxa * 100) / 100 if saldo > 0 else 0.0
+
+
+def calcular_tarifa(saldo):
+    return TARIFAS[bisect_right(LIMITES_FAIXAS, saldo)]
+
+
+class Fechamento:
+    def __init__(self, quantidade_contas):
+        self.contas = quantidade_contas
+        self.depositos = 0
+        self.tarifas = 0
+        self.total_juros = 0.0
+        self.total_tarifas = 0.0
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__}: {self.contas} contas, {self.depositos} depósitos de juros "
+            f"(R$ {self.total_juros:.2f}), {self.tarifas} tarifas (R$ {self.total_tarifas:.2f})>"
+        )
+
+
+def _lancar(conta, juros, tarifa, data, saldo):
+    # O saldo final já vem calculado; o histórico recebe os lançamentos direto, sem passar por sacar/depositar
+    historico = conta.historico
+    if juros > 0:
+        historico._registrar(JUROS, juros, data)
+        if ouvintes:
+            notificar("transacao", conta, JUROS, juros, data)
+    if tarifa > 0:
+        historico._registrar(TARIFA, tarifa, data)
+        if ouvintes:
+            notificar("transacao", conta, TARIFA, tarifa, data)
+    conta._saldo = saldo
+
+
+def _processar_sequencial(contas, data, taxa, fechamento):
+    for conta in contas:
+        data_conta = max(data, conta.historico._ultima_data())
+        saldo = conta.saldo
+
+        # Mesmas regras de Juros.registrar e Tarifa.registrar, sem print por conta
+        juros = calcular_juros(saldo, taxa)
+        if juros > 0:
+            saldo += juros
+        tarifa = calcular_tarifa(conta.saldo)
+        if not 0 < tarifa <= saldo:
+            tarifa = 0.0
+        if tarifa > 0:
+            saldo -= tarifa
+
+        _lancar(conta, juros, tarifa, data_conta, saldo)
+        fechamento.depositos += 1 if juros > 0 else 0
+        fechamento.tarifas += 1 if tarifa > 0 else 0
+        fechamento.total_juros += juros
+        fechamento.total_tarifas += tarifa
+
+
+def _processar_vetorizado(contas, data, taxa, fechamento):
+    colunas = []
+    for conta in contas:
+        data_conta = max(data, conta.historico._ultima_data())
+        colunas.append((conta.saldo, data_conta))
+
+    # Datas cabem com folga na mantissa de um float64, então viajam na mesma matriz contígua dos saldos
+    saldos, datas = np.array(colunas, dtype=np.float64).T
+    del colunas
+
+    juros = np.where(saldos > 0, np.floor(saldos * taxa * 100) / 100, 0.0)
+    finais = np.where(juros > 0, saldos + juros, saldos)
+    tarifas = np.asarray(TARIFAS)[np.searchsorted(LIMITES_FAIXAS, saldos, side="right")]
+    cobradas = (tarifas > 0) & (tarifas <= finais)
+    tarifas = np.where(cobradas, tarifas, 0.0)
+    finais = np.where(cobradas, finais - tarifas, finais)
+
+    lancadas = np.flatnonzero((juros > 0) | cobradas)
+    valores = zip(
+        lancadas.tolist(),
+        juros[lancadas].tolist(),
+        tarifas[lancadas].tolist(),
+        datas[lancadas].astype(np.int64).tolist(),
+        finais[lancadas].tolist(),
+    )
+    for indice, juros_conta, tarifa, data_conta, saldo in valores:
+        _lancar(contas[indice], juros_conta, tarifa, data_conta, saldo)
+
+    fechamento.depositos = int(np.count_nonzero(juros > 0))
+    fechamento.tarifas = int(np.count_nonzero(cobradas))
+    fechamento.total_juros = float(juros.sum())
+    fechamento.total_tarifas = float(tarifas.sum())
+
+
+def processar_fechamento(contas, data=None, taxa=None, vetorizado=True):
+    contas = list(contas)
+    data = int(time()) if data is None else data
+    taxa = taxa_diaria() if taxa is None else taxa
+    fechamento = Fechamento(len(contas))
+
+    # Os lançamentos só criam objetos sem ciclos: com o coletor pausado, as contas não são varridas de novo
+    coletor_ativo = gc.isenabled()
+    gc.disable()
+    try:
+        if vetorizado and np is not None and contas:
+            _processar_vetorizado(contas, data, taxa, fechamento)
+        else:
+            _processar_sequencial(contas, data, taxa, fechamento)
+    finally:
+        if coletor_ativo:
+            gc.enable()
+    return fechamento
+
+
+def ler_ultimo_fechamento(diretorio):
+    caminho = Path(diretorio) / ULTIMO_FECHAMENTO
+    return int(caminho.read_text()) if caminho.exists() else None
+
+
+def registrar_fechamento(diretorio, dia):
+    caminho = Path(diretorio) / ULTIMO_FECHAMENTO
+    temporario = caminho.with_suffix(".tmp")
+    temporario.write_text(f"{dia}\n")
+    os.replace(temporario, caminho)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lança os juros e as tarifas do dia em todas as contas.")
+    parser.add_argument("--dados", type=Path, default=ROOT_PATH / "dados")
+    parser.add_argument("--taxa-anual", type=float, default=TAXA_JUROS_ANUAL)
+    parser.add_argument("--sequencial", action="store_true", help="não usa o cálculo vetorizado (NumPy)")
+    adicionar_opcao_eventos(parser)
+    args = parser.parse_args()
+
+    data = int(time())
+    ultimo = ler_ultimo_fechamento(args.dados)
+    if ultimo is not None and ultimo >= data // SEGUNDOS_POR_DIA:
+        sys.exit(f"O fechamento do dia já foi feito ({ULTIMO_FECHAMENTO} em {args.dados}); nada foi lançado.")
+
+    persistencia = Persistencia(args.dados)
+    try:
+        clientes, contas = persistencia.carregar(PessoaFisica, ContaCorrente)
+    except DiretorioEmUso as exc:
+        sys.exit(str(exc))
+    persistencia.iniciar(clientes, contas)
+
+    eventos = None
+    if args.eventos:
+        eventos = LojaEventos(args.dados, CREDITOS)
+        eventos.abrir(contas)
+        ouvintes.append(eventos.registrar_evento)
+
+    inicio = perf_counter()
+    fechamento = processar_fechamento(contas, data, taxa_diaria(args.taxa_anual), vetorizado=not args.sequencial)
+    duracao = perf_counter() - inicio
+
+    # Antes do snapshot: uma queda entre os dois perde o fechamento do dia (visível pelo registro, sem lançamentos),
+    # mas nunca o repete numa segunda execução com os juros e as tarifas já gravados
+    registrar_fechamento(args.dados, data // SEGUNDOS_POR_DIA)
+    persistencia.salvar_snapshot()
+    persistencia.fechar()
+    if eventos is not None:
+        eventos.fechar()
+
+    print(f"{len(contas)} contas em {duracao:.2f}s ({len(contas) / duracao:.0f} contas/s)", file=sys.stderr)
+    print(f"Juros: {fechamento.depositos} contas, R$ {fechamento.total_juros:.2f}", file=sys.stderr)
+    print(f"Tarifas: {fechamento.tarifas} contas, R$ {fechamento.total_tarifas:.2f}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import argparse
+import csv
+import gc
+import sys
+from datetime import datetime
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+from time import perf_counter
+
+from desafio_v2 import PLANOS_LIMITE, ClienteRegistry, ContaCorrente, ContaRegistry, PessoaFisica, notificar, ouvintes
+from persistencia import DiretorioEmUso, Persistencia
+
+ROOT_PATH = Path(__file__).parent
+
+COLUNAS = ("cpf", "nome", "data_nascimento", "endereco")
+COLUNA_PLANO = "plano"  # opcional: vazia ou ausente, o cliente fica no plano padrão do limitador
+TAMANHO_BLOCO = 10_000
+
+LINHA_INVALIDA = "linha inválida"
+CPF_INVALIDO = "CPF inválido"
+NOME_VAZIO = "nome vazio"
+DATA_INVALIDA = "data de nascimento inválida"
+PLANO_INVALIDO = "plano desconhecido"
+CPF_CADASTRADO = "já existe cliente com esse CPF"
+CPF_REPETIDO = "CPF repetido no arquivo"
+
+
+class ResultadoImportacao:
+    def __init__(self):
+        self.linhas = 0
+        self.importados = 0
+        self.rejeitados = 0
+        self.duracao = 0.0
+
+    @property
+    def linhas_por_segundo(self):
+        return self.linhas / self.duracao if self.duracao else 0.0
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__}: {self.linhas} linhas, {self.importados} importados, "
+            f"{self.rejeitados} rejeitados>"
+        )
+
+
+@lru_cache(maxsize=2**16)
+def _data_valida(texto):
+    # Datas de nascimento se repetem muito entre clientes: cada texto distinto é validado uma vez só
+    try:
+        datetime.strptime(texto, "%d-%m-%Y")
+    except ValueError:
+        return False
+    return True
+
+
+def _indices_colunas(cabecalho):
+    nomes = [nome.strip().lower() for nome in cabecalho]
+    faltando = [coluna for coluna in COLUNAS if coluna not in nomes]
+    if faltando:
+        raise ValueError(f"Cabeçalho sem as colunas: {', '.join(faltando)}")
+    colunas = COLUNAS + (COLUNA_PLANO,) if COLUNA_PLANO in nomes else COLUNAS
+    return colunas, [nomes.index(coluna) for coluna in colunas]
+
+
+def _plano(campos):
+    return campos[4] or None if len(campos) > len(COLUNAS) else None
+
+
+def _motivo_rejeicao(campos, clientes, importados):
+    if campos is None:
+        return LINHA_INVALIDA
+
+    cpf, nome, data_nascimento, _ = campos[: len(COLUNAS)]
+    if not (cpf.isascii() and cpf.isdigit()):
+        return CPF_INVALIDO
+    if not nome:
+        return NOME_VAZIO
+    if not _data_valida(data_nascimento):
+        return DATA_INVALIDA
+    if _plano(campos) not in (None, *PLANOS_LIMITE):
+        return PLANO_INVALIDO
+    if cpf in importados:
+        return CPF_REPETIDO
+    if cpf in clientes:
+        return CPF_CADASTRADO
+    return None
+
+
+def importar_clientes(
+    caminho, clientes, contas, rejeitadas=None, tamanho_bloco=TAMANHO_BLOCO, limite=500, limite_saques=50
+):
+    caminho = Path(caminho)
+    rejeitadas = caminho.with_name(f"{caminho.stem}_rejeitadas.csv") if rejeitadas is None else rejeitadas
+    resultado = ResultadoImportacao()
+    inicio = perf_counter()
+
+    # Todo objeto criado continua vivo até o fim: o coletor só varreria de novo um heap que não para de crescer
+    coletor_ativo = gc.isenabled()
+    gc.disable()
+    try:
+        _importar(caminho, clientes, contas, rejeitadas, tamanho_bloco, limite, limite_saques, resultado)
+    finally:
+        if coletor_ativo:
+            gc.enable()
+
+    resultado.duracao = perf_counter() - inicio
+    return resultado
+
+
+def _importar(caminho, clientes, contas, rejeitadas, tamanho_bloco, limite, limite_saques, resultado):
+    importados = set()
+    with open(caminho, newline="", encoding="utf-8") as arquivo, open(
+        rejeitadas, "w", newline="", encoding="utf-8"
+    ) as saida_rejeitadas:
+        leitor = csv.reader(arquivo)
+        colunas, indices = _indices_colunas(next(leitor, ()))
+        quantidade_colunas = max(indices) + 1
+
+        escritor = csv.writer(saida_rejeitadas)
+        escritor.writerow(["linha", *colunas, "motivo"])
+
+        # O arquivo é lido em blocos de linhas: só um bloco fica em memória de cada vez
+        linhas = enumerate(leitor, start=2)
+        for bloco in iter(lambda: list(islice(linhas, tamanho_bloco)), []):
+            novos_clientes, novas_contas = [], []
+            for numero_linha, linha in bloco:
+                campos = [linha[indice].strip() for indice in indices] if len(linha) >= quantidade_colunas else None
+                motivo = _motivo_rejeicao(campos, clientes, importados)
+                if motivo is not None:
+                    escritor.writerow([numero_linha, *(campos or linha), motivo])
+                    continue
+
+                cpf, nome, data_nascimento, endereco = campos[: len(COLUNAS)]
+                cliente = PessoaFisica(
+                    nome=nome, data_nascimento=data_nascimento, cpf=cpf, endereco=endereco, plano=_plano(campos)
+                )
+                conta = ContaCorrente.nova_conta(
+                    cliente=cliente,
+                    numero=len(contas) + len(novas_contas) + 1,
+                    limite=limite,
+                    limite_saques=limite_saques,
+                )
+                cliente.contas.append(conta)
+                importados.add(cpf)
+                novos_clientes.append(cliente)
+                novas_contas.append(conta)
+
+            clientes.estender(novos_clientes)
+            contas.estender(novas_contas)
+            if ouvintes:
+                for cliente in novos_clientes:
+                    notificar("cliente", cliente)
+                for conta in novas_contas:
+                    notificar("conta", conta)
+
+            resultado.linhas += len(bloco)
+            resultado.importados += len(novos_clientes)
+            resultado.rejeitados += len(bloco) - len(novos_clientes)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Importa clientes de um CSV (cpf,nome,data_nascimento,endereco e, opcional, plano)."
+    )
+    parser.add_argument("arquivo", type=Path)
+    parser.add_argument("--dados", type=Path, default=ROOT_PATH / "dados")
+    parser.add_argument("--rejeitadas", type=Path, default=None)
+    parser.add_argument("--tamanho-bloco", type=int, default=TAMANHO_BLOCO)
+    args = parser.parse_args()
+
+    persistencia = Persistencia(args.dados)
+    try:
+        clientes_salvos, contas_salvas = persistencia.carregar(PessoaFisica, ContaCorrente)
+    except DiretorioEmUso as exc:
+        sys.exit(str(exc))
+    clientes = ClienteRegistry(clientes_salvos)
+    contas = ContaRegistry(contas_salvas)
+
+    # Sem WAL por cliente: o snapshot do fim grava tudo de uma vez. Se a importação cair no meio, basta repeti-la,
+    # porque os CPFs já cadastrados são rejeitados
+    rejeitadas = args.rejeitadas or args.arquivo.with_name(f"{args.arquivo.stem}_rejeitadas.csv")
+    resultado = importar_clientes(args.arquivo, clientes, contas, rejeitadas, tamanho_bloco=args.tamanho_bloco)
+
+    persistencia.iniciar(clientes, contas)
+    persistencia.salvar_snapshot()
+    persistencia.fechar()
+
+    print(
+        f"{resultado.linhas} linhas em {resultado.duracao:.2f}s ({resultado.linhas_por_segundo:.0f} linhas/s)",
+        file=sys.stderr,
+    )
+    print(f"Importados: {resultado.importados} | Rejeitados: {resultado.rejeitados} (ver {rejeitadas})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
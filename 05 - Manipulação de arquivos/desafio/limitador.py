@@ -0,0 +1,169 @@
+from threading import Lock
+from time import time
+
+LOTE_VARREDURA = 1024
+
+
+class BaldeTokens:
+    # Até `capacidade` operações em rajada, repostas à razão de `por_segundo`
+    externo = False
+
+    def __init__(self, capacidade, por_segundo):
+        self.capacidade = capacidade
+        self.por_segundo = por_segundo
+
+    def novo_estado(self, agora):
+        return [self, self.capacidade, agora]  # política, tokens, último acesso
+
+    def consumir(self, estado, agora, custo):
+        # Relógio que volta (time() não é monotônico) não repõe nem tira tokens
+        if agora > estado[2]:
+            estado[1] = min(self.capacidade, estado[1] + (agora - estado[2]) * self.por_segundo)
+            estado[2] = agora
+        if estado[1] < custo:
+            return False
+
+        estado[1] -= custo
+        return True
+
+    def devolver(self, estado, custo):
+        estado[1] = min(self.capacidade, estado[1] + custo)
+
+    def ocioso(self, estado, agora):
+        return estado[1] + (agora - estado[2]) * self.por_segundo >= self.capacidade
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}: {self.capacidade} operações, {self.por_segundo:g}/s>"
+
+
+class LimiteJanela:
+    # Até `limite` operações por janela de `segundos`. Deslizante, a janela anterior ainda pesa na proporção em que se
+    # sobrepõe à atual; fixa, a contagem recomeça a cada múltiplo de `segundos` (com 86400, a cada dia UTC)
+    externo = False
+
+    def __init__(self, limite, segundos, deslizante=True):
+        self.limite = limite
+        self.segundos = segundos
+        self.deslizante = deslizante
+
+    def novo_estado(self, agora):
+        return [self, agora // self.segundos * self.segundos, 0, 0]  # política, início da janela, atual, anterior
+
+    def consumir(self, estado, agora, custo):
+        inicio = max(agora // self.segundos * self.segundos, estado[1])
+        if inicio != estado[1]:
+            estado[3] = estado[2] if inicio - estado[1] == self.segundos else 0
+            estado[2] = 0
+            estado[1] = inicio
+
+        anteriores = estado[3] * (1 - (agora - inicio) / self.segundos) if self.deslizante else 0
+        if estado[2] + anteriores + custo > self.limite:
+            return False
+
+        estado[2] += custo
+        return True
+
+    def devolver(self, estado, custo):
+        estado[2] = max(0, estado[2] - custo)
+
+    def ocioso(self, estado, agora):
+        return agora - estado[1] >= (2 if self.deslizante else 1) * self.segundos
+
+    def __repr__(self):
+        tipo = "deslizante" if self.deslizante else "fixa"
+        return f"<{self.__class__.__name__}: {self.limite} operações em {self.segundos:g}s, {tipo}>"
+
+
+class LimiteContado:
+    # Até `limite` operações contadas fora do limitador: quem chama informa quantas já houve (no banco, as transações
+    # do dia no histórico da conta). Sem estado próprio, a contagem sobrevive a reinícios e só inclui o registrado
+    externo = True
+
+    def __init__(self, limite):
+        self.limite = limite
+
+    def permitir(self, usados, custo):
+        return usados + custo <= self.limite
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}: {self.limite} operações>"
+
+
+class LimitadorTaxa:
+    def __init__(self, planos, plano_padrao="padrao", intervalo_varredura=60.0):
+        if plano_padrao not in planos:
+            raise ValueError(f"Plano padrão desconhecido: {plano_padrao}!")
+
+        self.planos = dict(planos)
+        self.plano_padrao = plano_padrao
+        self.intervalo_varredura = intervalo_varredura
+        self._estados = {}
+        self._trava = Lock()
+        self._varrendo = []  # chaves que a rodada de varredura em curso ainda vai examinar
+        self._proxima_varredura = time() + intervalo_varredura
+
+    def politica(self, plano=None):
+        return self.planos[self.plano_padrao if plano is None else plano]
+
+    def permitir(self, chave, plano=None, custo=1, agora=None, usados=None):
+        # `usados` (função sem argumentos) só é chamada pelas políticas que contam fora do limitador
+        politica = self.politica(plano)
+        if politica.externo:
+            return politica.permitir(0 if usados is None else usados(), custo)
+
+        agora = time() if agora is None else agora
+        with self._trava:
+            if agora >= self._proxima_varredura:
+                self._varrer_lote(agora)
+
+            estado = self._estados.get(chave)
+            if estado is None or estado[0] is not politica:
+                estado = self._estados[chave] = politica.novo_estado(agora)
+            return politica.consumir(estado, agora, custo)
+
+    def devolver(self, chave, custo=1):
+        # Desfaz a reserva de um permitir() cuja operação acabou não acontecendo
+        with self._trava:
+            estado = self._estados.get(chave)
+            if estado is not None:
+                estado[0].devolver(estado, custo)
+
+    def varrer(self, agora=None):
+        # Um estado ocioso é igual a um estado novo: descartá-lo não muda nenhuma decisão futura. A varredura percorre
+        # uma cópia das chaves, em lotes, sem segurar a trava pelo dicionário inteiro
+        agora = time() if agora is None else agora
+        with self._trava:
+            chaves = list(self._estados)
+            self._varrendo = []
+            self._proxima_varredura = agora + self.intervalo_varredura
+
+        removidos = 0
+        for inicio in range(0, len(chaves), LOTE_VARREDURA):
+            with self._trava:
+                removidos += self._remover_ociosos(chaves[inicio : inicio + LOTE_VARREDURA], agora)
+        return removidos
+
+    def _varrer_lote(self, agora):
+        # Varredura automática incremental: cada permitir() com a rodada vencida examina só LOTE_VARREDURA chaves
+        if not self._varrendo:
+            self._varrendo = list(self._estados)
+        lote = self._varrendo[-LOTE_VARREDURA:]
+        del self._varrendo[-LOTE_VARREDURA:]
+        self._remover_ociosos(lote, agora)
+        if not self._varrendo:
+            self._proxima_varredura = agora + self.intervalo_varredura
+
+    def _remover_ociosos(self, chaves, agora):
+        removidos = 0
+        for chave in chaves:
+            estado = self._estados.get(chave)
+            if estado is not None and estado[0].ocioso(estado, agora):
+                del self._estados[chave]
+                removidos += 1
+        return removidos
+
+    def __len__(self):
+        return len(self._estados)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}: {len(self)} chaves, planos {', '.join(self.planos)}>"
@@ -0,0 +1,377 @@
+import argparse
+import csv
+import sys
+from array import array
+from itertools import groupby
+from pathlib import Path
+from time import perf_counter
+
+from desafio_v2 import (
+    AGENCIA,
+    CODIGOS_TRANSACAO,
+    CREDITOS,
+    TIPOS_TRANSACAO,
+    ContaCorrente,
+    ContaRegistry,
+    PessoaFisica,
+    adicionar_opcao_eventos,
+    notificar,
+    ouvintes,
+)
+from eventos import LojaEventos
+from persistencia import DiretorioEmUso, Persistencia
+
+try:
+    import numpy as np
+except ImportError:  # o motor vetorizado é opcional; sem NumPy o lote é aplicado linha a linha
+    np = None
+
+ROOT_PATH = Path(__file__).parent
+
+SAQUE = CODIGOS_TRANSACAO["Saque"]
+DEPOSITO = CODIGOS_TRANSACAO["Deposito"]
+
+LINHA_INVALIDA = 1
+TIPO_INVALIDO = 2
+CONTA_INEXISTENTE = 3
+DATA_ANTERIOR = 4
+VALOR_INVALIDO = 5
+EXCEDE_LIMITE = 6
+EXCEDE_SAQUES = 7
+SALDO_INSUFICIENTE = 8
+
+MOTIVOS = {
+    LINHA_INVALIDA: "linha inválida",
+    TIPO_INVALIDO: "tipo de transação inválido",
+    CONTA_INEXISTENTE: "conta não encontrada",
+    DATA_ANTERIOR: "data anterior ao histórico da conta",
+    VALOR_INVALIDO: "o valor informado é inválido",
+    EXCEDE_LIMITE: "o valor do saque excede o limite",
+    EXCEDE_SAQUES: "número máximo de saques excedido",
+    SALDO_INSUFICIENTE: "saldo insuficiente",
+}
+
+# Transferências movem duas contas de uma vez e não entram no lote, que é aplicado conta a conta
+CODIGOS_POR_NOME = {"saque": SAQUE, "deposito": DEPOSITO}
+
+# Abaixo deste número de contas ativas o laço por posição deixa de compensar e o restante segue em Python puro
+CONTAS_MINIMAS_VETORIZADAS = 64
+
+
+class Lote:
+    def __init__(self):
+        self.linhas = array("q")
+        self.contas = array("q")
+        self.codigos = array("B")
+        self.valores = array("d")
+        self.datas = array("q")
+        self.invalidas = []
+
+    def __len__(self):
+        return len(self.linhas)
+
+    def adicionar(self, linha, conta, codigo, valor, data):
+        self.linhas.append(linha)
+        self.contas.append(conta)
+        self.codigos.append(codigo)
+        self.valores.append(valor)
+        self.datas.append(data)
+
+
+class Resultado:
+    def __init__(self, lote):
+        self.lote = lote
+        self.motivos = array("B", bytes(len(lote)))
+        self.aceitas = 0
+
+    @property
+    def rejeitadas(self):
+        return len(self.lote) - self.aceitas + len(self.lote.invalidas)
+
+
+def carregar_csv(caminho):
+    lote = Lote()
+    with open(caminho, newline="", encoding="utf-8") as arquivo:
+        leitor = csv.reader(arquivo)
+        next(leitor, None)
+        for numero_linha, linha in enumerate(leitor, start=2):
+            try:
+                conta, tipo, valor, data = linha
+                codigo = CODIGOS_POR_NOME.get(tipo.strip().lower(), 0)
+                lote.adicionar(numero_linha, int(conta), codigo, float(valor), int(data))
+            except ValueError:
+                lote.invalidas.append((numero_linha, linha))
+    return lote
+
+
+def _limites(conta):
+    if isinstance(conta, ContaCorrente):
+        return conta._limite, conta._limite_saques
+    return float("inf"), float("inf")
+
+
+def _motivo_rejeicao(codigo, valor, data, saldo, saques, limite, limite_saques, ultima_data):
+    # Mesma ordem de verificações de ContaCorrente.sacar / Conta.sacar / Conta.depositar
+    if data < ultima_data:
+        return DATA_ANTERIOR
+    if codigo == DEPOSITO:
+        return 0 if valor > 0 else VALOR_INVALIDO
+    if valor > limite:
+        return EXCEDE_LIMITE
+    if saques >= limite_saques:
+        return EXCEDE_SAQUES
+    if valor > saldo:
+        return SALDO_INSUFICIENTE
+    return 0 if valor > 0 else VALOR_INVALIDO
+
+
+def _ultima_data(conta):
+    datas = conta.historico._datas
+    return datas[-1] if datas else -(2**63)
+
+
+def _processar_conta(conta, posicoes, lote, resultado):
+    historico = conta.historico
+    limite, limite_saques = _limites(conta)
+    janela = getattr(conta, "_janela_saques", None)
+
+    for posicao in posicoes:
+        codigo, valor, data = lote.codigos[posicao], lote.valores[posicao], lote.datas[posicao]
+        if janela is None:
+            saques = historico.quantidade("Saque")
+        else:
+            saques = historico.quantidade_na_janela("Saque")
+
+        motivo = _motivo_rejeicao(
+            codigo, valor, data, conta.saldo, saques, limite, limite_saques, _ultima_data(conta)
+        )
+        resultado.motivos[posicao] = motivo
+        if not motivo:
+            conta.aplicar_transacao(codigo, valor, data)
+            resultado.aceitas += 1
+            if ouvintes:
+                notificar("transacao", conta, codigo, valor, data)
+
+
+def _processar_vetorizado(contas, ordem, lote, resultado):
+    numeros_ordem = np.frombuffer(lote.contas, dtype=np.int64)[ordem]
+    inicio_segmento = np.flatnonzero(np.r_[True, numeros_ordem[1:] != numeros_ordem[:-1]])
+    tamanhos = np.diff(np.r_[inicio_segmento, len(ordem)])
+    numeros = numeros_ordem[inicio_segmento].tolist()
+    quantidade_contas = len(numeros)
+
+    conta_da_linha = np.repeat(np.arange(quantidade_contas), tamanhos)
+    inicio_da_conta = np.repeat(np.cumsum(tamanhos) - tamanhos, tamanhos)
+    posicao_na_conta = np.arange(len(ordem)) - inicio_da_conta
+
+    por_posicao = np.lexsort((conta_da_linha, posicao_na_conta))
+    limites_posicao = np.searchsorted(posicao_na_conta[por_posicao], np.arange(tamanhos.max() + 1))
+
+    codigos = np.frombuffer(lote.codigos, dtype=np.uint8)[ordem]
+    valores = np.frombuffer(lote.valores, dtype=np.float64)[ordem]
+    datas = np.frombuffer(lote.datas, dtype=np.int64)[ordem]
+    motivos = np.zeros(len(ordem), dtype=np.uint8)
+
+    objetos = [contas[numero] for numero in numeros]
+    saldo = np.array([conta.saldo for conta in objetos], dtype=np.float64)
+    saques = np.array([conta.historico.quantidade("Saque") for conta in objetos], dtype=np.float64)
+    limite = np.array([_limites(conta)[0] for conta in objetos], dtype=np.float64)
+    limite_saques = np.array([_limites(conta)[1] for conta in objetos], dtype=np.float64)
+    ultima_data = np.array([_ultima_data(conta) for conta in objetos], dtype=np.int64)
+
+    rodadas = len(limites_posicao)
+    for rodada in range(len(limites_posicao)):
+        fim = limites_posicao[rodada + 1] if rodada + 1 < len(limites_posicao) else len(ordem)
+        linhas = por_posicao[limites_posicao[rodada] : fim]
+        if len(linhas) < CONTAS_MINIMAS_VETORIZADAS:
+            rodadas = rodada
+            break
+
+        c = conta_da_linha[linhas]
+        codigo, valor, data = codigos[linhas], valores[linhas], datas[linhas]
+        saque = codigo == SAQUE
+
+        motivo = np.where(valor > 0, 0, VALOR_INVALIDO).astype(np.uint8)
+        sem_saldo = saque & (valor > saldo[c])
+        motivo[sem_saldo] = SALDO_INSUFICIENTE
+        motivo[saque & (saques[c] >= limite_saques[c])] = EXCEDE_SAQUES
+        motivo[saque & (valor > limite[c])] = EXCEDE_LIMITE
+        motivo[data < ultima_data[c]] = DATA_ANTERIOR
+        motivos[linhas] = motivo
+
+        aceita = motivo == 0
+        credito = aceita & ~saque
+        debito = aceita & saque
+        saldo[c[credito]] += valor[credito]
+        saldo[c[debito]] -= valor[debito]
+        saques[c[debito]] += 1
+        ultima_data[c[aceita]] = data[aceita]
+
+    # Cauda com poucas contas ativas: mesma regra, aplicada linha a linha sobre o estado vetorizado
+    restantes = por_posicao[limites_posicao[rodadas] :] if rodadas < len(limites_posicao) else por_posicao[:0]
+    for indice in np.sort(restantes).tolist():
+        c = conta_da_linha[indice]
+        codigo, valor, data = int(codigos[indice]), float(valores[indice]), int(datas[indice])
+        motivo = _motivo_rejeicao(
+            codigo, valor, data, float(saldo[c]), saques[c], limite[c], limite_saques[c], ultima_data[c]
+        )
+        motivos[indice] = motivo
+        if not motivo:
+            if codigo == SAQUE:
+                saldo[c] = float(saldo[c]) - valor
+                saques[c] += 1
+            else:
+                saldo[c] = float(saldo[c]) + valor
+            ultima_data[c] = data
+
+    aceitas = motivos == 0
+    resultado.aceitas += int(aceitas.sum())
+    np.frombuffer(resultado.motivos, dtype=np.uint8)[ordem] = motivos
+
+    inicio = 0
+    for c, (conta, tamanho) in enumerate(zip(objetos, tamanhos.tolist())):
+        selecao = slice(inicio, inicio + tamanho)
+        inicio += tamanho
+        mascara = aceitas[selecao]
+        if not mascara.any():
+            continue
+
+        novos_codigos = codigos[selecao][mascara].tolist()
+        novos_valores = valores[selecao][mascara].tolist()
+        novas_datas = datas[selecao][mascara].tolist()
+        if ouvintes:
+            # Cada notificação vem logo depois do seu lançamento, que é então o último do histórico
+            registrar = conta.historico._registrar
+            for codigo, valor, data in zip(novos_codigos, novos_valores, novas_datas):
+                registrar(codigo, valor, data)
+                notificar("transacao", conta, codigo, valor, data)
+        else:
+            conta.historico.estender(novos_codigos, novos_valores, novas_datas)
+        conta._saldo = float(saldo[c])
+
+
+def _ordenar(contas, lote, resultado):
+    validas = []
+    for posicao in range(len(lote)):
+        if not lote.codigos[posicao]:
+            resultado.motivos[posicao] = TIPO_INVALIDO
+        elif lote.contas[posicao] not in contas:
+            resultado.motivos[posicao] = CONTA_INEXISTENTE
+        else:
+            validas.append(posicao)
+
+    validas.sort(key=lambda posicao: (lote.contas[posicao], lote.datas[posicao], lote.linhas[posicao]))
+    return validas
+
+
+def _ordenar_vetorizado(contas, lote, resultado):
+    numeros = np.frombuffer(lote.contas, dtype=np.int64)
+    codigos = np.frombuffer(lote.codigos, dtype=np.uint8)
+    motivos = np.frombuffer(resultado.motivos, dtype=np.uint8)
+
+    existe = np.isin(numeros, np.fromiter(contas, dtype=np.int64, count=len(contas)))
+    motivos[~existe] = CONTA_INEXISTENTE
+    motivos[codigos == 0] = TIPO_INVALIDO
+
+    validas = np.flatnonzero(motivos == 0)
+    ordem = np.lexsort(
+        (
+            np.frombuffer(lote.linhas, dtype=np.int64)[validas],
+            np.frombuffer(lote.datas, dtype=np.int64)[validas],
+            numeros[validas],
+        )
+    )
+    return validas[ordem]
+
+
+def processar_lote(contas, lote, vetorizado=True):
+    resultado = Resultado(lote)
+
+    if not (vetorizado and np is not None):
+        for numero, posicoes in groupby(_ordenar(contas, lote, resultado), key=lote.contas.__getitem__):
+            _processar_conta(contas[numero], posicoes, lote, resultado)
+        return resultado
+
+    ordem = _ordenar_vetorizado(contas, lote, resultado)
+    numeros = np.frombuffer(lote.contas, dtype=np.int64)[ordem]
+
+    # Contas com janela de saques dependem do relógio a cada saque e seguem pelo caminho linha a linha
+    com_janela = [
+        numero for numero in np.unique(numeros).tolist() if getattr(contas[numero], "_janela_saques", None) is not None
+    ]
+    if com_janela:
+        sequencial = np.isin(numeros, com_janela)
+        for numero, posicoes in groupby(ordem[sequencial].tolist(), key=lote.contas.__getitem__):
+            _processar_conta(contas[numero], posicoes, lote, resultado)
+        ordem = ordem[~sequencial]
+
+    if len(ordem):
+        _processar_vetorizado(contas, ordem, lote, resultado)
+
+    return resultado
+
+
+def escrever_rejeicoes(caminho, resultado):
+    lote = resultado.lote
+    with open(caminho, "w", newline="", encoding="utf-8") as arquivo:
+        escritor = csv.writer(arquivo)
+        escritor.writerow(["linha", "conta", "tipo", "valor", "data", "motivo"])
+        for numero_linha, linha in lote.invalidas:
+            escritor.writerow([numero_linha, *(linha + [""] * 4)[:4], MOTIVOS[LINHA_INVALIDA]])
+        for posicao, motivo in enumerate(resultado.motivos):
+            if motivo:
+                escritor.writerow(
+                    [
+                        lote.linhas[posicao],
+                        lote.contas[posicao],
+                        TIPOS_TRANSACAO.get(lote.codigos[posicao], ""),
+                        lote.valores[posicao],
+                        lote.datas[posicao],
+                        MOTIVOS[motivo],
+                    ]
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aplica um arquivo CSV de saques e depósitos (conta,tipo,valor,data).")
+    parser.add_argument("arquivo", type=Path)
+    parser.add_argument("--dados", type=Path, default=ROOT_PATH / "dados")
+    parser.add_argument("--rejeitadas", type=Path, default=None)
+    parser.add_argument("--sequencial", action="store_true", help="não usa o motor vetorizado (NumPy)")
+    adicionar_opcao_eventos(parser)
+    args = parser.parse_args()
+
+    persistencia = Persistencia(args.dados)
+    try:
+        clientes, contas_salvas = persistencia.carregar(PessoaFisica, ContaCorrente)
+    except DiretorioEmUso as exc:
+        sys.exit(str(exc))
+    contas = ContaRegistry(contas_salvas)
+    persistencia.iniciar(clientes, contas)
+
+    eventos = None
+    if args.eventos:
+        eventos = LojaEventos(args.dados, CREDITOS)
+        eventos.abrir(contas)
+        ouvintes.append(eventos.registrar_evento)
+
+    inicio = perf_counter()
+    lote = carregar_csv(args.arquivo)
+    # O CSV só traz o número da conta: o lote usa direto o índice da agência no diretório
+    resultado = processar_lote(contas.da_agencia(AGENCIA), lote, vetorizado=not args.sequencial)
+    duracao = perf_counter() - inicio
+
+    rejeitadas = args.rejeitadas or args.arquivo.with_name(f"{args.arquivo.stem}_rejeitadas.csv")
+    escrever_rejeicoes(rejeitadas, resultado)
+    persistencia.salvar_snapshot()
+    persistencia.fechar()
+    if eventos is not None:
+        eventos.fechar()
+
+    total = len(lote) + len(lote.invalidas)
+    print(f"{total} linhas em {duracao:.2f}s ({total / duracao:.0f} linhas/s)", file=sys.stderr)
+    print(f"Aceitas: {resultado.aceitas} | Rejeitadas: {resultado.rejeitadas} (ver {rejeitadas})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
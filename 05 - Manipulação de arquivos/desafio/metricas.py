@@ -0,0 +1,176 @@
+import functools
+import threading
+from time import perf_counter_ns
+
+# Baldes no estilo HDR: cada potência de 2 (em ns) é dividida em SUBBALDES faixas, erro relativo <= 1 / SUBBALDES
+BITS_SUBBALDE = 2
+SUBBALDES = 1 << BITS_SUBBALDE
+LATENCIA_MAXIMA_NS = 2**40  # ~18 minutos; acima disso cai no último balde
+
+
+def indice_balde(nanossegundos):
+    expoente = max(nanossegundos.bit_length() - BITS_SUBBALDE - 1, 0)
+    return (expoente << BITS_SUBBALDE) + (nanossegundos >> expoente)
+
+
+def limite_balde(indice):
+    """Maior latência (ns, exclusiva) que cai no balde."""
+    if indice < 2 * SUBBALDES:
+        return indice + 1
+    expoente = (indice >> BITS_SUBBALDE) - 1
+    return (indice - (expoente << BITS_SUBBALDE) + 1) << expoente
+
+
+QUANTIDADE_BALDES = indice_balde(LATENCIA_MAXIMA_NS - 1) + 1
+
+
+class Contador:
+    __slots__ = ("chamadas", "erros", "amostras", "soma_ns", "maximo_ns", "baldes")
+
+    def __init__(self):
+        self.chamadas = 0
+        self.erros = 0
+        self.amostras = 0
+        self.soma_ns = 0
+        self.maximo_ns = 0
+        self.baldes = [0] * QUANTIDADE_BALDES
+
+    def registrar_latencia(self, nanossegundos):
+        self.amostras += 1
+        self.soma_ns += nanossegundos
+        if nanossegundos > self.maximo_ns:
+            self.maximo_ns = nanossegundos
+        self.baldes[min(indice_balde(nanossegundos), QUANTIDADE_BALDES - 1)] += 1
+
+    def somar(self, outro):
+        self.chamadas += outro.chamadas
+        self.erros += outro.erros
+        self.amostras += outro.amostras
+        self.soma_ns += outro.soma_ns
+        self.maximo_ns = max(self.maximo_ns, outro.maximo_ns)
+        self.baldes = [a + b for a, b in zip(self.baldes, outro.baldes)]
+
+    def percentil(self, fracao):
+        if not self.amostras:
+            return 0.0
+
+        alvo = fracao * self.amostras
+        acumulado = 0
+        for indice, quantidade in enumerate(self.baldes):
+            acumulado += quantidade
+            if quantidade and acumulado >= alvo:
+                return min(limite_balde(indice), self.maximo_ns) / 1e9
+        return self.maximo_ns / 1e9
+
+
+class Metricas:
+    def __init__(self, amostragem=0, prefixo="banco"):
+        self.amostragem = amostragem  # mede a latência de 1 a cada N chamadas; 0 só conta chamadas e erros
+        self.prefixo = prefixo
+
+        # Cada thread escreve só nos próprios contadores; o snapshot soma os fragmentos de todas
+        self._local = threading.local()
+        self._fragmentos = []
+        self._trava = threading.Lock()
+
+    def _contador(self, nome):
+        contadores = getattr(self._local, "contadores", None)
+        if contadores is None:
+            contadores = self._local.contadores = {}
+            with self._trava:
+                self._fragmentos.append(contadores)
+        return contadores.setdefault(nome, Contador())
+
+    def instrumentar(self, nome=None):
+        def decorador(func):
+            rotulo = func.__name__ if nome is None else nome
+            local = self._local
+
+            @functools.wraps(func)
+            def envelope(*args, **kwargs):
+                try:
+                    contador = local.contadores[rotulo]
+                except (AttributeError, KeyError):
+                    contador = self._contador(rotulo)
+
+                contador.chamadas += 1
+                amostragem = self.amostragem
+                if not amostragem or contador.chamadas % amostragem:
+                    try:
+                        return func(*args, **kwargs)
+                    except Exception:
+                        contador.erros += 1
+                        raise
+
+                inicio = perf_counter_ns()
+                try:
+                    return func(*args, **kwargs)
+                except Exception:
+                    contador.erros += 1
+                    raise
+                finally:
+                    contador.registrar_latencia(perf_counter_ns() - inicio)
+
+            return envelope
+
+        return decorador
+
+    def zerar(self):
+        with self._trava:
+            for contadores in self._fragmentos:
+                contadores.clear()
+
+    def _somados(self):
+        with self._trava:
+            fragmentos = list(self._fragmentos)
+
+        totais = {}
+        for contadores in fragmentos:
+            for nome, contador in list(contadores.items()):
+                totais.setdefault(nome, Contador()).somar(contador)
+        return dict(sorted(totais.items()))
+
+    def snapshot(self):
+        resultado = {}
+        for nome, contador in self._somados().items():
+            resultado[nome] = {
+                "chamadas": contador.chamadas,
+                "erros": contador.erros,
+                "amostras": contador.amostras,
+                "soma_s": contador.soma_ns / 1e9,
+                "p50_s": contador.percentil(0.50),
+                "p90_s": contador.percentil(0.90),
+                "p99_s": contador.percentil(0.99),
+                "maximo_s": contador.maximo_ns / 1e9,
+                "baldes": {
+                    limite_balde(indice) / 1e9: quantidade
+                    for indice, quantidade in enumerate(contador.baldes)
+                    if quantidade
+                },
+            }
+        return resultado
+
+    def prometheus(self):
+        somados = self._somados()
+        chamadas = f"{self.prefixo}_chamadas_total"
+        erros = f"{self.prefixo}_erros_total"
+        latencia = f"{self.prefixo}_latencia_segundos"
+
+        linhas = [f"# HELP {chamadas} Chamadas por operação.", f"# TYPE {chamadas} counter"]
+        linhas += [f'{chamadas}{{operacao="{nome}"}} {contador.chamadas}' for nome, contador in somados.items()]
+        linhas += [f"# HELP {erros} Chamadas que terminaram com exceção.", f"# TYPE {erros} counter"]
+        linhas += [f'{erros}{{operacao="{nome}"}} {contador.erros}' for nome, contador in somados.items()]
+        linhas += [f"# HELP {latencia} Latência das chamadas amostradas.", f"# TYPE {latencia} histogram"]
+
+        for nome, contador in somados.items():
+            ocupados = [indice for indice, quantidade in enumerate(contador.baldes) if quantidade]
+            acumulado = 0
+            for indice in range(ocupados[0], ocupados[-1] + 1) if ocupados else ():
+                acumulado += contador.baldes[indice]
+                limite = limite_balde(indice) / 1e9
+                linhas.append(f'{latencia}_bucket{{operacao="{nome}",le="{limite:.9g}"}} {acumulado}')
+            linhas.append(f'{latencia}_bucket{{operacao="{nome}",le="+Inf"}} {contador.amostras}')
+            linhas.append(f'{latencia}_sum{{operacao="{nome}"}} {contador.soma_ns / 1e9:.9g}')
+            linhas.append(f'{latencia}_count{{operacao="{nome}"}} {contador.amostras}')
+
+        return "\n".join(linhas) + "\n"
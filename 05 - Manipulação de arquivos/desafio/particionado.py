@@ -0,0 +1,118 @@
+import multiprocessing
+import os
+import sys
+
+from desafio_v2 import ContaCorrente, Deposito, PessoaFisica, Saque
+
+TAMANHO_BLOCO = 10_000
+
+
+def _executar_operacao(contas, operacao):
+    nome, numero, *argumentos = operacao
+
+    if nome == "abrir":
+        if numero in contas:
+            return False, None
+        cpf, titular = argumentos
+        cliente = PessoaFisica(nome=titular, data_nascimento="", cpf=cpf, endereco="")
+        conta = ContaCorrente.nova_conta(cliente=cliente, numero=numero, limite=500, limite_saques=50)
+        cliente.adicionar_conta(conta)
+        contas[numero] = conta
+        return True, conta.saldo
+
+    conta = contas.get(numero)
+    if conta is None:
+        return False, None
+
+    if nome == "saldo":
+        return True, conta.saldo
+
+    if nome in ("depositar", "sacar"):
+        transacao = Deposito(argumentos[0]) if nome == "depositar" else Saque(argumentos[0])
+        antes = len(conta.historico.transacoes)
+        transacao.registrar(conta)
+        return len(conta.historico.transacoes) > antes, conta.saldo
+
+    raise ValueError(f"Operação desconhecida: {nome}")
+
+
+def _particao(conexao):
+    # As mensagens de sucesso/falha de Conta.sacar/depositar não têm destino em um processo trabalhador
+    sys.stdout = open(os.devnull, "w")
+    contas = {}
+
+    while True:
+        operacoes = conexao.recv()
+        if operacoes is None:
+            conexao.close()
+            return
+
+        resultados = []
+        for operacao in operacoes:
+            try:
+                resultados.append(_executar_operacao(contas, operacao))
+            except Exception as exc:
+                resultados.append((False, f"{exc.__class__.__name__}: {exc}"))
+        conexao.send(resultados)
+
+
+# Só para medir a escala com processos (benchmark_particionado.py): cada partição começa vazia, guarda as contas só na
+# memória do próprio processo e não passa por Persistencia, então nada do que é feito aqui vai para dados/ nem sobrevive
+# ao fechar(). O sistema bancário de verdade continua sendo o menu de desafio_v2.py, em um único processo
+class LivroParticionado:
+    def __init__(self, particoes=None, tamanho_bloco=TAMANHO_BLOCO):
+        self.particoes = particoes or os.cpu_count() or 1
+        self.tamanho_bloco = tamanho_bloco
+        self._conexoes = []
+        self._processos = []
+
+        for indice in range(self.particoes):
+            local, remota = multiprocessing.Pipe()
+            processo = multiprocessing.Process(target=_particao, args=(remota,), name=f"particao-{indice}", daemon=True)
+            processo.start()
+            remota.close()
+            self._conexoes.append(local)
+            self._processos.append(processo)
+
+    def particao(self, numero):
+        return numero % self.particoes
+
+    def executar(self, operacoes):
+        resultados = []
+        for inicio in range(0, len(operacoes), self.tamanho_bloco):
+            resultados.extend(self._executar_bloco(operacoes[inicio : inicio + self.tamanho_bloco]))
+        return resultados
+
+    def _executar_bloco(self, operacoes):
+        por_particao = [[] for _ in range(self.particoes)]
+        indices = [[] for _ in range(self.particoes)]
+        for indice, operacao in enumerate(operacoes):
+            particao = self.particao(operacao[1])
+            por_particao[particao].append(operacao)
+            indices[particao].append(indice)
+
+        # Cada partição recebe suas operações na ordem original, o que preserva a ordem por conta
+        for conexao, lote in zip(self._conexoes, por_particao):
+            if lote:
+                conexao.send(lote)
+
+        resultados = [None] * len(operacoes)
+        for conexao, lote, posicoes in zip(self._conexoes, por_particao, indices):
+            if lote:
+                for posicao, resultado in zip(posicoes, conexao.recv()):
+                    resultados[posicao] = resultado
+        return resultados
+
+    def fechar(self):
+        for conexao in self._conexoes:
+            conexao.send(None)
+            conexao.close()
+        for processo in self._processos:
+            processo.join()
+        self._conexoes, self._processos = [], []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
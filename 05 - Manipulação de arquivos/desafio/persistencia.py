@@ -0,0 +1,437 @@
+import gc
+import os
+import struct
+import zlib
+from array import array
+from pathlib import Path
+from threading import Event, Lock, Thread
+
+try:
+    import fcntl
+except ImportError:  # sem flock (Windows), o diretório de dados não é travado
+    fcntl = None
+
+ASSINATURA_SNAPSHOT = b"BANCOSN3"
+
+CABECALHO_REGISTRO = struct.Struct("<IIQ")  # tamanho do conteúdo, crc32 do conteúdo, sequência
+TAMANHO_TEXTO = struct.Struct("<I")
+QUANTIDADE = struct.Struct("<Q")
+REGISTRO_CONTA = struct.Struct("<qdqq")  # número, limite, limite de saques, janela de saques (-1 = sem janela)
+REGISTRO_TRANSACAO = struct.Struct("<qBdq")  # número da conta, código, valor, data
+REGISTRO_LANCAMENTO = struct.Struct("<qQBdq")  # número da conta, posição no histórico, código, valor, data
+SNAPSHOT_CONTA = struct.Struct("<qdqqQ")  # número, limite, limite de saques, janela, nº de transações
+SNAPSHOT_CONTA_COM_SALDO = struct.Struct("<qddqqQ")  # número, saldo, limite, limite de saques, janela, nº de transações
+
+# Assinatura -> textos por cliente e registro de conta. SN2 acrescentou o plano do cliente; SN3 deixou de gravar o
+# saldo, que é refeito a partir do histórico (um snapshot em segundo plano não lê saldo e histórico juntos)
+FORMATOS_SNAPSHOT = {
+    b"BANCOSN1": (4, SNAPSHOT_CONTA_COM_SALDO),
+    b"BANCOSN2": (5, SNAPSHOT_CONTA_COM_SALDO),
+    ASSINATURA_SNAPSHOT: (5, SNAPSHOT_CONTA),
+}
+
+CLIENTE = b"C"  # nome, data de nascimento, CPF, endereço e plano ("" = padrão; ausente em registros antigos)
+CONTA = b"A"
+TRANSACAO = b"T"  # só em WALs antigos, sem a posição no histórico
+TRANSACOES = b"M"
+LANCAMENTO = b"L"
+LANCAMENTOS = b"N"  # várias transações num só registro do WAL: aplicadas todas ou nenhuma
+
+
+class DiretorioEmUso(RuntimeError):
+    pass
+
+
+def empacotar_textos(*textos):
+    partes = []
+    for texto in textos:
+        codificado = texto.encode("utf-8")
+        partes.append(TAMANHO_TEXTO.pack(len(codificado)))
+        partes.append(codificado)
+    return b"".join(partes)
+
+
+def desempacotar_textos(dados, offset, quantidade):
+    textos = []
+    for _ in range(quantidade):
+        (tamanho,) = TAMANHO_TEXTO.unpack_from(dados, offset)
+        offset += TAMANHO_TEXTO.size
+        textos.append(str(dados[offset : offset + tamanho], "utf-8"))
+        offset += tamanho
+    return textos, offset
+
+
+def _empacotar_cliente(cliente):
+    return empacotar_textos(cliente.nome, cliente.data_nascimento, cliente.cpf, cliente.endereco, cliente.plano or "")
+
+
+def _criar_cliente(classe_cliente, nome, data_nascimento, cpf, endereco, plano=""):
+    return classe_cliente(nome=nome, data_nascimento=data_nascimento, cpf=cpf, endereco=endereco, plano=plano or None)
+
+
+def _empacotar_lancamento(conta, codigo, valor, data):
+    # O lançamento acabou de entrar no histórico: é o último
+    return REGISTRO_LANCAMENTO.pack(conta.numero, len(conta.historico._tipos) - 1, codigo, valor, data)
+
+
+def _aplicar_lancamento(contas, numero, posicao, codigo, valor, data):
+    conta = contas[numero]
+    registrados = len(conta.historico._tipos)
+    if posicao < registrados:
+        return
+    if posicao > registrados:
+        raise ValueError(f"WAL sem o lançamento {registrados} da conta {numero}")
+    conta.aplicar_transacao(codigo, valor, data)
+
+
+def _fsync_diretorio(diretorio):
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+
+    descritor = os.open(diretorio, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(descritor)
+    finally:
+        os.close(descritor)
+
+
+class Persistencia:
+    # O WAL recebe cada evento na hora; uma thread faz o fsync dos registros pendentes a cada `intervalo_fsync`, e o
+    # snapshot periódico é gravado em segundo plano, a partir dos objetos vivos, enquanto o WAL segue num arquivo novo.
+    # Esse snapshot pode conter lançamentos de depois da sua sequência: cada lançamento do WAL leva a posição no
+    # histórico da conta, e a reprodução pula os que o snapshot já tem
+    def __init__(self, diretorio, registros_por_fsync=128, intervalo_fsync=0.05, registros_por_snapshot=100_000):
+        self.diretorio = Path(diretorio)
+        self.caminho_wal = self.diretorio / "wal.bin"
+        self.caminho_wal_anterior = self.diretorio / "wal.anterior.bin"  # WAL até a sequência do snapshot em curso
+        self.caminho_snapshot = self.diretorio / "snapshot.bin"
+        self.caminho_trava = self.diretorio / ".lock"
+        self.registros_por_fsync = registros_por_fsync
+        self.intervalo_fsync = intervalo_fsync
+        self.registros_por_snapshot = registros_por_snapshot
+
+        self._sequencia = 0
+        self._wal = None
+        self._trava = Lock()
+        self._pendentes = 0
+        self._registros_desde_snapshot = 0
+        self._clientes = ()
+        self._contas = ()
+        self._parar = Event()
+        self._sincronizador = None
+        self._snapshot = None
+        self._rotacionado = False  # wal.anterior.bin existe e ainda não está coberto por um snapshot
+        self._arquivo_trava = None
+        self._somente_leitura = False
+
+    def carregar(self, classe_cliente, classe_conta, somente_leitura=False):
+        # Só um processo grava no diretório: o snapshot e o descarte de um registro incompleto truncam o WAL, e o de
+        # outro processo perderia registros já confirmados. Somente leitura (auditoria) não trava nem trunca nada
+        self._somente_leitura = somente_leitura
+        if not somente_leitura:
+            self.diretorio.mkdir(parents=True, exist_ok=True)
+            self._travar_diretorio()
+        clientes = {}
+        contas = {}
+
+        # A carga só cria objetos sem ciclos de lixo: desligar o coletor evita varreduras repetidas do heap inteiro
+        coletor_ativo = gc.isenabled()
+        gc.disable()
+        try:
+            self._carregar_snapshot(classe_cliente, classe_conta, clientes, contas)
+            for caminho in (self.caminho_wal_anterior, self.caminho_wal):
+                self._reproduzir_wal(caminho, classe_cliente, classe_conta, clientes, contas)
+        finally:
+            if coletor_ativo:
+                gc.enable()
+
+        return list(clientes.values()), list(contas.values())
+
+    def iniciar(self, clientes, contas):
+        if self._somente_leitura:
+            raise ValueError(f"{self.diretorio} foi carregado só para leitura")
+        self._travar_diretorio()
+        self._clientes = clientes
+        self._contas = contas
+        self._wal = open(self.caminho_wal, "ab")
+        self._parar.clear()
+        self._sincronizador = Thread(target=self._sincronizar_periodicamente, name="fsync-wal", daemon=True)
+        self._sincronizador.start()
+
+        # Uma queda no meio de um snapshot em segundo plano deixa o WAL anterior: o snapshot é refeito já na partida
+        if self.caminho_wal_anterior.exists():
+            self.salvar_snapshot()
+
+    def registrar_evento(self, evento, *dados):
+        # Chamado logo depois de cada lançamento, ainda sob a trava da conta: ele é o último do histórico
+        if evento == "cliente":
+            (cliente,) = dados
+            conteudo = CLIENTE + _empacotar_cliente(cliente)
+        elif evento == "conta":
+            (conta,) = dados
+            conteudo = CONTA + self._empacotar_conta(conta)
+        elif evento == "transacao":
+            conteudo = LANCAMENTO + _empacotar_lancamento(*dados)
+        elif evento == "transacoes":
+            (transacoes,) = dados
+            conteudo = LANCAMENTOS + b"".join(_empacotar_lancamento(*transacao) for transacao in transacoes)
+        else:
+            return
+
+        self._anexar(conteudo)
+
+    def salvar_snapshot(self):
+        # Síncrono, para quando não há operações em curso (fim de importação, lote, fechamento, saída)
+        self._aguardar_snapshot()
+        with self._trava:
+            if self._wal is not None:
+                self._sincronizar()
+            self._gravar_snapshot(self._sequencia, self._clientes, self._contas)
+
+            if self._wal is not None:
+                self._wal.truncate(0)
+                self._sincronizar()
+            self.caminho_wal_anterior.unlink(missing_ok=True)
+            self._rotacionado = False
+            self._registros_desde_snapshot = 0
+
+    def fechar(self):
+        if self._wal is not None:
+            self._parar.set()
+            self._sincronizador.join()
+            self._aguardar_snapshot()
+            if self._registros_desde_snapshot or self._rotacionado:
+                self.salvar_snapshot()
+            with self._trava:
+                self._sincronizar()
+                self._wal.close()
+                self._wal = None
+        self._liberar_diretorio()
+
+    def _travar_diretorio(self):
+        if fcntl is None or self._arquivo_trava is not None:
+            return
+
+        arquivo = open(self.caminho_trava, "ab")
+        try:
+            fcntl.flock(arquivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            arquivo.close()
+            raise DiretorioEmUso(f"{self.diretorio} já está aberto por outro processo ({self.caminho_trava})") from None
+        self._arquivo_trava = arquivo
+
+    def _liberar_diretorio(self):
+        if self._arquivo_trava is not None:
+            self._arquivo_trava.close()
+            self._arquivo_trava = None
+
+    def _anexar(self, conteudo):
+        with self._trava:
+            self._sequencia += 1
+            self._wal.write(CABECALHO_REGISTRO.pack(len(conteudo), zlib.crc32(conteudo), self._sequencia))
+            self._wal.write(conteudo)
+            self._wal.flush()
+
+            self._pendentes += 1
+            if self._pendentes >= self.registros_por_fsync:
+                self._sincronizar()
+
+            self._registros_desde_snapshot += 1
+            if self._registros_desde_snapshot >= self.registros_por_snapshot and not self._rotacionado:
+                self._iniciar_snapshot()
+
+    def _sincronizar(self):
+        self._wal.flush()
+        os.fsync(self._wal.fileno())
+        self._pendentes = 0
+
+    def _sincronizar_periodicamente(self):
+        # Um registro confirmado fica no máximo `intervalo_fsync` sem fsync, mesmo que não chegue mais nenhum
+        while not self._parar.wait(self.intervalo_fsync):
+            with self._trava:
+                if self._wal is None or self._wal.closed:
+                    return
+                if self._pendentes:
+                    self._sincronizar()
+
+    def _iniciar_snapshot(self):
+        # Sob self._trava: o WAL até aqui vira wal.anterior.bin e os próximos registros vão para um wal.bin novo
+        self._sincronizar()
+        self._wal.close()
+        os.replace(self.caminho_wal, self.caminho_wal_anterior)
+        self._wal = open(self.caminho_wal, "ab")
+        _fsync_diretorio(self.diretorio)
+        self._rotacionado = True
+        self._registros_desde_snapshot = 0
+
+        self._snapshot = Thread(
+            target=self._snapshot_em_segundo_plano, args=(self._sequencia,), name="snapshot", daemon=True
+        )
+        self._snapshot.start()
+
+    def _snapshot_em_segundo_plano(self, sequencia):
+        # list() de uma lista ou dos valores de um dict não solta o GIL: as cópias não veem inserções pela metade.
+        # Contas antes dos clientes, para que o titular de toda conta copiada esteja na cópia dos clientes
+        contas = list(self._contas)
+        clientes = list(self._clientes)
+        self._gravar_snapshot(sequencia, clientes, contas)
+
+        with self._trava:
+            self.caminho_wal_anterior.unlink(missing_ok=True)
+            self._rotacionado = False
+
+    def _aguardar_snapshot(self):
+        if self._snapshot is not None:
+            self._snapshot.join()
+            self._snapshot = None
+
+    def _gravar_snapshot(self, sequencia, clientes, contas):
+        temporario = self.caminho_snapshot.with_suffix(".tmp")
+        with open(temporario, "wb", buffering=2**20) as arquivo:
+            arquivo.write(ASSINATURA_SNAPSHOT)
+            arquivo.write(QUANTIDADE.pack(sequencia))
+
+            arquivo.write(QUANTIDADE.pack(len(clientes)))
+            for cliente in clientes:
+                arquivo.write(_empacotar_cliente(cliente))
+
+            arquivo.write(QUANTIDADE.pack(len(contas)))
+            for conta in contas:
+                # As colunas só crescem, uma de cada vez: o prefixo comum às três é um histórico completo
+                historico = conta.historico
+                tipos, valores, datas = historico._tipos, historico._valores, historico._datas
+                transacoes = min(len(tipos), len(valores), len(datas))
+                janela = -1 if conta._janela_saques is None else conta._janela_saques
+                arquivo.write(empacotar_textos(conta.cliente.cpf, conta.agencia))
+                arquivo.write(
+                    SNAPSHOT_CONTA.pack(conta.numero, conta._limite, conta._limite_saques, janela, transacoes)
+                )
+                arquivo.write(tipos[:transacoes].tobytes())
+                arquivo.write(valores[:transacoes].tobytes())
+                arquivo.write(datas[:transacoes].tobytes())
+
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+
+        os.replace(temporario, self.caminho_snapshot)
+        _fsync_diretorio(self.diretorio)
+
+    def _empacotar_conta(self, conta):
+        janela = -1 if conta._janela_saques is None else conta._janela_saques
+        return REGISTRO_CONTA.pack(conta.numero, conta._limite, conta._limite_saques, janela) + empacotar_textos(
+            conta.cliente.cpf, conta.agencia
+        )
+
+    def _criar_conta(self, classe_conta, cliente, numero, agencia, limite, limite_saques, janela):
+        conta = classe_conta(
+            numero=numero,
+            cliente=cliente,
+            limite=limite,
+            limite_saques=limite_saques,
+            janela_saques=None if janela < 0 else janela,
+        )
+        conta._agencia = agencia
+        cliente.adicionar_conta(conta)
+        return conta
+
+    def _carregar_snapshot(self, classe_cliente, classe_conta, clientes, contas):
+        if not self.caminho_snapshot.exists():
+            return
+
+        dados = memoryview(self.caminho_snapshot.read_bytes())
+        formato = FORMATOS_SNAPSHOT.get(bytes(dados[: len(ASSINATURA_SNAPSHOT)]))
+        if formato is None:
+            raise ValueError(f"Snapshot inválido: {self.caminho_snapshot}")
+        textos_cliente, registro_conta = formato
+
+        offset = len(ASSINATURA_SNAPSHOT)
+        (self._sequencia,) = QUANTIDADE.unpack_from(dados, offset)
+        offset += QUANTIDADE.size
+
+        (quantidade_clientes,) = QUANTIDADE.unpack_from(dados, offset)
+        offset += QUANTIDADE.size
+        for _ in range(quantidade_clientes):
+            textos, offset = desempacotar_textos(dados, offset, textos_cliente)
+            cliente = _criar_cliente(classe_cliente, *textos)
+            clientes[cliente.cpf] = cliente
+
+        (quantidade_contas,) = QUANTIDADE.unpack_from(dados, offset)
+        offset += QUANTIDADE.size
+        for _ in range(quantidade_contas):
+            (cpf, agencia), offset = desempacotar_textos(dados, offset, 2)
+            if registro_conta is SNAPSHOT_CONTA:
+                saldo = None
+                numero, limite, limite_saques, janela, transacoes = registro_conta.unpack_from(dados, offset)
+            else:
+                numero, saldo, limite, limite_saques, janela, transacoes = registro_conta.unpack_from(dados, offset)
+            offset += registro_conta.size
+
+            tipos, valores, datas = array("B"), array("d"), array("q")
+            for coluna in (tipos, valores, datas):
+                fim = offset + transacoes * coluna.itemsize
+                coluna.frombytes(dados[offset:fim])
+                offset = fim
+
+            conta = self._criar_conta(classe_conta, clientes[cpf], numero, agencia, limite, limite_saques, janela)
+            conta.historico.carregar(tipos, valores, datas)
+            conta._saldo = conta.historico._saldo if saldo is None else saldo
+            contas[numero] = conta
+
+    def _reproduzir_wal(self, caminho, classe_cliente, classe_conta, clientes, contas):
+        if not caminho.exists():
+            return
+
+        dados = memoryview(caminho.read_bytes())
+        offset = 0
+        while offset + CABECALHO_REGISTRO.size <= len(dados):
+            tamanho, crc, sequencia = CABECALHO_REGISTRO.unpack_from(dados, offset)
+            inicio = offset + CABECALHO_REGISTRO.size
+            conteudo = dados[inicio : inicio + tamanho]
+            if len(conteudo) < tamanho or zlib.crc32(conteudo) != crc:
+                break
+
+            if sequencia > self._sequencia:
+                self._aplicar(conteudo, classe_cliente, classe_conta, clientes, contas)
+                self._sequencia = sequencia
+                self._registros_desde_snapshot += 1
+            offset = inicio + tamanho
+
+        # Um registro gravado pela metade (queda no meio da escrita) é descartado
+        if offset < len(dados) and not self._somente_leitura:
+            with open(caminho, "r+b") as arquivo:
+                arquivo.truncate(offset)
+
+    def _aplicar(self, conteudo, classe_cliente, classe_conta, clientes, contas):
+        tipo, corpo = bytes(conteudo[:1]), conteudo[1:]
+
+        # Clientes, contas e lançamentos que o snapshot já contém são pulados
+        if tipo == CLIENTE:
+            textos, offset = desempacotar_textos(corpo, 0, 4)
+            if offset < len(corpo):
+                (plano,), _ = desempacotar_textos(corpo, offset, 1)
+                textos.append(plano)
+            if textos[2] not in clientes:
+                clientes[textos[2]] = _criar_cliente(classe_cliente, *textos)
+
+        elif tipo == CONTA:
+            numero, limite, limite_saques, janela = REGISTRO_CONTA.unpack_from(corpo)
+            (cpf, agencia), _ = desempacotar_textos(corpo, REGISTRO_CONTA.size, 2)
+            if numero not in contas:
+                contas[numero] = self._criar_conta(
+                    classe_conta, clientes[cpf], numero, agencia, limite, limite_saques, janela
+                )
+
+        elif tipo == LANCAMENTO:
+            _aplicar_lancamento(contas, *REGISTRO_LANCAMENTO.unpack_from(corpo))
+
+        elif tipo == LANCAMENTOS:
+            for lancamento in REGISTRO_LANCAMENTO.iter_unpack(corpo):
+                _aplicar_lancamento(contas, *lancamento)
+
+        elif tipo == TRANSACAO:
+            numero, codigo, valor, data = REGISTRO_TRANSACAO.unpack_from(corpo)
+            contas[numero].aplicar_transacao(codigo, valor, data)
+
+        elif tipo == TRANSACOES:
+            for numero, codigo, valor, data in REGISTRO_TRANSACAO.iter_unpack(corpo):
+                contas[numero].aplicar_transacao(codigo, valor, data)
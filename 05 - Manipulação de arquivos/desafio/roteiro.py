@@ -0,0 +1,218 @@
+import argparse
+import contextlib
+import json
+import os
+import random
+import shlex
+import sys
+import tempfile
+from collections import deque
+from pathlib import Path
+from statistics import quantiles
+from time import perf_counter
+
+import desafio_v2
+from desafio_v2 import ClienteRegistry, ContaCorrente, ContaRegistry, PessoaFisica, adicionar_opcao_log
+from escritor_log import EscritorLog
+from persistencia import DiretorioEmUso, Persistencia
+
+# Respostas de cada operação, na ordem em que o menu interativo as pede com input()
+PERGUNTAS = {
+    "nu": ("cpf", "nome", "data_nascimento", "endereco"),
+    "nc": ("cpf",),
+    "d": ("cpf", "valor"),
+    "s": ("cpf", "valor"),
+    "t": ("cpf", "cpf_destino", "valor"),
+    "e": ("cpf",),
+    "lc": (),
+}
+
+# Só perguntadas quando o cliente tem mais de uma conta; no JSON, entram ao fim das respostas se presentes
+PERGUNTAS_OPCIONAIS = {"d": ("conta",), "s": ("conta",), "t": ("conta", "conta_destino"), "e": ("conta",)}
+
+
+def ler_roteiro(caminho):
+    with open(caminho, encoding="utf-8") as arquivo:
+        for numero_linha, linha in enumerate(arquivo, 1):
+            linha = linha.strip()
+            if not linha or linha.startswith("#"):
+                continue
+
+            try:
+                if linha.startswith("{"):
+                    registro = json.loads(linha)
+                    opcao = registro["op"]
+                    respostas = [str(registro[campo]) for campo in PERGUNTAS.get(opcao, ())]
+                    respostas += [str(registro[campo]) for campo in PERGUNTAS_OPCIONAIS.get(opcao, ()) if campo in registro]
+                else:
+                    opcao, *respostas = shlex.split(linha)
+            except (KeyError, ValueError) as exc:
+                raise ValueError(f"Linha {numero_linha} inválida: {exc}") from exc
+
+            if opcao not in PERGUNTAS:
+                raise ValueError(f"Linha {numero_linha}: operação desconhecida '{opcao}'")
+            yield opcao, respostas
+
+
+def gerar_roteiro(caminho, quantidade_clientes, quantidade_operacoes, semente=42):
+    aleatorio = random.Random(semente)
+    cpfs = [f"{indice:011d}" for indice in range(1, quantidade_clientes + 1)]
+
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        for cpf in cpfs:
+            registro = {"op": "nu", "cpf": cpf, "nome": f"Cliente {cpf}", "data_nascimento": "01-01-1990", "endereco": "Rua A"}
+            arquivo.write(json.dumps(registro) + "\n")
+            arquivo.write(json.dumps({"op": "nc", "cpf": cpf}) + "\n")
+
+        for _ in range(quantidade_operacoes):
+            sorteio = aleatorio.random()
+            cpf = aleatorio.choice(cpfs)
+            if sorteio < 0.45:
+                registro = {"op": "d", "cpf": cpf, "valor": round(aleatorio.uniform(1, 1000), 2)}
+            elif sorteio < 0.85:
+                registro = {"op": "s", "cpf": cpf, "valor": round(aleatorio.uniform(1, 600), 2)}
+            elif sorteio < 0.999:
+                registro = {"op": "e", "cpf": cpf}
+            else:
+                registro = {"op": "lc"}
+            arquivo.write(json.dumps(registro) + "\n")
+
+
+class Sessao:
+    def __init__(self, clientes=None, contas=None):
+        self.clientes = ClienteRegistry() if clientes is None else clientes
+        self.contas = ContaRegistry() if contas is None else contas
+        self._respostas = deque()
+
+    def _responder(self, mensagem=""):
+        if not self._respostas:
+            raise ValueError(f"Roteiro sem resposta para a pergunta: {mensagem.strip()}")
+        return self._respostas.popleft()
+
+    @contextlib.contextmanager
+    def ativar(self):
+        # As funções do menu buscam input() nos globais do módulo antes dos builtins
+        desafio_v2.input = self._responder
+        try:
+            yield self
+        finally:
+            del desafio_v2.input
+
+    def executar(self, opcao, respostas):
+        self._respostas.clear()
+        self._respostas.extend(respostas)
+
+        if opcao == "d":
+            desafio_v2.depositar(self.clientes, self.contas)
+        elif opcao == "s":
+            desafio_v2.sacar(self.clientes, self.contas)
+        elif opcao == "t":
+            desafio_v2.transferir(self.clientes, self.contas)
+        elif opcao == "e":
+            desafio_v2.exibir_extrato(self.clientes, self.contas)
+        elif opcao == "nu":
+            desafio_v2.criar_cliente(self.clientes)
+        elif opcao == "nc":
+            desafio_v2.criar_conta(len(self.contas) + 1, self.clientes, self.contas)
+        elif opcao == "lc":
+            desafio_v2.listar_contas(self.contas)
+        else:
+            raise ValueError(f"Operação desconhecida '{opcao}'")
+
+
+def reproduzir(operacoes, sessao, saida):
+    latencias = {opcao: [] for opcao in PERGUNTAS}
+    with sessao.ativar(), contextlib.redirect_stdout(saida):
+        inicio = perf_counter()
+        for opcao, respostas in operacoes:
+            antes = perf_counter()
+            sessao.executar(opcao, respostas)
+            latencias[opcao].append(perf_counter() - antes)
+        duracao = perf_counter() - inicio
+
+    return duracao, {opcao: valores for opcao, valores in latencias.items() if valores}
+
+
+def percentis(latencias):
+    # Inclusivo: os cortes ficam entre o menor e o maior valor medidos, sem extrapolar em amostras pequenas
+    if len(latencias) < 2:
+        valor = latencias[0] if latencias else 0.0
+        return valor, valor, valor
+    cortes = quantiles(latencias, n=100, method="inclusive")
+    return cortes[49], cortes[89], cortes[98]
+
+
+def relatorio(duracao, latencias, arquivo=sys.stderr):
+    total = sum(len(valores) for valores in latencias.values())
+    print(f"{total} operações em {duracao:.2f}s ({total / duracao:.0f} operações/s)", file=arquivo)
+    print(f"{'op':<4} | {'qtd':>8} | {'p50 (us)':>10} | {'p90 (us)':>10} | {'p99 (us)':>10} | {'máx (us)':>10}", file=arquivo)
+    print("-" * 66, file=arquivo)
+    for opcao, valores in latencias.items():
+        p50, p90, p99 = percentis(valores)
+        print(
+            f"{opcao:<4} | {len(valores):>8} | {p50 * 1e6:>10.1f} | {p90 * 1e6:>10.1f} | {p99 * 1e6:>10.1f} | "
+            f"{max(valores) * 1e6:>10.1f}",
+            file=arquivo,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Executa um roteiro de operações (texto ou JSON Lines) sem o menu.")
+    parser.add_argument("roteiro", type=Path)
+    parser.add_argument("--gerar", nargs=2, type=int, metavar=("CLIENTES", "OPERACOES"), help="gera um roteiro sintético")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--dados", type=Path, default=None, help="diretório de persistência (padrão: só em memória)")
+    parser.add_argument("--log", type=Path, default=None, help="log de transações (padrão: arquivo temporário)")
+    adicionar_opcao_log(parser)
+    parser.add_argument("--saida", type=Path, default=None, help="grava a saída do console (padrão: descartada)")
+    parser.add_argument("--amostragem", type=int, default=None, help="mede a latência de 1 a cada N chamadas do menu")
+    parser.add_argument("--metricas", choices=("json", "prometheus"), default=None, help="imprime as métricas no fim")
+    args = parser.parse_args()
+
+    if args.gerar:
+        gerar_roteiro(args.roteiro, *args.gerar, semente=args.semente)
+        print(f"Roteiro gravado em {args.roteiro}", file=sys.stderr)
+        return
+
+    operacoes = list(ler_roteiro(args.roteiro))
+    if args.amostragem is not None:
+        desafio_v2.metricas.amostragem = args.amostragem
+
+    with contextlib.ExitStack() as pilha:
+        persistencia = None
+        if args.dados is None:
+            sessao = Sessao()
+        else:
+            persistencia = Persistencia(args.dados)
+            try:
+                clientes, contas = persistencia.carregar(PessoaFisica, ContaCorrente)
+            except DiretorioEmUso as exc:
+                sys.exit(str(exc))
+            sessao = Sessao(ClienteRegistry(clientes), ContaRegistry(contas))
+            persistencia.iniciar(sessao.clientes, sessao.contas)
+            desafio_v2.ouvintes.append(persistencia.registrar_evento)
+
+        caminho_log = args.log or Path(pilha.enter_context(tempfile.TemporaryDirectory())) / "log.txt"
+        escritor = EscritorLog(caminho_log, formato=args.log_formato)
+        escritor_original, desafio_v2.escritor_log = desafio_v2.escritor_log, escritor
+        saida = pilha.enter_context(open(args.saida or os.devnull, "w", encoding="utf-8"))
+
+        try:
+            duracao, latencias = reproduzir(operacoes, sessao, saida)
+        finally:
+            desafio_v2.escritor_log.fechar()
+            desafio_v2.escritor_log = escritor_original
+            if persistencia is not None:
+                desafio_v2.ouvintes.remove(persistencia.registrar_evento)
+                persistencia.fechar()
+
+    relatorio(duracao, latencias)
+
+    if args.metricas == "json":
+        print(json.dumps(desafio_v2.metricas.snapshot(), ensure_ascii=False, indent=2))
+    elif args.metricas == "prometheus":
+        print(desafio_v2.metricas.prometheus(), end="")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import sys
+from pathlib import Path
+
+import desafio_v2
+from desafio_v2 import (
+    AGENCIA,
+    PLANOS_LIMITE,
+    ClienteRegistry,
+    ContaCorrente,
+    ContaRegistry,
+    Deposito,
+    PessoaFisica,
+    Saque,
+    notificar,
+)
+from persistencia import DiretorioEmUso, Persistencia
+
+LIMITE_LINHA = 64 * 2**10
+LIMITE_BUFFER_ESCRITA = 256 * 2**10
+TAMANHO_PAGINA = 50
+PAGINA_MAXIMA = 1000
+
+
+class ErroRequisicao(Exception):
+    pass
+
+
+def _campo(requisicao, nome):
+    try:
+        return requisicao[nome]
+    except KeyError:
+        raise ErroRequisicao(f"Campo obrigatório ausente: {nome}") from None
+
+
+def _texto(requisicao, nome, padrao=None):
+    # Os textos do cliente vão para o WAL e o snapshot como UTF-8: outro tipo quebraria a gravação depois de o
+    # cliente já estar no registro
+    valor = _campo(requisicao, nome) if padrao is None else requisicao.get(nome, padrao)
+    if not isinstance(valor, str):
+        raise ErroRequisicao(f"Campo {nome} deve ser texto")
+    return valor
+
+
+def _pagina(requisicao, campo_inicio):
+    inicio = int(requisicao.get(campo_inicio, 0))
+    limite = int(requisicao.get("limite", TAMANHO_PAGINA))
+    if inicio < 0 or not 0 < limite <= PAGINA_MAXIMA:
+        raise ErroRequisicao(f"Paginação inválida: {campo_inicio} >= 0 e 0 < limite <= {PAGINA_MAXIMA}")
+    return inicio, limite
+
+
+class Banco:
+    def __init__(self, clientes=None, contas=None):
+        self.clientes = ClienteRegistry() if clientes is None else clientes
+        self.contas = ContaRegistry() if contas is None else contas
+        self._operacoes = {
+            "cliente": self.criar_cliente,
+            "conta": self.criar_conta,
+            "depositar": self.depositar,
+            "sacar": self.sacar,
+            "extrato": self.extrato,
+            "contas": self.listar_contas,
+        }
+
+    def responder(self, linha):
+        identificador = None
+        try:
+            requisicao = json.loads(linha)
+            if not isinstance(requisicao, dict):
+                raise ErroRequisicao("A requisição deve ser um objeto JSON")
+            identificador = requisicao.get("id")
+
+            operacao = self._operacoes.get(requisicao.get("op"))
+            if operacao is None:
+                raise ErroRequisicao(f"Operação desconhecida: {requisicao.get('op')!r}")
+            resposta = {"id": identificador, "ok": True, **operacao(requisicao)}
+        except (ErroRequisicao, ValueError, TypeError, OverflowError) as exc:
+            resposta = {"id": identificador, "ok": False, "erro": str(exc)}
+
+        return json.dumps(resposta, ensure_ascii=False).encode("utf-8") + b"\n"
+
+    def _cliente(self, requisicao):
+        cliente = self.clientes.buscar(str(_campo(requisicao, "cpf")))
+        if cliente is None:
+            raise ErroRequisicao("Cliente não encontrado!")
+        return cliente
+
+    def _conta(self, cliente, requisicao):
+        if not cliente.contas:
+            raise ErroRequisicao("Cliente não possui conta!")
+        if "conta" not in requisicao:
+            return cliente.contas[0]
+
+        conta = self.contas.buscar(str(requisicao.get("agencia", AGENCIA)), int(requisicao["conta"]), cliente)
+        if conta is None:
+            raise ErroRequisicao("Conta não encontrada para este cliente!")
+        return conta
+
+    def criar_cliente(self, requisicao):
+        cpf = str(_campo(requisicao, "cpf"))
+        if cpf in self.clientes:
+            raise ErroRequisicao("Já existe cliente com esse CPF!")
+        plano = requisicao.get("plano")
+        if plano is not None and plano not in PLANOS_LIMITE:
+            raise ErroRequisicao(f"Plano desconhecido: {plano!r}")
+
+        cliente = PessoaFisica(
+            nome=_texto(requisicao, "nome"),
+            data_nascimento=_texto(requisicao, "data_nascimento", ""),
+            cpf=cpf,
+            endereco=_texto(requisicao, "endereco", ""),
+            plano=plano,
+        )
+        self.clientes.adicionar(cliente)
+        notificar("cliente", cliente)
+        return {"cpf": cpf}
+
+    def criar_conta(self, requisicao):
+        cliente = self._cliente(requisicao)
+        conta = ContaCorrente.nova_conta(cliente=cliente, numero=len(self.contas) + 1, limite=500, limite_saques=50)
+        self.contas.adicionar(conta)
+        cliente.contas.append(conta)
+        notificar("conta", conta)
+        return {"agencia": conta.agencia, "conta": conta.numero}
+
+    def _transacao(self, requisicao, classe_transacao):
+        cliente = self._cliente(requisicao)
+        conta = self._conta(cliente, requisicao)
+        valor = float(_campo(requisicao, "valor"))
+        if not math.isfinite(valor):
+            raise ErroRequisicao("Valor inválido!")
+        transacao = classe_transacao(valor)
+
+        # As regras do domínio avisam o resultado com print(); a mensagem vira o erro da resposta
+        realizadas = len(conta.historico.transacoes)
+        with contextlib.redirect_stdout(io.StringIO()) as saida:
+            cliente.realizar_transacao(conta, transacao)
+        if len(conta.historico.transacoes) == realizadas:
+            raise ErroRequisicao(saida.getvalue().strip().strip("@ "))
+
+        return {"conta": conta.numero, "saldo": conta.saldo}
+
+    def depositar(self, requisicao):
+        return self._transacao(requisicao, Deposito)
+
+    def sacar(self, requisicao):
+        return self._transacao(requisicao, Saque)
+
+    def extrato(self, requisicao):
+        conta = self._conta(self._cliente(requisicao), requisicao)
+        cursor, limite = _pagina(requisicao, "cursor")
+
+        transacoes = conta.historico.transacoes
+        fim = min(len(transacoes), cursor + limite)
+        return {
+            "conta": conta.numero,
+            "saldo": conta.saldo,
+            "transacoes": list(transacoes[cursor:fim]),
+            "cursor": fim if fim < len(transacoes) else None,
+        }
+
+    def listar_contas(self, requisicao):
+        offset, limite = _pagina(requisicao, "offset")
+        # Com "cpf", só as contas desse cliente, por "ordem" de criação (padrão) ou de saldo
+        if "cpf" in requisicao:
+            try:
+                contas = self.contas.do_cliente(self._cliente(requisicao), requisicao.get("ordem", "criacao"))
+            except ValueError as exc:
+                raise ErroRequisicao(str(exc)) from None
+        else:
+            contas = self.contas
+        return {
+            "contas": [
+                {"agencia": conta.agencia, "conta": conta.numero, "titular": conta.cliente.nome, "saldo": conta.saldo}
+                for conta in contas[offset : offset + limite]
+            ],
+            "total": len(contas),
+        }
+
+    async def atender(self, reader, writer):
+        try:
+            while True:
+                try:
+                    linha = await reader.readline()
+                except ValueError:
+                    writer.write(b'{"id": null, "ok": false, "erro": "Linha excede o limite do protocolo"}\n')
+                    break
+                if not linha:
+                    break
+
+                # Requisições em pipeline são respondidas em ordem; drain() só espera quando o cliente não lê
+                writer.write(self.responder(linha))
+                if writer.transport.get_write_buffer_size() > LIMITE_BUFFER_ESCRITA:
+                    await writer.drain()
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+
+async def servir(banco, host, porta):
+    servidor = await asyncio.start_server(banco.atender, host, porta, limit=LIMITE_LINHA, backlog=4096)
+    enderecos = ", ".join(f"{endereco[0]}:{endereco[1]}" for endereco in (s.getsockname() for s in servidor.sockets))
+    print(f"Servidor escutando em {enderecos}", file=sys.stderr, flush=True)
+    async with servidor:
+        await servidor.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor TCP do banco (uma requisição JSON por linha).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8888)
+    parser.add_argument("--dados", type=Path, default=None, help="diretório de persistência (padrão: só em memória)")
+    args = parser.parse_args()
+
+    persistencia = None
+    if args.dados is None:
+        banco = Banco()
+    else:
+        persistencia = Persistencia(args.dados)
+        try:
+            clientes, contas = persistencia.carregar(PessoaFisica, ContaCorrente)
+        except DiretorioEmUso as exc:
+            sys.exit(str(exc))
+        banco = Banco(ClienteRegistry(clientes), ContaRegistry(contas))
+        persistencia.iniciar(banco.clientes, banco.contas)
+        desafio_v2.ouvintes.append(persistencia.registrar_evento)
+
+    try:
+        asyncio.run(servir(banco, args.host, args.porta))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if persistencia is not None:
+            persistencia.fechar()
+
+
+if __name__ == "__main__":
+    main()
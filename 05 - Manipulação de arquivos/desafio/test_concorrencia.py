@@ -0,0 +1,71 @@
+import random
+import sys
+import threading
+from itertools import accumulate
+
+import pytest
+
+import desafio_v2
+from desafio_v2 import CREDITOS, ContaCorrente, Deposito, PessoaFisica, Saque
+
+THREADS = 8
+OPERACOES_POR_THREAD = 2_000
+
+
+def abrir_conta(numero):
+    cliente = PessoaFisica(nome=f"Cliente {numero}", data_nascimento="01-01-1990", cpf=f"{numero:011d}", endereco="")
+    conta = ContaCorrente(numero=numero, cliente=cliente, limite=10**9, limite_saques=10**9)
+    cliente.adicionar_conta(conta)
+    return conta
+
+
+@pytest.fixture(params=[1, 64], ids=["trava global", "64 travas listradas"])
+def concorrente(request):
+    intervalo = sys.getswitchinterval()
+    desafio_v2.ativar_concorrencia(request.param)
+    # Trocas de thread frequentes expõem as janelas entre a leitura e a escrita do saldo
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(intervalo)
+    desafio_v2.desativar_concorrencia()
+
+
+def test_saques_e_depositos_concorrentes_nas_mesmas_contas_nao_se_perdem(concorrente, capsys):
+    # Given: poucas contas disputadas por todas as threads
+    contas = [abrir_conta(numero) for numero in range(1, 4)]
+    realizadas = {conta.numero: [] for conta in contas}
+    erros = []
+
+    def operar(semente):
+        aleatorio = random.Random(semente)
+        for _ in range(OPERACOES_POR_THREAD):
+            conta = aleatorio.choice(contas)
+            valor = float(aleatorio.randint(1, 100))
+            try:
+                if aleatorio.random() < 0.5:
+                    if Deposito(valor).registrar(conta):
+                        realizadas[conta.numero].append(valor)
+                elif Saque(valor).registrar(conta):
+                    realizadas[conta.numero].append(-valor)
+            except Exception as exc:
+                erros.append(exc)
+
+    # When
+    threads = [threading.Thread(target=operar, args=(semente,)) for semente in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(60)
+    capsys.readouterr()
+
+    # Then: cada operação confirmada está no saldo e no histórico, e o saldo nunca ficou negativo
+    assert not erros
+    for conta in contas:
+        movimentos = [
+            valor if codigo in CREDITOS else -valor
+            for codigo, valor in zip(conta.historico._tipos, conta.historico._valores)
+        ]
+        assert sorted(movimentos) == sorted(realizadas[conta.numero])
+        assert conta.saldo == sum(realizadas[conta.numero])
+        assert list(accumulate(movimentos))[-1] == conta.saldo
+        assert min(accumulate(movimentos)) >= 0
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from consulta_log import IndiceLog
+
+INICIO = 1_700_000_000
+
+
+@pytest.fixture
+def log(tmp_path):
+    caminho = tmp_path / "log.jsonl"
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        for indice in range(10):
+            funcao = "sacar" if indice % 2 else "depositar"
+            arquivo.write(json.dumps({"timestamp": INICIO + 30 * indice, "funcao": funcao}) + "\n")
+    return caminho
+
+
+def timestamps(registros):
+    return [registro["timestamp"] - INICIO for registro in registros]
+
+
+def test_fim_e_exclusivo(log):
+    # Given
+    indice = IndiceLog(log)
+
+    # When
+    registros = indice.consultar(inicio=INICIO + 60, fim=INICIO + 150)
+
+    # Then
+    assert timestamps(registros) == [60, 90, 120]
+
+
+def test_linha_cortada_no_indice_nao_quebra_consultas(log):
+    # Given: um índice completo cuja última linha foi gravada pela metade
+    IndiceLog(log).atualizar()
+    caminho_indice = log.with_name("log.jsonl.idx")
+    linhas = caminho_indice.read_bytes().splitlines(keepends=True)
+    caminho_indice.write_bytes(b"".join(linhas[:-3]) + linhas[-3][:5])
+
+    # When
+    indice = IndiceLog(log)
+    registros = list(indice.consultar(funcao="sacar"))
+
+    # Then: as entradas perdidas voltam a ser indexadas a partir do log
+    assert timestamps(registros) == [30, 90, 150, 210, 270]
+    assert caminho_indice.read_bytes() == b"".join(linhas)
@@ -0,0 +1,41 @@
+import json
+from time import monotonic
+
+import pytest
+
+from escritor_log import EscritorLog
+
+
+@pytest.mark.parametrize("formato", ["texto", "jsonl"])
+def test_argumentos_sao_registrados_como_estavam_na_chamada(tmp_path, formato):
+    # Given
+    escritor = EscritorLog(tmp_path / "log", formato=formato, intervalo_flush=60)
+    valores = [1, 2]
+
+    # When: o objeto muda antes de a thread de escrita formatar o registro
+    escritor.registrar("depositar", (valores,), {}, None)
+    valores.append(3)
+    assert escritor.flush()
+    escritor.fechar()
+
+    # Then
+    linha = (tmp_path / "log").read_text(encoding="utf-8")
+    if formato == "jsonl":
+        linha = json.loads(linha)["args"]
+    assert "([1, 2],)" in linha
+
+
+def test_flush_nao_trava_se_a_thread_de_escrita_morreu(tmp_path):
+    # Given: uma thread de escrita que termina sem ler a fila
+    escritor = EscritorLog(tmp_path / "log.txt")
+    escritor._executar = lambda: None
+    escritor.registrar("depositar", (), {}, None)
+    escritor._thread.join()
+
+    # When
+    inicio = monotonic()
+    concluido = escritor.flush(timeout=5)
+
+    # Then
+    assert not concluido
+    assert monotonic() - inicio < 1
@@ -0,0 +1,80 @@
+import contextlib
+import io
+import random
+
+import pytest
+
+import desafio_v2
+from desafio_v2 import CREDITOS, ContaCorrente, Deposito, Juros, PessoaFisica, Saque, Tarifa, Transferencia
+from eventos import LojaEventos
+
+
+def criar_contas(quantidade):
+    contas = []
+    for numero in range(1, quantidade + 1):
+        cliente = PessoaFisica(
+            nome=f"Cliente {numero}", data_nascimento="01-01-1990", cpf=f"{numero:011d}", endereco=""
+        )
+        conta = ContaCorrente(numero=numero, cliente=cliente, limite=500, limite_saques=10**9)
+        cliente.adicionar_conta(conta)
+        contas.append(conta)
+    return contas
+
+
+def movimentar(contas, quantidade, semente=42, data=1_000_000):
+    aleatorio = random.Random(semente)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for indice in range(quantidade):
+            conta, outra = aleatorio.sample(contas, 2)
+            valor = aleatorio.randint(1, 50_000) / 100
+            transacao = aleatorio.choice(
+                [Deposito(valor), Deposito(valor), Saque(valor), Transferencia(valor, outra), Tarifa(1.5), Juros(0.07)]
+            )
+            transacao.registrar(conta, data + indice)
+
+
+@pytest.fixture
+def loja(tmp_path):
+    loja = LojaEventos(tmp_path, CREDITOS, eventos_por_checkpoint=50)
+    yield loja
+    if loja.registrar_evento in desafio_v2.ouvintes:
+        desafio_v2.ouvintes.remove(loja.registrar_evento)
+    loja.fechar()
+
+
+@pytest.mark.parametrize("usar_checkpoint", [True, False])
+@pytest.mark.parametrize("vetorizado", [True, False])
+def test_reconstrucao_reproduz_saldos_e_historicos(loja, tmp_path, usar_checkpoint, vetorizado):
+    # Given: um histórico anterior à loja, semeado na abertura, e transações gravadas ao vivo
+    contas = criar_contas(5)
+    movimentar(contas, 40, semente=1)
+    loja.abrir(contas)
+    desafio_v2.ouvintes.append(loja.registrar_evento)
+    movimentar(contas, 400, data=2_000_000)
+    desafio_v2.ouvintes.remove(loja.registrar_evento)
+    loja.fechar()
+
+    # When
+    saldos, transacoes, eventos = LojaEventos(tmp_path, CREDITOS).reconstruir(usar_checkpoint, vetorizado)
+
+    # Then
+    assert eventos == sum(len(conta.historico._tipos) for conta in contas)
+    assert saldos == {conta.numero: conta.saldo for conta in contas}
+    assert transacoes == {conta.numero: len(conta.historico._tipos) for conta in contas}
+
+
+def test_reabrir_nao_duplica_eventos_e_auditoria_nao_acusa_divergencias(loja, tmp_path):
+    # Given
+    contas = criar_contas(3)
+    movimentar(contas, 30)
+    loja.abrir(contas)
+    loja.fechar()
+
+    # When
+    reaberta = LojaEventos(tmp_path, CREDITOS)
+    reaberta.abrir(contas)
+
+    # Then
+    assert reaberta.eventos == sum(len(conta.historico._tipos) for conta in contas)
+    assert reaberta.auditar(contas) == []
+    reaberta.fechar()
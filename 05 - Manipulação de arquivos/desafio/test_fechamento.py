@@ -0,0 +1,100 @@
+import contextlib
+import io
+import sys
+
+import pytest
+
+import fechamento as motor
+from desafio_v2 import SEGUNDOS_POR_DIA, ContaCorrente, Deposito, Juros, PessoaFisica, Saque, Tarifa
+from persistencia import Persistencia
+
+DATA = 1_000 * SEGUNDOS_POR_DIA + 3600
+SALDOS = [0.0, 0.3, 0.45, 12.5, 999.99, 1_000.0, 5_432.1, 10_000.0, 87_654.32]
+
+
+def criar_contas(saldos=SALDOS):
+    contas = []
+    for numero, saldo in enumerate(saldos, 1):
+        cliente = PessoaFisica(
+            nome=f"Cliente {numero}", data_nascimento="01-01-1990", cpf=f"{numero:011d}", endereco=""
+        )
+        conta = ContaCorrente(numero=numero, cliente=cliente, limite=500, limite_saques=50)
+        cliente.adicionar_conta(conta)
+        if saldo:
+            conta.historico.carregar([motor.DEPOSITO], [saldo], [DATA - 60])
+            conta._saldo = saldo
+        contas.append(conta)
+    return contas
+
+
+def estado(contas):
+    return [(conta.saldo, list(conta.historico.transacoes)) for conta in contas]
+
+
+def fechar_conta_a_conta(contas, taxa):
+    with contextlib.redirect_stdout(io.StringIO()):
+        for conta in contas:
+            tarifa = motor.calcular_tarifa(conta.saldo)
+            Juros(motor.calcular_juros(conta.saldo, taxa)).registrar(conta, DATA)
+            if tarifa > 0:
+                Tarifa(tarifa).registrar(conta, DATA)
+
+
+SEM_NUMPY = pytest.mark.skipif(motor.np is None, reason="sem NumPy")
+
+
+@pytest.mark.parametrize("vetorizado", [False, pytest.param(True, marks=SEM_NUMPY)])
+def test_lote_igual_ao_conta_a_conta(vetorizado):
+    # Given
+    taxa = motor.taxa_diaria()
+    referencia, contas = criar_contas(), criar_contas()
+    fechar_conta_a_conta(referencia, taxa)
+
+    # When
+    fechamento = motor.processar_fechamento(contas, DATA, taxa, vetorizado=vetorizado)
+
+    # Then
+    assert estado(contas) == estado(referencia)
+    assert fechamento.depositos == sum(conta.historico.quantidade("Juros") for conta in contas)
+    assert fechamento.tarifas == sum(conta.historico.quantidade("Tarifa") for conta in contas)
+
+
+def test_juros_e_tarifa_do_fechamento_nao_gastam_a_cota_do_cliente(capsys):
+    # Given
+    conta = criar_contas([0.0])[0]
+    cliente = conta.cliente
+    cliente.realizar_transacao(conta, Deposito(500.0))
+
+    # When
+    motor.processar_fechamento([conta])
+    cliente.realizar_transacao(conta, Saque(10.0))
+
+    # Then
+    assert conta.historico.quantidade("Juros") == 1
+    assert conta.historico.quantidade("Tarifa") == 1
+    assert conta.historico.quantidade("Saque") == 1
+    assert "excedeu" not in capsys.readouterr().out
+
+
+def test_queda_no_snapshot_nao_repete_o_fechamento(tmp_path, monkeypatch):
+    # Given
+    persistencia = Persistencia(tmp_path)
+    persistencia.carregar(PessoaFisica, ContaCorrente)
+    persistencia.iniciar([], [])
+    persistencia.fechar()
+
+    def cair(self):
+        raise OSError("queda simulada")
+
+    monkeypatch.setattr(sys, "argv", ["fechamento.py", "--dados", str(tmp_path), "--sequencial"])
+    monkeypatch.setattr(Persistencia, "salvar_snapshot", cair)
+
+    # When
+    with pytest.raises(OSError):
+        motor.main()
+    monkeypatch.undo()
+    monkeypatch.setattr(sys, "argv", ["fechamento.py", "--dados", str(tmp_path), "--sequencial"])
+
+    # Then
+    with pytest.raises(SystemExit, match="já foi feito"):
+        motor.main()
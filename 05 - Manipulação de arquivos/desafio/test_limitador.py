@@ -0,0 +1,54 @@
+from desafio_v2 import ContaCorrente, Deposito, PessoaFisica, Saque, Tarifa
+
+
+def abrir_conta(numero, plano=None):
+    cliente = PessoaFisica(
+        nome=f"Cliente {numero}", data_nascimento="01-01-1990", cpf=f"{numero:011d}", endereco="", plano=plano
+    )
+    conta = ContaCorrente(numero=numero, cliente=cliente, limite=500, limite_saques=50)
+    cliente.adicionar_conta(conta)
+    return cliente, conta
+
+
+def test_plano_padrao_permite_duas_transacoes_do_cliente_por_dia(capsys):
+    # Given
+    cliente, conta = abrir_conta(1)
+
+    # When
+    cliente.realizar_transacao(conta, Deposito(100.0))
+    cliente.realizar_transacao(conta, Saque(30.0))
+    cliente.realizar_transacao(conta, Deposito(10.0))
+
+    # Then
+    assert len(conta.historico.transacoes) == 2
+    assert conta.saldo == 70.0
+    assert "excedeu" in capsys.readouterr().out
+
+
+def test_tarifa_nao_gasta_a_cota_do_cliente(capsys):
+    # Given
+    cliente, conta = abrir_conta(1)
+    cliente.realizar_transacao(conta, Deposito(100.0))
+    Tarifa(5.0).registrar(conta)
+
+    # When
+    cliente.realizar_transacao(conta, Saque(30.0))
+
+    # Then
+    assert conta.historico.iniciadas_hoje() == 2
+    assert conta.saldo == 65.0
+    assert "excedeu" not in capsys.readouterr().out
+
+
+def test_transacao_recusada_nao_gasta_a_cota(capsys):
+    # Given
+    cliente, conta = abrir_conta(1)
+
+    # When
+    cliente.realizar_transacao(conta, Saque(30.0))  # saldo insuficiente
+    cliente.realizar_transacao(conta, Deposito(100.0))
+    cliente.realizar_transacao(conta, Saque(30.0))
+
+    # Then
+    assert conta.saldo == 70.0
+    assert "excedeu" not in capsys.readouterr().out
@@ -0,0 +1,82 @@
+import contextlib
+import csv
+import io
+import random
+
+import pytest
+
+import lote as motor
+from desafio_v2 import SEGUNDOS_POR_DIA, ContaCorrente, Deposito, PessoaFisica, Saque
+
+CONTAS = 2 * motor.CONTAS_MINIMAS_VETORIZADAS  # abaixo disso, o vetorizado segue em Python puro
+DATA = 1_000 * SEGUNDOS_POR_DIA
+
+
+def criar_contas():
+    contas = {}
+    for numero in range(1, CONTAS + 1):
+        cliente = PessoaFisica(
+            nome=f"Cliente {numero}", data_nascimento="01-01-1990", cpf=f"{numero:011d}", endereco=""
+        )
+        contas[numero] = ContaCorrente(numero=numero, cliente=cliente, limite=500, limite_saques=5)
+        cliente.adicionar_conta(contas[numero])
+    return contas
+
+
+@pytest.fixture
+def lote(tmp_path):
+    # Valores negativos, contas inexistentes, datas fora de ordem e saques além do limite, do saldo e da cota diária
+    aleatorio = random.Random(42)
+    caminho = tmp_path / "movimentos.csv"
+    with open(caminho, "w", newline="", encoding="utf-8") as arquivo:
+        escritor = csv.writer(arquivo)
+        escritor.writerow(["conta", "tipo", "valor", "data"])
+        for _ in range(5_000):
+            tipo = "deposito" if aleatorio.random() < 0.55 else "saque"
+            conta = aleatorio.randint(1, CONTAS + 2)
+            data = DATA + aleatorio.randrange(3 * SEGUNDOS_POR_DIA)
+            escritor.writerow([conta, tipo, round(aleatorio.uniform(-20, 700), 2), data])
+        escritor.writerow(["1", "transferencia", "10", str(DATA)])
+        escritor.writerow(["linha", "quebrada"])
+    return motor.carregar_csv(caminho)
+
+
+def processar_sequencial(contas, lote):
+    # Referência: cada linha passa por Transacao.registrar, na ordem (conta, data, linha) que o lote aplica
+    transacoes = {motor.SAQUE: Saque, motor.DEPOSITO: Deposito}
+    validas = [posicao for posicao in range(len(lote)) if lote.codigos[posicao] and lote.contas[posicao] in contas]
+    validas.sort(key=lambda posicao: (lote.contas[posicao], lote.datas[posicao], lote.linhas[posicao]))
+
+    aceitas = set()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for posicao in validas:
+            conta, data = contas[lote.contas[posicao]], lote.datas[posicao]
+            if conta.historico._datas and data < conta.historico._datas[-1]:
+                continue
+            if transacoes[lote.codigos[posicao]](lote.valores[posicao]).registrar(conta, data=data):
+                aceitas.add(posicao)
+    return aceitas
+
+
+def estado(contas):
+    return {numero: (conta.saldo, list(conta.historico.transacoes)) for numero, conta in contas.items()}
+
+
+SEM_NUMPY = pytest.mark.skipif(motor.np is None, reason="sem NumPy")
+
+
+@pytest.mark.parametrize("vetorizado", [False, pytest.param(True, marks=SEM_NUMPY)])
+def test_lote_igual_ao_caminho_sequencial(lote, vetorizado):
+    # Given
+    referencia, contas = criar_contas(), criar_contas()
+    aceitas_referencia = processar_sequencial(referencia, lote)
+
+    # When
+    resultado = motor.processar_lote(contas, lote, vetorizado=vetorizado)
+
+    # Then
+    aceitas = {posicao for posicao, motivo in enumerate(resultado.motivos) if not motivo}
+    assert aceitas == aceitas_referencia
+    assert 0 < resultado.aceitas < len(lote)
+    assert estado(contas) == estado(referencia)
+    assert [campos for _, campos in lote.invalidas] == [["linha", "quebrada"]]
@@ -0,0 +1,223 @@
+import contextlib
+import io
+import time
+
+import pytest
+
+import desafio_v2
+from desafio_v2 import ContaCorrente, Deposito, PessoaFisica, Saque, Transferencia, notificar
+from persistencia import DiretorioEmUso, Persistencia
+
+
+@pytest.fixture
+def banco(tmp_path):
+    persistencia = Persistencia(tmp_path, registros_por_snapshot=float("inf"))
+    clientes, contas = persistencia.carregar(PessoaFisica, ContaCorrente)
+    persistencia.iniciar(clientes, contas)
+    desafio_v2.ouvintes.append(persistencia.registrar_evento)
+    yield persistencia, clientes, contas
+    desafio_v2.ouvintes.remove(persistencia.registrar_evento)
+    if persistencia._wal is not None and not persistencia._wal.closed:
+        persistencia.fechar()
+
+
+def abrir_conta(clientes, contas, numero, plano=None):
+    cliente = PessoaFisica(
+        nome=f"Cliente {numero}", data_nascimento="01-01-1990", cpf=f"{numero:011d}", endereco="", plano=plano
+    )
+    conta = ContaCorrente(numero=numero, cliente=cliente, limite=500, limite_saques=50)
+    cliente.adicionar_conta(conta)
+    clientes.append(cliente)
+    contas.append(conta)
+    notificar("cliente", cliente)
+    notificar("conta", conta)
+    return conta
+
+
+def movimentar(contas, quantidade, data=1_000_000):
+    with contextlib.redirect_stdout(io.StringIO()):
+        for indice in range(quantidade):
+            conta = contas[indice % len(contas)]
+            Deposito(100.0).registrar(conta, data + indice)
+            Saque(30.0).registrar(conta, data + indice)
+        Transferencia(5.0, contas[-1]).registrar(contas[0], data + quantidade)
+
+
+def derrubar(persistencia):
+    # Queda simulada: as threads param e o WAL é fechado sem o snapshot de fechar(); o processo que cai solta a trava
+    persistencia._parar.set()
+    persistencia._sincronizador.join()
+    persistencia._aguardar_snapshot()
+    persistencia._wal.close()
+    persistencia._liberar_diretorio()
+
+
+def estado(contas):
+    return [
+        (conta.numero, conta.cliente.cpf, conta.cliente.plano, conta.saldo, list(conta.historico.transacoes))
+        for conta in contas
+    ]
+
+
+def recarregar(diretorio):
+    persistencia = Persistencia(diretorio)
+    _, contas = persistencia.carregar(PessoaFisica, ContaCorrente)
+    persistencia.fechar()
+    return contas
+
+
+def test_wal_descarta_registro_incompleto(banco, tmp_path):
+    # Given
+    persistencia, clientes, contas = banco
+    abrir_conta(clientes, contas, 1, plano="premium")
+    abrir_conta(clientes, contas, 2)
+    movimentar(contas, 10)
+    esperado = estado(contas)
+    derrubar(persistencia)
+    tamanho_valido = persistencia.caminho_wal.stat().st_size
+    with open(persistencia.caminho_wal, "ab") as wal:
+        wal.write(b"\x40\x00\x00\x00registro-incompleto")
+
+    # When
+    recuperadas = recarregar(tmp_path)
+
+    # Then
+    assert estado(recuperadas) == esperado
+    assert persistencia.caminho_wal.stat().st_size == tamanho_valido
+
+
+def test_wal_nao_reaplica_registros_cobertos_pelo_snapshot(banco, tmp_path):
+    # Given
+    persistencia, clientes, contas = banco
+    abrir_conta(clientes, contas, 1)
+    abrir_conta(clientes, contas, 2)
+    movimentar(contas, 4)
+    persistencia.salvar_snapshot()
+    movimentar(contas, 4, data=2_000_000)
+    esperado = estado(contas)
+    derrubar(persistencia)
+
+    # When
+    recuperadas = recarregar(tmp_path)
+
+    # Then
+    assert estado(recuperadas) == esperado
+
+
+def test_snapshot_com_lancamentos_alem_da_sua_sequencia_nao_duplica(banco, tmp_path):
+    # Given: um snapshot em segundo plano que já viu lançamentos gravados no WAL depois da sua sequência
+    persistencia, clientes, contas = banco
+    abrir_conta(clientes, contas, 1)
+    abrir_conta(clientes, contas, 2)
+    movimentar(contas, 4)
+    persistencia._sincronizar()
+    sequencia = persistencia._sequencia
+    movimentar(contas, 4, data=2_000_000)
+    persistencia._gravar_snapshot(sequencia, clientes, contas)
+    esperado = estado(contas)
+    derrubar(persistencia)
+
+    # When
+    recuperadas = recarregar(tmp_path)
+
+    # Then
+    assert estado(recuperadas) == esperado
+
+
+def test_snapshot_em_segundo_plano_rotaciona_o_wal(tmp_path):
+    # Given
+    persistencia = Persistencia(tmp_path, registros_por_snapshot=10)
+    clientes, contas = persistencia.carregar(PessoaFisica, ContaCorrente)
+    persistencia.iniciar(clientes, contas)
+    desafio_v2.ouvintes.append(persistencia.registrar_evento)
+    try:
+        abrir_conta(clientes, contas, 1)
+        abrir_conta(clientes, contas, 2)
+
+        # When
+        movimentar(contas, 20)
+        persistencia._aguardar_snapshot()
+        movimentar(contas, 3, data=2_000_000)
+        esperado = estado(contas)
+        derrubar(persistencia)
+    finally:
+        desafio_v2.ouvintes.remove(persistencia.registrar_evento)
+
+    # Then
+    assert persistencia.caminho_snapshot.exists()
+    assert not persistencia.caminho_wal_anterior.exists()
+    assert estado(recarregar(tmp_path)) == esperado
+
+
+def test_queda_no_meio_do_snapshot_recupera_pelo_wal_anterior(banco, tmp_path):
+    # Given: o WAL foi rotacionado, mas o snapshot novo não chegou ao disco
+    persistencia, clientes, contas = banco
+    abrir_conta(clientes, contas, 1)
+    abrir_conta(clientes, contas, 2)
+    movimentar(contas, 4)
+    persistencia.salvar_snapshot()
+    movimentar(contas, 4, data=2_000_000)
+    with persistencia._trava:
+        persistencia._sincronizar()
+        persistencia._wal.close()
+        persistencia.caminho_wal.rename(persistencia.caminho_wal_anterior)
+        persistencia._wal = open(persistencia.caminho_wal, "ab")
+    movimentar(contas, 4, data=3_000_000)
+    esperado = estado(contas)
+    derrubar(persistencia)
+
+    # When
+    reiniciada = Persistencia(tmp_path)
+    clientes_recuperados, recuperadas = reiniciada.carregar(PessoaFisica, ContaCorrente)
+    reiniciada.iniciar(clientes_recuperados, recuperadas)
+    reiniciada.fechar()
+
+    # Then
+    assert estado(recuperadas) == esperado
+    assert not reiniciada.caminho_wal_anterior.exists()
+    assert estado(recarregar(tmp_path)) == esperado
+
+
+def test_registro_sem_novas_escritas_recebe_fsync_pelo_intervalo(banco):
+    # Given
+    persistencia, clientes, contas = banco
+
+    # When
+    abrir_conta(clientes, contas, 1)
+    time.sleep(persistencia.intervalo_fsync * 4)
+
+    # Then
+    assert persistencia._pendentes == 0
+
+
+def test_segundo_processo_no_mesmo_diretorio_e_recusado(banco, tmp_path):
+    # Given
+    persistencia, clientes, contas = banco
+    abrir_conta(clientes, contas, 1)
+
+    # When / Then
+    with pytest.raises(DiretorioEmUso):
+        Persistencia(tmp_path).carregar(PessoaFisica, ContaCorrente)
+    persistencia.fechar()
+    assert estado(recarregar(tmp_path)) == estado(contas)
+
+
+def test_leitura_com_o_diretorio_em_uso_nao_trunca_o_wal(banco, tmp_path):
+    # Given: outro processo com o diretório aberto e um registro ainda pela metade no fim do WAL
+    persistencia, clientes, contas = banco
+    abrir_conta(clientes, contas, 1)
+    movimentar(contas, 3)
+    persistencia._sincronizar()
+    with open(persistencia.caminho_wal, "ab") as wal:
+        wal.write(b"\x40\x00\x00\x00registro-em-escrita")
+    tamanho = persistencia.caminho_wal.stat().st_size
+
+    # When
+    leitura = Persistencia(tmp_path)
+    _, recuperadas = leitura.carregar(PessoaFisica, ContaCorrente, somente_leitura=True)
+
+    # Then
+    assert estado(recuperadas) == estado(contas)
+    assert persistencia.caminho_wal.stat().st_size == tamanho
+    with pytest.raises(ValueError):
+        leitura.iniciar([], [])
@@ -0,0 +1,20 @@
+import random
+
+from roteiro import percentis
+
+
+def test_percentis_nao_passam_do_maior_valor_medido():
+    # Given: poucas amostras, com uma cauda longa
+    aleatorio = random.Random(42)
+    latencias = [aleatorio.uniform(10e-6, 20e-6) for _ in range(49)] + [143.7e-6]
+
+    # When
+    p50, p90, p99 = percentis(latencias)
+
+    # Then
+    assert min(latencias) <= p50 <= p90 <= p99 <= max(latencias)
+
+
+def test_percentis_com_menos_de_duas_amostras():
+    assert percentis([5e-6]) == (5e-6, 5e-6, 5e-6)
+    assert percentis([]) == (0.0, 0.0, 0.0)
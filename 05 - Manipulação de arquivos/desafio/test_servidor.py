@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+import desafio_v2
+from desafio_v2 import ClienteRegistry, ContaCorrente, ContaRegistry, PessoaFisica
+from persistencia import Persistencia
+from servidor import Banco
+
+
+@pytest.fixture
+def banco(tmp_path):
+    persistencia = Persistencia(tmp_path, registros_por_snapshot=float("inf"))
+    clientes, contas = persistencia.carregar(PessoaFisica, ContaCorrente)
+    banco = Banco(ClienteRegistry(clientes), ContaRegistry(contas))
+    persistencia.iniciar(banco.clientes, banco.contas)
+    desafio_v2.ouvintes.append(persistencia.registrar_evento)
+    yield banco, persistencia
+    desafio_v2.ouvintes.remove(persistencia.registrar_evento)
+    persistencia.fechar()
+
+
+def pedir(banco, **requisicao):
+    return json.loads(banco.responder(json.dumps(requisicao).encode()))
+
+
+@pytest.mark.parametrize(
+    "campos",
+    [{"nome": 123}, {"nome": "Ana", "data_nascimento": None}, {"nome": "Ana", "endereco": ["Rua A"]}],
+)
+def test_cliente_com_campo_que_nao_e_texto_e_recusado_sem_entrar_no_registro(banco, tmp_path, campos):
+    # Given
+    banco, persistencia = banco
+
+    # When
+    resposta = pedir(banco, op="cliente", cpf="1", **campos)
+    conta = pedir(banco, op="conta", cpf="1")
+
+    # Then
+    assert not resposta["ok"]
+    assert "deve ser texto" in resposta["erro"]
+    assert "1" not in banco.clientes
+    assert not conta["ok"]
+    persistencia.fechar()
+    assert Persistencia(tmp_path).carregar(PessoaFisica, ContaCorrente, somente_leitura=True) == ([], [])
+
+
+def test_cliente_valido_e_persistido(banco, tmp_path):
+    # Given
+    banco, persistencia = banco
+
+    # When
+    resposta = pedir(banco, op="cliente", cpf="1", nome="Ana", data_nascimento="01-01-1990", endereco="Rua A")
+    conta = pedir(banco, op="conta", cpf="1")
+    persistencia.fechar()
+
+    # Then
+    assert resposta == {"id": None, "ok": True, "cpf": "1"}
+    assert conta["ok"]
+    clientes, contas = Persistencia(tmp_path).carregar(PessoaFisica, ContaCorrente, somente_leitura=True)
+    assert [(cliente.cpf, cliente.nome) for cliente in clientes] == [("1", "Ana")]
+    assert [conta.numero for conta in contas] == [1]
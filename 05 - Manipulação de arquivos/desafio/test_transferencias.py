@@ -0,0 +1,80 @@
+import random
+import sys
+import threading
+
+import pytest
+
+import desafio_v2
+from desafio_v2 import CREDITOS, ContaCorrente, Deposito, PessoaFisica, Saque, Transferencia
+
+SALDO_INICIAL = 1_000.0
+
+
+def abrir_conta(numero):
+    cliente = PessoaFisica(nome=f"Cliente {numero}", data_nascimento="01-01-1990", cpf=f"{numero:011d}", endereco="")
+    conta = ContaCorrente(numero=numero, cliente=cliente, limite=10**9, limite_saques=10**9)
+    cliente.adicionar_conta(conta)
+    return conta
+
+
+@pytest.fixture
+def concorrente():
+    intervalo = sys.getswitchinterval()
+    desafio_v2.ativar_concorrencia(64)
+    # Trocas de thread frequentes expõem as janelas entre o débito e o crédito
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(intervalo)
+    desafio_v2.desativar_concorrencia()
+
+
+def test_transferencias_recebidas_nao_gastam_a_cota_do_destinatario(capsys):
+    # Given
+    origem, destino = abrir_conta(1), abrir_conta(2)
+    Deposito(500.0).registrar(origem)
+    Transferencia(100.0, destino).registrar(origem)
+    Transferencia(50.0, destino).registrar(origem)
+
+    # When
+    destino.cliente.realizar_transacao(destino, Deposito(10.0))
+    destino.cliente.realizar_transacao(destino, Saque(20.0))
+
+    # Then
+    assert destino.historico.quantidade("TransferenciaRecebida") == 2
+    assert destino.historico.iniciadas_hoje() == 2
+    assert destino.saldo == 140.0
+    assert "excedeu" not in capsys.readouterr().out
+
+
+def test_transferencias_concorrentes_conservam_o_dinheiro(concorrente):
+    # Given: poucas contas, muitas threads e transferências em sentidos opostos
+    contas = [abrir_conta(numero) for numero in range(1, 5)]
+    for conta in contas:
+        Deposito(SALDO_INICIAL).registrar(conta)
+    erros = []
+
+    def transferir(semente):
+        aleatorio = random.Random(semente)
+        for _ in range(2_000):
+            origem, destino = aleatorio.sample(contas, 2)
+            try:
+                Transferencia(float(aleatorio.randint(1, 500)), destino).registrar(origem)
+            except Exception as exc:
+                erros.append(exc)
+
+    # When
+    threads = [threading.Thread(target=transferir, args=(semente,)) for semente in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(60)
+
+    # Then: nada criado nem destruído, e cada saldo bate com o próprio histórico
+    assert not erros
+    assert sum(conta.saldo for conta in contas) == SALDO_INICIAL * len(contas)
+    enviadas = sum(conta.historico.total("TransferenciaEnviada") for conta in contas)
+    assert enviadas == sum(conta.historico.total("TransferenciaRecebida") for conta in contas) > 0
+    for conta in contas:
+        lancamentos = zip(conta.historico._tipos, conta.historico._valores)
+        saldo = sum(valor if codigo in CREDITOS else -valor for codigo, valor in lancamentos)
+        assert saldo == conta.saldo >= 0
@@ -1,7 +1,7 @@
 import textwrap
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 
 # Classe base que representa um cliente no sistema bancário
 class Cliente:
@@ -29,6 +29,34 @@ class PessoaFisica(Cliente):
         self.data_nascimento: str = data_nascimento  # Data de nascimento do cliente
         self.cpf: str = cpf  # CPF do cliente
 
+# Classe que indexa os clientes pelo CPF
+class ClienteRegistry:
+    """Coleção de clientes indexada pelo CPF, com busca em tempo constante."""
+
+    def __init__(self, clientes: Iterable['PessoaFisica'] = ()):
+        self._clientes: Dict[str, 'PessoaFisica'] = {}  # CPF -> cliente, na ordem de cadastro
+        for cliente in clientes:
+            self.adicionar(cliente)
+
+    def adicionar(self, cliente: 'PessoaFisica'):
+        """Adiciona um cliente, rejeitando CPFs duplicados."""
+        if cliente.cpf in self._clientes:
+            raise ValueError(f"Já existe cliente com o CPF {cliente.cpf}!")
+        self._clientes[cliente.cpf] = cliente
+
+    def buscar(self, cpf: str) -> Optional['PessoaFisica']:
+        """Retorna o cliente com o CPF informado, ou None se não existir."""
+        return self._clientes.get(cpf)
+
+    def __contains__(self, cpf: str) -> bool:
+        return cpf in self._clientes
+
+    def __len__(self) -> int:
+        return len(self._clientes)
+
+    def __iter__(self) -> Iterator['PessoaFisica']:
+        return iter(self._clientes.values())  # Itera na ordem de cadastro
+
 # Classe que representa uma conta bancária genérica
 class Conta:
     """Classe que representa uma conta bancária genérica."""
@@ -100,10 +128,8 @@ class ContaCorrente(Conta):
 
     def sacar(self, valor: float) -> bool:
         """Realiza saque respeitando limite de valor e número de saques."""
-        # Calcula o número de saques já realizados
-        saques_realizados = sum(
-            1 for transacao in self.historico.transacoes if transacao["tipo"] == Saque.__name__
-        )
+        # Consulta o contador de saques já realizados
+        saques_realizados = self.historico.quantidade(Saque.__name__)
 
         if valor > self._limite:
             print("\n@@@ Operação falhou! O valor do saque excede o limite. @@@")
@@ -125,6 +151,8 @@ class Historico:
 
     def __init__(self):
         self._transacoes: List[dict] = []  # Lista de transações
+        self._quantidades: Dict[str, int] = {}  # Número de transações por tipo
+        self._totais: Dict[str, float] = {}  # Valor movimentado por tipo
 
     @property
     def transacoes(self) -> List[dict]:
@@ -138,6 +166,28 @@ class Historico:
             "valor": transacao.valor,  # Valor da transação
             "data": datetime.now().strftime("%d-%m-%Y %H:%M:%S"),  # Data e hora da transação
         })
+        self._contabilizar(transacao.__class__.__name__, transacao.valor)
+
+    def carregar(self, transacoes: Iterable[dict]):
+        """Substitui o histórico por transações já registradas, recalculando os contadores."""
+        self._transacoes = list(transacoes)
+        self._quantidades = {}
+        self._totais = {}
+        for transacao in self._transacoes:
+            self._contabilizar(transacao["tipo"], transacao["valor"])
+
+    def _contabilizar(self, tipo: str, valor: float):
+        """Atualiza os contadores e totais do tipo de transação."""
+        self._quantidades[tipo] = self._quantidades.get(tipo, 0) + 1
+        self._totais[tipo] = self._totais.get(tipo, 0.0) + valor
+
+    def quantidade(self, tipo: str) -> int:
+        """Retorna o número de transações do tipo informado."""
+        return self._quantidades.get(tipo, 0)
+
+    def total(self, tipo: str) -> float:
+        """Retorna o valor total movimentado pelo tipo informado."""
+        return self._totais.get(tipo, 0.0)
 
 # Classe abstrata que representa uma transação
 class Transacao(ABC):
@@ -199,10 +249,10 @@ def menu():
     return input(textwrap.dedent(menu))
 
 # Função para filtrar um cliente pelo CPF
-def filtrar_cliente(cpf: str, clientes: List[Cliente]) -> Optional[Cliente]:
+def filtrar_cliente(cpf: str, clientes: ClienteRegistry) -> Optional[Cliente]:
     """Busca um cliente pelo CPF."""
-    # Retorna o primeiro cliente encontrado com o CPF correspondente, ou None se não encontrar
-    return next((cliente for cliente in clientes if cliente.cpf == cpf), None)
+    # Consulta o índice por CPF, ou None se não encontrar
+    return clientes.buscar(cpf)
 
 # Função para recuperar a conta de um cliente
 def recuperar_conta_cliente(cliente: Cliente) -> Optional[Conta]:
@@ -213,7 +263,7 @@ def recuperar_conta_cliente(cliente: Cliente) -> Optional[Conta]:
     return cliente.contas[0]  # Retorna a primeira conta do cliente
 
 # Função para realizar um depósito
-def depositar(clientes: List[Cliente]):
+def depositar(clientes: ClienteRegistry):
     cpf = input("Informe o CPF do cliente: ")
     cliente = filtrar_cliente(cpf, clientes)  # Busca o cliente pelo CPF
     if not cliente:
@@ -230,7 +280,7 @@ def depositar(clientes: List[Cliente]):
         print("\n@@@ Valor inválido! @@@")  # Trata entrada inválida
 
 # Função para realizar um saque
-def sacar(clientes: List[Cliente]):
+def sacar(clientes: ClienteRegistry):
     cpf = input("Informe o CPF do cliente: ")
     cliente = filtrar_cliente(cpf, clientes)  # Busca o cliente pelo CPF
     if not cliente:
@@ -247,7 +297,7 @@ def sacar(clientes: List[Cliente]):
         print("\n@@@ Valor inválido! @@@")  # Trata entrada inválida
 
 # Função para exibir o extrato de um cliente
-def exibir_extrato(clientes: List[Cliente]):
+def exibir_extrato(clientes: ClienteRegistry):
     cpf = input("Informe o CPF do cliente: ")
     cliente = filtrar_cliente(cpf, clientes)  # Busca o cliente pelo CPF
 
@@ -273,7 +323,7 @@ def exibir_extrato(clientes: List[Cliente]):
     print("==========================================")
 
 # Função para criar um novo cliente
-def criar_cliente(clientes: List[Cliente]):
+def criar_cliente(clientes: ClienteRegistry):
     cpf = input("Informe o CPF (somente número): ")
     cliente = filtrar_cliente(cpf, clientes)  # Verifica se o cliente já existe
 
@@ -288,12 +338,12 @@ def criar_cliente(clientes: List[Cliente]):
 
     cliente = PessoaFisica(nome=nome, data_nascimento=data_nascimento, cpf=cpf, endereco=endereco)
 
-    clientes.append(cliente)  # Adiciona o novo cliente à lista de clientes
+    clientes.adicionar(cliente)  # Adiciona o novo cliente ao registro de clientes
 
     print("\n=== Cliente criado com sucesso! ===")
 
 # Função para criar uma nova conta para um cliente existente
-def criar_conta(numero_conta: int, clientes: List[Cliente], contas: List[Conta]):
+def criar_conta(numero_conta: int, clientes: ClienteRegistry, contas: List[Conta]):
     cpf = input("Informe o CPF do cliente: ")
     cliente = filtrar_cliente(cpf, clientes)  # Busca o cliente pelo CPF
 
@@ -315,7 +365,7 @@ def listar_contas(contas: List[Conta]):
 
 # Função principal que executa o sistema bancário
 def main():
-    clientes: List[Cliente] = []  # Lista de clientes
+    clientes = ClienteRegistry()  # Clientes indexados pelo CPF
     contas: List[Conta] = []  # Lista de contas
 
     while True: